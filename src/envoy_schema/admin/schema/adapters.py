@@ -0,0 +1,109 @@
+"""Cached pydantic TypeAdapters for the admin models (and lists of admin models). Building a TypeAdapter is expensive
+so they should be built once and reused. The dump_json / validate_json functions work directly with bytes (no
+intermediate dicts) which is considerably faster than model_dump() + json.dumps()."""
+
+from functools import lru_cache
+from types import ModuleType
+from typing import Any, TypeVar, Union
+
+from pydantic import BaseModel, TypeAdapter
+
+from envoy_schema.admin.schema import (
+    aggregator,
+    archive,
+    base,
+    certificate,
+    config,
+    log,
+    pricing,
+    site,
+    site_change_feed,
+    site_control,
+    site_group,
+    site_reading,
+)
+
+ModelType = TypeVar("ModelType", bound=BaseModel)
+
+ADMIN_MODEL_MODULES: list[ModuleType] = [
+    aggregator,
+    archive,
+    base,
+    certificate,
+    config,
+    log,
+    pricing,
+    site,
+    site_change_feed,
+    site_control,
+    site_group,
+    site_reading,
+]
+
+
+def _list_admin_models() -> list[type[BaseModel]]:
+    """Every (non generic) admin model defined in ADMIN_MODEL_MODULES plus the parameterised archive pages"""
+    models: list[type[BaseModel]] = []
+    for module in ADMIN_MODEL_MODULES:
+        for value in vars(module).values():
+            if (
+                isinstance(value, type)
+                and issubclass(value, BaseModel)
+                and value.__module__ == module.__name__
+                and not value.__pydantic_generic_metadata__["parameters"]
+            ):
+                models.append(value)
+
+    for archive_type in archive.ArchiveType.__constraints__:
+        models.append(archive.ArchivePageResponse[archive_type])  # type: ignore[valid-type]
+        models.append(archive.ArchiveCursorPageResponse[archive_type])  # type: ignore[valid-type]
+    return models
+
+
+ADMIN_MODELS: list[type[BaseModel]] = _list_admin_models()
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(model_type: type[ModelType]) -> TypeAdapter[ModelType]:
+    """Fetches the (cached) TypeAdapter for model_type"""
+    return TypeAdapter(model_type)
+
+
+@lru_cache(maxsize=None)
+def get_list_type_adapter(model_type: type[ModelType]) -> TypeAdapter[list[ModelType]]:
+    """Fetches the (cached) TypeAdapter for list[model_type]"""
+    return TypeAdapter(list[model_type])  # type: ignore[valid-type]
+
+
+def build_type_adapters() -> None:
+    """Eagerly builds (and caches) the TypeAdapters for every ADMIN_MODELS type (and list thereof). Useful to avoid
+    paying the build cost during the first request."""
+    for model_type in ADMIN_MODELS:
+        get_type_adapter(model_type)
+        get_list_type_adapter(model_type)
+
+
+def dump_json(instance: BaseModel, **kwargs: Any) -> bytes:
+    """Serialises instance to JSON bytes. kwargs are passed to TypeAdapter.dump_json (eg exclude_none)"""
+    return get_type_adapter(type(instance)).dump_json(instance, **kwargs)
+
+
+def dump_list_json(model_type: type[ModelType], instances: list[ModelType], **kwargs: Any) -> bytes:
+    """Serialises instances (a list of model_type) to JSON bytes. kwargs are passed to TypeAdapter.dump_json"""
+    return get_list_type_adapter(model_type).dump_json(instances, **kwargs)
+
+
+def validate_json(model_type: type[ModelType], data: Union[str, bytes]) -> ModelType:
+    """Validates JSON data as an instance of model_type
+
+    Raises:
+        pydantic.ValidationError if data is invalid"""
+    return get_type_adapter(model_type).validate_json(data)
+
+
+def validate_list_json(model_type: type[ModelType], data: Union[str, bytes]) -> list[ModelType]:
+    """Validates JSON data as a list of model_type
+
+    Raises:
+        pydantic.ValidationError if data is invalid"""
+    return get_list_type_adapter(model_type).validate_json(data)
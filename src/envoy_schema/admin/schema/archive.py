@@ -3,6 +3,7 @@ from typing import Generic, Optional, TypeVar
 
 from pydantic import BaseModel
 
+from envoy_schema.admin.schema.base import BaseCursorPageModel
 from envoy_schema.admin.schema.pricing import TariffGeneratedRateResponse
 from envoy_schema.admin.schema.site import SiteResponse
 from envoy_schema.admin.schema.site_control import SiteControlResponse
@@ -48,3 +49,11 @@ class ArchivePageResponse(BaseModel, Generic[ArchiveType]):
     period_start: datetime  # The period_start parameter from the original request
     period_end: datetime  # The period_end parameter from the original request
     entities: list[ArchiveType]  # The entity models in this paged response
+
+
+class ArchiveCursorPageResponse(BaseCursorPageModel, Generic[ArchiveType]):
+    """Represents a keyset (cursor) paginated response of archive entities"""
+
+    period_start: datetime  # The period_start parameter from the original request
+    period_end: datetime  # The period_end parameter from the original request
+    entities: list[ArchiveType]  # The entity models in this paged response
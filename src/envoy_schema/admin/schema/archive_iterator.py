@@ -0,0 +1,75 @@
+"""Sync/async iterators for walking every page of an ArchivePageResponse. The next page is fetched in the background
+while the current page is being processed so that network I/O overlaps with processing."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Awaitable, Callable, Iterator
+
+from envoy_schema.admin.schema.archive import ArchivePageResponse, ArchiveType
+
+
+def _next_page_start(page: ArchivePageResponse) -> int:
+    """Returns the start for the page after page or -1 if page is the final page"""
+    next_start = page.start + len(page.entities)
+    if not page.entities or next_start >= page.total_count:
+        return -1
+    return next_start
+
+
+def iter_archive_pages(
+    fetch_page: Callable[[int, int], ArchivePageResponse[ArchiveType]], limit: int, start: int = 0
+) -> Iterator[ArchivePageResponse[ArchiveType]]:
+    """Iterates every page returned by fetch_page (beginning at start). fetch_page(start, limit) should return the
+    archive page (for a fixed period_start/period_end) for the specified start/limit. The subsequent page is fetched on
+    a background thread while the consumer is processing the current page. If iteration stops early, the background
+    thread is released without waiting (an in progress fetch will run to completion but its result is discarded)."""
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        future = executor.submit(fetch_page, start, limit)
+        while True:
+            page = future.result()
+            next_start = _next_page_start(page)
+            if next_start >= 0:
+                future = executor.submit(fetch_page, next_start, limit)
+            yield page
+            if next_start < 0:
+                return
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def iter_archive_entities(
+    fetch_page: Callable[[int, int], ArchivePageResponse[ArchiveType]], limit: int, start: int = 0
+) -> Iterator[ArchiveType]:
+    """Iterates every entity of every page returned by fetch_page (see iter_archive_pages)"""
+    for page in iter_archive_pages(fetch_page, limit, start):
+        yield from page.entities
+
+
+async def aiter_archive_pages(
+    fetch_page: Callable[[int, int], Awaitable[ArchivePageResponse[ArchiveType]]], limit: int, start: int = 0
+) -> AsyncIterator[ArchivePageResponse[ArchiveType]]:
+    """Async equivalent of iter_archive_pages. The subsequent page is fetched on a background task while the consumer
+    is processing the current page. Any outstanding fetch will be cancelled if iteration stops early."""
+    task = asyncio.ensure_future(fetch_page(start, limit))
+    try:
+        while True:
+            page = await task
+            next_start = _next_page_start(page)
+            if next_start >= 0:
+                task = asyncio.ensure_future(fetch_page(next_start, limit))
+            yield page
+            if next_start < 0:
+                return
+    finally:
+        if not task.done():
+            task.cancel()
+
+
+async def aiter_archive_entities(
+    fetch_page: Callable[[int, int], Awaitable[ArchivePageResponse[ArchiveType]]], limit: int, start: int = 0
+) -> AsyncIterator[ArchiveType]:
+    """Async equivalent of iter_archive_entities"""
+    async for page in aiter_archive_pages(fetch_page, limit, start):
+        for entity in page.entities:
+            yield entity
@@ -1,4 +1,40 @@
-from pydantic import BaseModel
+import base64
+import binascii
+from datetime import datetime
+from itertools import chain
+from typing import Any, Iterable, Iterator, Optional, TypeVar
+
+from pydantic import BaseModel, ValidationError, model_validator
+
+CursorType = TypeVar("CursorType", bound=BaseModel)
+
+
+def identity(value: Any) -> Any:
+    """Returns value unchanged (a pass through encoder/decoder for field conversion tables)"""
+    return value
+
+
+def encode_sequence_runs(items: Iterable[int]) -> list[tuple[int, int]]:
+    """Encodes items as a list of (start, count) runs. Each run represents start, start + 1, ..., start + count - 1"""
+    runs: list[tuple[int, int]] = []
+    run_start = 0
+    run_count = 0
+    for item in items:
+        if run_count and item == run_start + run_count:
+            run_count += 1
+        else:
+            if run_count:
+                runs.append((run_start, run_count))
+            run_start = item
+            run_count = 1
+    if run_count:
+        runs.append((run_start, run_count))
+    return runs
+
+
+def iter_sequence_runs(runs: Iterable[tuple[int, int]]) -> Iterator[int]:
+    """Lazily reverses encode_sequence_runs"""
+    return chain.from_iterable(range(start, start + count) for start, count in runs)
 
 
 class BasePageModel(BaseModel):
@@ -7,8 +43,87 @@ class BasePageModel(BaseModel):
     start: int  # The number of objects that have been skipped as part of this query (the start set by the query)
 
 
+class BaseCursorPageModel(BaseModel):
+    """Keyset (cursor) based alternative to BasePageModel. Rather than skipping "start" items, the next page is
+    requested by passing next_cursor back to the server. Computing the total count is optional (it may be omitted or
+    estimated) as it can be expensive for large collections."""
+
+    limit: int  # The maximum number of objects that could've been returned (the limit set by the query)
+    next_cursor: Optional[str]  # Opaque cursor for requesting the next page (None if there are no more pages)
+    total_count: Optional[int] = None  # The total number of objects (if computed - might be an estimate)
+    total_count_is_estimate: bool = False  # If True - total_count is an estimate rather than an exact count
+
+
+class KeysetCursor(BaseModel):
+    """The default keyset cursor - represents the sort key of the last item in a page of results that are ordered by
+    (changed_time, id). The next page will contain items strictly after this key."""
+
+    last_id: int  # The primary key of the last item returned
+    last_changed_time: Optional[datetime] = None  # The changed_time of the last item (if sorting on changed_time)
+
+
+def encode_page_cursor(cursor: BaseModel) -> str:
+    """Encodes cursor (typically a KeysetCursor) as an opaque, URL safe string"""
+    return base64.urlsafe_b64encode(cursor.model_dump_json(exclude_none=True).encode()).decode().rstrip("=")
+
+
+def decode_page_cursor(cursor: str, cursor_type: type[CursorType]) -> CursorType:
+    """Reverses encode_page_cursor
+
+    Raises:
+        ValueError if cursor can't be decoded as cursor_type"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        return cursor_type.model_validate_json(raw)
+    except (binascii.Error, ValidationError) as exc:
+        raise ValueError(f"Invalid page cursor '{cursor}'") from exc
+
+
 class BatchCreateResponse(BaseModel):
     """Returns all IDs that were inserted/updated - they will correspond 1-1 with the submitted batch request such
     that ids[X] corresponds to the entity at request[X]"""
 
     ids: list[int]  # Corresponds 1-1 with the incoming request entities
+
+    def iter_ids(self) -> Iterator[int]:
+        """Lazily iterates the ids (in request order). See BatchCreateRangeResponse.iter_ids"""
+        return iter(self.ids)
+
+    def total_ids(self) -> int:
+        """The number of ids"""
+        return len(self.ids)
+
+
+class BatchCreateRangeResponse(BaseModel):
+    """Opt in alternative to BatchCreateResponse for large batches. The IDs are encoded as id_ranges where each range is
+    a [start, count] pair representing start, start + 1, ..., start + count - 1. The concatenation of all ranges
+    corresponds 1-1 with the submitted batch request. This should only be returned to clients that have explicitly
+    requested it - iter_ids() is available on both models.
+
+    eg: {ids: [5, 6, 7, 8, 2]} is equivalent to {id_ranges: [[5, 4], [2, 1]]}"""
+
+    id_ranges: list[tuple[int, int]]  # [start, count] ranges that expand 1-1 to the request entities
+
+    @model_validator(mode="after")
+    def id_ranges_positive_counts(self) -> "BatchCreateRangeResponse":
+        """Validates that all range counts are positive
+
+        Raises:
+            ValueError if a range has a non positive count
+        """
+        if self.id_ranges and min(count for _, count in self.id_ranges) <= 0:
+            raise ValueError("id_ranges must only contain positive counts")
+        return self
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[int]) -> "BatchCreateRangeResponse":
+        """Creates a BatchCreateRangeResponse by encoding ids (in request order) as ranges"""
+        return cls(id_ranges=encode_sequence_runs(ids))
+
+    def iter_ids(self) -> Iterator[int]:
+        """Lazily iterates the ids (in request order) by expanding id_ranges"""
+        return iter_sequence_runs(self.id_ranges)
+
+    def total_ids(self) -> int:
+        """The number of ids encoded (without expanding any id_ranges)"""
+        return sum(count for _, count in self.id_ranges)
@@ -19,6 +19,12 @@ class CertificatePageResponse(base.BasePageModel):
     certificates: list[CertificateResponse]
 
 
+class CertificateCursorPageResponse(base.BaseCursorPageModel):
+    """Represents a keyset (cursor) paginated response of certificates"""
+
+    certificates: list[CertificateResponse]
+
+
 class CertificateRequest(pydantic.BaseModel):
     """Represents a specific certificate to be created by the utility server"""
 
@@ -0,0 +1,115 @@
+"""Merging of the sep2 DERCapability (nameplate ratings) and DERSettings (configured limits) reported by a site into
+the single admin DERConfiguration view of that site.
+
+DER_CONFIGURATION_FIELDS maps each DERConfiguration field to its DERSettings / DERCapability source. A configured
+setting takes precedence over the equivalent rating, falling back to the rating if the setting is absent. Fields
+without a settings equivalent (eg rtgAbnormalCategory) are always taken from the capability and min_wh (which has no
+rating equivalent) is only taken from the settings. max_var_neg defaults to the negative of the merged max_var if
+neither source sets it (as per sep2).
+
+pow10 values (eg ActivePower) are decoded with from_pow10_model and hex encoded flags (eg modesSupported) are decoded
+to their IntFlag types (cached as sites typically report a small number of distinct flag combinations)."""
+
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Callable, Optional, Sequence
+
+from pydantic import TypeAdapter
+
+from envoy_schema.admin.schema.base import identity
+from envoy_schema.admin.schema.site import DERConfiguration
+from envoy_schema.server.schema.sep2.der import (
+    DERCapability,
+    DERControlType,
+    DERSettings,
+    DOESupportedMode,
+    VPPControlType,
+)
+from envoy_schema.server.schema.sep2.pow10 import from_pow10_model
+
+_der_configuration_list_adapter: TypeAdapter[list[DERConfiguration]] = TypeAdapter(list[DERConfiguration])
+
+
+@lru_cache(maxsize=1024)
+def _decode_control_type(hex_value: str) -> DERControlType:
+    return DERControlType(int(hex_value, 16))
+
+
+@lru_cache(maxsize=256)
+def _decode_doe_mode(hex_value: str) -> DOESupportedMode:
+    return DOESupportedMode(int(hex_value, 16))
+
+
+@lru_cache(maxsize=256)
+def _decode_vpp_control_type(hex_value: str) -> VPPControlType:
+    return VPPControlType(int(hex_value, 16))
+
+
+# (DERConfiguration field, DERSettings field, DERCapability field, decoder) - The table driving the merge. A None
+# settings/capability field means there is no equivalent field to source the value from.
+DER_CONFIGURATION_FIELDS: list[tuple[str, Optional[str], Optional[str], Callable[[Any], Any]]] = [
+    ("modes_supported", "modesEnabled", "modesSupported", _decode_control_type),
+    ("type", None, "type_", identity),
+    ("doe_modes_supported", "doeModesEnabled", "doeModesSupported", _decode_doe_mode),
+    ("max_w", "setMaxW", "rtgMaxW", from_pow10_model),
+    ("vpp_modes_supported", "vppModesEnabled", "vppModesSupported", _decode_vpp_control_type),
+    ("abnormal_category", None, "rtgAbnormalCategory", identity),
+    ("normal_category", None, "rtgNormalCategory", identity),
+    ("max_a", "setMaxA", "rtgMaxA", from_pow10_model),
+    ("max_ah", "setMaxAh", "rtgMaxAh", from_pow10_model),
+    ("max_charge_rate_va", "setMaxChargeRateVA", "rtgMaxChargeRateVA", from_pow10_model),
+    ("max_charge_rate_w", "setMaxChargeRateW", "rtgMaxChargeRateW", from_pow10_model),
+    ("max_discharge_rate_va", "setMaxDischargeRateVA", "rtgMaxDischargeRateVA", from_pow10_model),
+    ("max_discharge_rate_w", "setMaxDischargeRateW", "rtgMaxDischargeRateW", from_pow10_model),
+    ("max_v", "setMaxV", "rtgMaxV", from_pow10_model),
+    ("min_v", "setMinV", "rtgMinV", from_pow10_model),
+    ("min_wh", "setMinWh", None, from_pow10_model),
+    ("max_va", "setMaxVA", "rtgMaxVA", from_pow10_model),
+    ("max_var", "setMaxVar", "rtgMaxVar", from_pow10_model),
+    ("max_var_neg", "setMaxVarNeg", "rtgMaxVarNeg", from_pow10_model),
+    ("max_wh", "setMaxWh", "rtgMaxWh", from_pow10_model),
+    ("v_nom", "setVNom", "rtgVNom", from_pow10_model),
+]
+
+
+def merge_der_configurations(
+    capabilities: Sequence[DERCapability],
+    settings: Sequence[Optional[DERSettings]],
+    created_times: Sequence[datetime],
+    changed_times: Sequence[datetime],
+) -> list[DERConfiguration]:
+    """Merges each (capability, settings) pair (typically one per site) into a DERConfiguration. settings can be None
+    for sites that haven't supplied DERSettings (the nameplate ratings will be used). See module docs for details.
+
+    Raises:
+        ValueError if the inputs are different lengths"""
+    count = len(capabilities)
+    if len(settings) != count or len(created_times) != count or len(changed_times) != count:
+        raise ValueError("capabilities, settings, created_times and changed_times must be the same length.")
+
+    rows: list[dict[str, Any]] = [
+        {"created_time": created, "changed_time": changed} for created, changed in zip(created_times, changed_times)
+    ]
+
+    # Build each DERConfiguration column by column
+    for config_field, setting_field, capability_field, decoder in DER_CONFIGURATION_FIELDS:
+        for row, capability, setting in zip(rows, capabilities, settings):
+            value = None
+            if setting_field is not None and setting is not None:
+                value = getattr(setting, setting_field)
+            if value is None and capability_field is not None:
+                value = getattr(capability, capability_field)
+            row[config_field] = decoder(value) if value is not None else None
+
+    for row in rows:
+        if row["max_var_neg"] is None and row["max_var"] is not None:
+            row["max_var_neg"] = -row["max_var"]
+
+    return _der_configuration_list_adapter.validate_python(rows)
+
+
+def merge_der_configuration(
+    capability: DERCapability, settings: Optional[DERSettings], created_time: datetime, changed_time: datetime
+) -> DERConfiguration:
+    """Merges capability and settings (if any) for a single site. See merge_der_configurations for details"""
+    return merge_der_configurations([capability], [settings], [created_time], [changed_time])[0]
@@ -0,0 +1,50 @@
+"""Bulk consistency checks of the LFDI / SFDI values in admin models (eg during bulk onboarding of devices)"""
+
+from typing import Iterable, Optional
+
+from envoy_schema.admin.schema.certificate import CertificateRequest
+from envoy_schema.admin.schema.site import SiteResponse
+from envoy_schema.server.schema.sep2.device_identifier import (
+    is_valid_lfdi,
+    lfdi_from_fingerprint,
+    verify_lfdi_sfdi_batch,
+)
+
+
+def validate_site_identities(sites: Iterable[SiteResponse]) -> list[tuple[int, str]]:
+    """Checks every site has a valid lfdi / sfdi that are consistent with each other. Returns (site_id, description)
+    for every inconsistent site."""
+    sites = list(sites)
+    errors = verify_lfdi_sfdi_batch((s.lfdi, s.sfdi) for s in sites)
+    return [(sites[idx].site_id, error) for idx, error in errors]
+
+
+def validate_certificate_requests(
+    requests: Iterable[CertificateRequest],
+    fingerprints: Optional[Iterable[bytes]] = None,
+    sites: Optional[Iterable[SiteResponse]] = None,
+) -> list[tuple[int, str]]:
+    """Checks every certificate request has a valid lfdi. If fingerprints are specified, each request's lfdi must match
+    the corresponding certificate fingerprint. If sites are specified, each request's lfdi must belong to one of sites.
+    Returns (index, description) for every invalid request.
+
+    Raises:
+        ValueError if fingerprints is a different length to requests"""
+    requests = list(requests)
+    fingerprint_list: Optional[list[bytes]] = None
+    if fingerprints is not None:
+        fingerprint_list = list(fingerprints)
+        if len(fingerprint_list) != len(requests):
+            raise ValueError(f"Got {len(fingerprint_list)} fingerprints for {len(requests)} requests.")
+    site_lfdis = {s.lfdi.upper() for s in sites} if sites is not None else None
+
+    errors: list[tuple[int, str]] = []
+    for idx, request in enumerate(requests):
+        lfdi = request.lfdi.upper()
+        if not is_valid_lfdi(lfdi):
+            errors.append((idx, f"lfdi '{request.lfdi}' is not a valid LFDI."))
+        elif fingerprint_list is not None and lfdi != lfdi_from_fingerprint(fingerprint_list[idx]):
+            errors.append((idx, f"lfdi '{request.lfdi}' does not match the certificate fingerprint."))
+        elif site_lfdis is not None and lfdi not in site_lfdis:
+            errors.append((idx, f"lfdi '{request.lfdi}' does not match any site."))
+    return errors
@@ -0,0 +1,99 @@
+"""Fixed point alternatives to the Decimal heavy admin models. A fixed point model replaces every Decimal field with an
+int and adds a single pow10_multiplier such that decimal_value = int_value * 10 ^ pow10_multiplier (the same approach
+as the sep2 ActivePower / pow10 encodings). Ints are considerably cheaper to validate/serialise than Decimals."""
+
+from decimal import Decimal
+from functools import lru_cache
+from typing import Any, Optional, Union, get_args, get_origin
+
+from pydantic import BaseModel, create_model
+
+from envoy_schema.server.schema.sep2.pow10 import decode_pow10
+
+POW10_MULTIPLIER_FIELD = "pow10_multiplier"
+
+_original_model_types: dict[type[BaseModel], type[BaseModel]] = {}
+
+
+def _replace_decimal(annotation: Any) -> Any:
+    """Creates a copy of annotation with Decimal replaced with int (supports Decimal and Optional[Decimal])"""
+    if annotation is Decimal:
+        return int
+    if get_origin(annotation) is Union:
+        return Union[tuple(_replace_decimal(a) for a in get_args(annotation))]
+    return annotation
+
+
+@lru_cache(maxsize=None)
+def decimal_fields(model_type: type[BaseModel]) -> tuple[str, ...]:
+    """The names of every Decimal / Optional[Decimal] field in model_type"""
+    return tuple(n for n, f in model_type.model_fields.items() if _replace_decimal(f.annotation) != f.annotation)
+
+
+@lru_cache(maxsize=None)
+def fixed_point_model(model_type: type[BaseModel]) -> type[BaseModel]:
+    """Creates (or fetches from cache) a model class derived from model_type where every Decimal / Optional[Decimal]
+    field is replaced with int / Optional[int] and a pow10_multiplier field is added. All other fields are unchanged."""
+    if POW10_MULTIPLIER_FIELD in model_type.model_fields:
+        raise ValueError(f"{model_type.__name__} already has a field called {POW10_MULTIPLIER_FIELD}")
+
+    field_definitions: dict[str, Any] = {
+        n: (_replace_decimal(f.annotation), f) for n, f in model_type.model_fields.items()
+    }
+    field_definitions[POW10_MULTIPLIER_FIELD] = (int, ...)
+    fixed_type = create_model(f"{model_type.__name__}FixedPoint", **field_definitions)
+    _original_model_types[fixed_type] = model_type
+    return fixed_type
+
+
+def _min_exponent(values: list[Optional[Decimal]]) -> int:
+    """The largest power of ten that can exactly encode every value as an int (0 if there are no values)"""
+    exponents = [int(v.normalize().as_tuple().exponent) for v in values if v is not None and v != 0]
+    return min(exponents) if exponents else 0
+
+
+def to_fixed_point(instance: BaseModel, pow10_multiplier: Optional[int] = None) -> BaseModel:
+    """Converts instance to the equivalent fixed_point_model(type(instance)). If pow10_multiplier is None, the largest
+    power of ten that exactly encodes every Decimal will be used.
+
+    Raises:
+        ValueError if a Decimal can't be exactly encoded using pow10_multiplier"""
+    model_type = type(instance)
+    names = decimal_fields(model_type)
+    data = {n: getattr(instance, n) for n in model_type.model_fields.keys()}
+    if pow10_multiplier is None:
+        pow10_multiplier = _min_exponent([data[n] for n in names])
+
+    for name in names:
+        value: Optional[Decimal] = data[name]
+        if value is None:
+            continue
+
+        scaled = value.scaleb(-pow10_multiplier)
+        if scaled != scaled.to_integral_value():
+            raise ValueError(f"{name} value {value} can't be exactly encoded with pow10_multiplier {pow10_multiplier}")
+        data[name] = int(scaled)
+
+    return fixed_point_model(model_type).model_construct(
+        _fields_set=instance.model_fields_set | {POW10_MULTIPLIER_FIELD}, pow10_multiplier=pow10_multiplier, **data
+    )
+
+
+def from_fixed_point(instance: BaseModel) -> BaseModel:
+    """Converts a fixed point instance (created from fixed_point_model) back to its original (Decimal) model type. A
+    positive pow10_multiplier decodes to integer Decimals (eg Decimal("1500") not Decimal("1.5E+3")) - see decode_pow10
+
+    Raises:
+        ValueError if instance isn't a fixed point model"""
+    model_type = _original_model_types.get(type(instance), None)
+    if model_type is None:
+        raise ValueError(f"{type(instance)} is not a fixed point model.")
+
+    pow10_multiplier: int = getattr(instance, POW10_MULTIPLIER_FIELD)
+    data = {n: getattr(instance, n) for n in model_type.model_fields.keys()}
+    for name in decimal_fields(model_type):
+        if data[name] is not None:
+            data[name] = decode_pow10(data[name], pow10_multiplier)
+
+    fields_set = instance.model_fields_set - {POW10_MULTIPLIER_FIELD}
+    return model_type.model_construct(_fields_set=fields_set, **data)
@@ -0,0 +1,180 @@
+"""An in-memory index for resolving a client's identity (LFDI / SFDI / aggregator domain) to the matching sites,
+certificates and aggregators. The index is bulk loaded from the admin page responses and can then be kept up to date
+from archive deltas / the site change feed rather than re-fetching every page."""
+
+from typing import Iterable, Optional
+
+from envoy_schema.admin.schema.aggregator import (
+    AggregatorDomainPageResponse,
+    AggregatorPageResponse,
+    AggregatorResponse,
+)
+from envoy_schema.admin.schema.archive import ArchivePageResponse, ArchiveSiteResponse
+from envoy_schema.admin.schema.certificate import CertificatePageResponse, CertificateResponse
+from envoy_schema.admin.schema.site import SitePageResponse, SiteResponse
+from envoy_schema.admin.schema.site_change_feed import SiteChange
+
+
+def normalise_lfdi(lfdi: str) -> str:
+    """LFDIs are hex encoded and case insensitive - this is the form used as an index key"""
+    return lfdi.strip().lower()
+
+
+def normalise_domain(domain: str) -> str:
+    """Domains are case insensitive (and may include a trailing root ".") - this is the form used as an index key"""
+    return domain.strip().rstrip(".").lower()
+
+
+class IdentityIndex:
+    """Hash based lookups of sites (by lfdi / sfdi), certificates (by lfdi) and aggregator_id (by domain)"""
+
+    sites: dict[int, SiteResponse]  # Every indexed site keyed by site_id
+    certificates: dict[str, CertificateResponse]  # Every indexed certificate keyed by normalise_lfdi(lfdi)
+    aggregator_ids: dict[str, int]  # aggregator_id keyed by normalise_domain(domain)
+
+    _site_ids_by_lfdi: dict[str, set[int]]
+    _site_ids_by_sfdi: dict[int, set[int]]
+    _domains_by_aggregator_id: dict[int, set[str]]
+
+    def __init__(self) -> None:
+        self.sites = {}
+        self.certificates = {}
+        self.aggregator_ids = {}
+        self._site_ids_by_lfdi = {}
+        self._site_ids_by_sfdi = {}
+        self._domains_by_aggregator_id = {}
+
+    @classmethod
+    def from_pages(
+        cls,
+        site_pages: Iterable[SitePageResponse] = (),
+        certificate_pages: Iterable[CertificatePageResponse] = (),
+        aggregator_pages: Iterable[AggregatorPageResponse] = (),
+    ) -> "IdentityIndex":
+        """Bulk loads a new index from the specified pages"""
+        index = cls()
+        for site_page in site_pages:
+            index.add_sites(site_page.sites)
+        for certificate_page in certificate_pages:
+            index.add_certificates(certificate_page.certificates)
+        for aggregator_page in aggregator_pages:
+            for aggregator in aggregator_page.aggregators:
+                index.add_aggregator(aggregator)
+        return index
+
+    def add_site(self, site: SiteResponse) -> None:
+        """Adds site to the index (replacing any existing site with the same site_id)"""
+        self.remove_site(site.site_id)
+        self.sites[site.site_id] = site
+        self._site_ids_by_lfdi.setdefault(normalise_lfdi(site.lfdi), set()).add(site.site_id)
+        self._site_ids_by_sfdi.setdefault(site.sfdi, set()).add(site.site_id)
+
+    def add_sites(self, sites: Iterable[SiteResponse]) -> None:
+        for site in sites:
+            self.add_site(site)
+
+    def remove_site(self, site_id: int) -> Optional[SiteResponse]:
+        """Removes site_id from the index. Returns the removed site (if any)"""
+        site = self.sites.pop(site_id, None)
+        if site is None:
+            return None
+
+        lfdi = normalise_lfdi(site.lfdi)
+        lfdi_ids = self._site_ids_by_lfdi[lfdi]
+        lfdi_ids.discard(site_id)
+        if not lfdi_ids:
+            del self._site_ids_by_lfdi[lfdi]
+
+        sfdi_ids = self._site_ids_by_sfdi[site.sfdi]
+        sfdi_ids.discard(site_id)
+        if not sfdi_ids:
+            del self._site_ids_by_sfdi[site.sfdi]
+        return site
+
+    def apply_site_archive(self, page: ArchivePageResponse[ArchiveSiteResponse]) -> int:
+        """Removes every deleted site (archive entities with a deleted_time) in page. Archive entities without a
+        deleted_time are the PREVIOUS state of an updated site and are ignored (the new state should be added via
+        add_site / apply_site_changes). Returns the number of sites removed."""
+        removed = 0
+        for archived in page.entities:
+            if archived.deleted_time is not None and self.remove_site(archived.site_id) is not None:
+                removed += 1
+        return removed
+
+    def apply_site_changes(self, changes: Iterable[SiteChange]) -> None:
+        """Applies the upserts/deletions from a site change feed (in order)"""
+        for change in changes:
+            if change.site is None:
+                self.remove_site(change.site_id)
+            else:
+                self.add_site(change.site)
+
+    def sites_by_lfdi(self, lfdi: str, aggregator_id: Optional[int] = None) -> list[SiteResponse]:
+        """Finds every site with lfdi (optionally only those belonging to aggregator_id)"""
+        site_ids = self._site_ids_by_lfdi.get(normalise_lfdi(lfdi), None)
+        if not site_ids:
+            return []
+        return [
+            self.sites[s] for s in site_ids if aggregator_id is None or self.sites[s].aggregator_id == aggregator_id
+        ]
+
+    def sites_by_sfdi(self, sfdi: int, aggregator_id: Optional[int] = None) -> list[SiteResponse]:
+        """Finds every site with sfdi (optionally only those belonging to aggregator_id)"""
+        site_ids = self._site_ids_by_sfdi.get(sfdi, None)
+        if not site_ids:
+            return []
+        return [
+            self.sites[s] for s in site_ids if aggregator_id is None or self.sites[s].aggregator_id == aggregator_id
+        ]
+
+    def get_site_by_lfdi(self, lfdi: str, aggregator_id: int) -> Optional[SiteResponse]:
+        """Finds the site with lfdi belonging to aggregator_id (if any)"""
+        sites = self.sites_by_lfdi(lfdi, aggregator_id)
+        return sites[0] if sites else None
+
+    def get_site_by_sfdi(self, sfdi: int, aggregator_id: int) -> Optional[SiteResponse]:
+        """Finds the site with sfdi belonging to aggregator_id (if any)"""
+        sites = self.sites_by_sfdi(sfdi, aggregator_id)
+        return sites[0] if sites else None
+
+    def add_certificates(self, certificates: Iterable[CertificateResponse]) -> None:
+        """Adds certificates to the index (replacing any existing certificates with the same lfdi)"""
+        for certificate in certificates:
+            self.certificates[normalise_lfdi(certificate.lfdi)] = certificate
+
+    def remove_certificate(self, lfdi: str) -> Optional[CertificateResponse]:
+        """Removes the certificate with lfdi from the index. Returns the removed certificate (if any)"""
+        return self.certificates.pop(normalise_lfdi(lfdi), None)
+
+    def get_certificate(self, lfdi: str) -> Optional[CertificateResponse]:
+        """Finds the certificate with lfdi (if any)"""
+        return self.certificates.get(normalise_lfdi(lfdi), None)
+
+    def add_aggregator(self, aggregator: AggregatorResponse) -> None:
+        """Adds aggregator's domains to the index. Any existing domains for aggregator will be replaced"""
+        self.remove_aggregator(aggregator.aggregator_id)
+        for domain in aggregator.domains:
+            self.add_aggregator_domain(aggregator.aggregator_id, domain.domain)
+
+    def add_aggregator_domain(self, aggregator_id: int, domain: str) -> None:
+        """Adds a single domain for aggregator_id (replacing any other aggregator's use of domain)"""
+        key = normalise_domain(domain)
+        existing_id = self.aggregator_ids.get(key, None)
+        if existing_id is not None:
+            self._domains_by_aggregator_id[existing_id].discard(key)
+        self.aggregator_ids[key] = aggregator_id
+        self._domains_by_aggregator_id.setdefault(aggregator_id, set()).add(key)
+
+    def add_aggregator_domains(self, page: AggregatorDomainPageResponse) -> None:
+        """Adds every aggregator domain in page"""
+        for domain in page.aggregator_domains:
+            self.add_aggregator_domain(domain.aggregator_id, domain.domain)
+
+    def remove_aggregator(self, aggregator_id: int) -> None:
+        """Removes every domain for aggregator_id from the index"""
+        for key in self._domains_by_aggregator_id.pop(aggregator_id, set()):
+            del self.aggregator_ids[key]
+
+    def get_aggregator_id(self, domain: str) -> Optional[int]:
+        """Finds the aggregator_id that controls domain (if any)"""
+        return self.aggregator_ids.get(normalise_domain(domain), None)
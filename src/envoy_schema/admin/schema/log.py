@@ -1,7 +1,10 @@
 from datetime import datetime
-from typing import Optional
+from itertools import groupby, repeat
+from typing import Any, Optional, Sequence, TypeVar
 
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
+
+from envoy_schema.admin.schema.base import encode_sequence_runs, iter_sequence_runs
 
 
 class CalculationLogVariableMetadata(BaseModel):
@@ -67,6 +70,114 @@ class CalculationLogVariableValues(BaseModel):
     # The actual time series value associated with the linked variable_id, site_id and interval_period
     values: list[float]  # Must correspond 1-1 with each other list in this type
 
+    @model_validator(mode="before")
+    @classmethod
+    def expand_run_length_encoded(cls, data: Any) -> Any:
+        """Allows a CalculationLogVariableValuesRunLengthEncoded payload to be parsed directly as a
+        CalculationLogVariableValues. Any other input is passed through untouched."""
+        if isinstance(data, dict) and "variable_ids" not in data and "variable_id_runs" in data:
+            encoded = CalculationLogVariableValuesRunLengthEncoded.model_validate(data)
+            return {
+                "variable_ids": _expand_value_runs(encoded.variable_id_runs),
+                "site_ids": _expand_value_runs(encoded.site_id_runs),
+                "interval_periods": list(iter_sequence_runs(encoded.interval_period_runs)),
+                "values": encoded.values,
+            }
+        return data
+
+    def to_run_length_encoded(self) -> "CalculationLogVariableValuesRunLengthEncoded":
+        """Converts this instance into the equivalent CalculationLogVariableValuesRunLengthEncoded. The encoding is
+        lossless for any ordering of values but will be most effective for the server's defined sort order."""
+        return CalculationLogVariableValuesRunLengthEncoded(
+            variable_id_runs=_encode_value_runs(self.variable_ids),
+            site_id_runs=_encode_value_runs(self.site_ids),
+            interval_period_runs=encode_sequence_runs(self.interval_periods),
+            values=self.values,
+        )
+
+
+RunValueType = TypeVar("RunValueType", int, Optional[int])
+
+
+def _encode_value_runs(items: list[RunValueType]) -> list[tuple[RunValueType, int]]:
+    """Encodes items as a list of (value, count) runs of repeated values"""
+    runs: list[tuple[RunValueType, int]] = []
+    for value, group in groupby(items):
+        runs.append((value, sum(1 for _ in group)))
+    return runs
+
+
+def _expand_value_runs(runs: list[tuple[RunValueType, int]]) -> list[RunValueType]:
+    """Reverses _encode_value_runs"""
+    items: list[RunValueType] = []
+    for value, count in runs:
+        items.extend(repeat(value, count))
+    return items
+
+
+class CalculationLogVariableValuesRunLengthEncoded(BaseModel):
+    """An alternative encoding of CalculationLogVariableValues that exploits the long runs created by the server sort
+    order (variable_id, site_id, interval_period). Values are kept as is but the other lists are replaced with runs:
+
+        variable_id_runs / site_id_runs: [value, count] pairs - value repeated count times
+        interval_period_runs: [start, count] pairs - expands to start, start + 1, ..., start + count - 1
+
+    eg: {
+      variable_id_runs: [[1, 4]]
+      site_id_runs: [[3, 2], [None, 2]]
+      interval_period_runs: [[5, 2], [0, 2]]
+      values: [7.7, 8.8, 9.9, 10.1]
+    }
+
+    Logically represents:
+
+    [
+        {variable_id: 1, site_id: 3, interval_period: 5, value: 7.7},
+        {variable_id: 1, site_id: 3, interval_period: 6, value: 8.8},
+        {variable_id: 1, site_id: None, interval_period: 0, value: 9.9},
+        {variable_id: 1, site_id: None, interval_period: 1, value: 10.1},
+    ]
+
+    This payload can be parsed directly as a CalculationLogVariableValues (which will expand the runs)
+    """
+
+    variable_id_runs: list[tuple[int, int]]  # (variable_id, count) runs. Counts must sum to len(values)
+    site_id_runs: list[tuple[Optional[int], int]]  # (site_id, count) runs. Counts must sum to len(values)
+    interval_period_runs: list[tuple[int, int]]  # (start, count) runs. Counts must sum to len(values)
+    values: list[float]  # The actual time series values (identical to CalculationLogVariableValues.values)
+
+    @model_validator(mode="after")
+    def validate_run_counts(self) -> "CalculationLogVariableValuesRunLengthEncoded":
+        """Validates that every set of runs is positive and expands to exactly len(values) elements
+
+        Raises:
+            ValueError if any run list is inconsistent with values
+        """
+        expected = len(self.values)
+        all_runs: list[tuple[str, Sequence[tuple[Optional[int], int]]]] = [
+            ("variable_id_runs", self.variable_id_runs),
+            ("site_id_runs", self.site_id_runs),
+            ("interval_period_runs", self.interval_period_runs),
+        ]
+        for name, runs in all_runs:
+            total = 0
+            for _, count in runs:
+                if count <= 0:
+                    raise ValueError(f"{name} must only contain positive counts")
+                total += count
+            if total != expected:
+                raise ValueError(f"{name} expands to {total} elements but there are {expected} values")
+        return self
+
+    def to_variable_values(self) -> CalculationLogVariableValues:
+        """Expands this instance into the equivalent CalculationLogVariableValues"""
+        return CalculationLogVariableValues.model_construct(
+            variable_ids=_expand_value_runs(self.variable_id_runs),
+            site_ids=_expand_value_runs(self.site_id_runs),
+            interval_periods=list(iter_sequence_runs(self.interval_period_runs)),
+            values=self.values,
+        )
+
 
 class CalculationLogLabelValues(BaseModel):
     """This is a compact representation of MANY label instances. It's expected that EVERY property list has the
@@ -108,6 +219,98 @@ class CalculationLogLabelValues(BaseModel):
     # The actual label values associated with the linked label_id and site_id
     values: list[str]  # Must correspond 1-1 with each other list in this type
 
+    @model_validator(mode="before")
+    @classmethod
+    def expand_dict_encoded(cls, data: Any) -> Any:
+        """Allows a CalculationLogLabelValuesDictEncoded payload (value_table + value_codes instead of values) to be
+        parsed directly as a CalculationLogLabelValues. Any other input is passed through untouched."""
+        if isinstance(data, dict) and "values" not in data and "value_codes" in data:
+            encoded = CalculationLogLabelValuesDictEncoded.model_validate(data)
+            value_table = encoded.value_table
+            return {
+                "label_ids": encoded.label_ids,
+                "site_ids": encoded.site_ids,
+                "values": [value_table[c] for c in encoded.value_codes],
+            }
+        return data
+
+    def to_dict_encoded(self) -> "CalculationLogLabelValuesDictEncoded":
+        """Converts this instance into the equivalent CalculationLogLabelValuesDictEncoded. Strings in value_table
+        will be ordered by their first appearance in values."""
+        value_table: list[str] = []
+        code_lookup: dict[str, int] = {}
+        value_codes: list[int] = []
+        for v in self.values:
+            code = code_lookup.get(v, None)
+            if code is None:
+                code = len(value_table)
+                code_lookup[v] = code
+                value_table.append(v)
+            value_codes.append(code)
+
+        return CalculationLogLabelValuesDictEncoded(
+            label_ids=self.label_ids, site_ids=self.site_ids, value_table=value_table, value_codes=value_codes
+        )
+
+
+class CalculationLogLabelValuesDictEncoded(BaseModel):
+    """An alternative encoding of CalculationLogLabelValues for when the same label values repeat many times. Instead of
+    a list of values, a table of unique strings is provided alongside a list of integer codes that index into that
+    table. All other properties are identical to CalculationLogLabelValues.
+
+    eg: {
+      label_ids: [1, 1, 2]
+      site_ids: [3, 4, None]
+      value_table: ["constrained", "Feeder 1"]
+      value_codes: [0, 0, 1]
+    }
+
+    Logically represents:
+
+    [
+        {label_id: 1, site_id: 3, value: "constrained"},
+        {label_id: 1, site_id: 4, value: "constrained"},
+        {label_id: 2, site_id: None, value: "Feeder 1"},
+    ]
+
+    This payload can be parsed directly as a CalculationLogLabelValues (which will expand the codes)
+    """
+
+    label_ids: list[int]  # Must correspond 1-1 with value_codes / site_ids
+    site_ids: list[Optional[int]]  # Must correspond 1-1 with value_codes / label_ids
+    value_table: list[str]  # The unique label values referenced by value_codes
+    value_codes: list[int]  # Index into value_table. Must correspond 1-1 with label_ids / site_ids
+
+    @model_validator(mode="after")
+    def validate_codes_in_table(self) -> "CalculationLogLabelValuesDictEncoded":
+        """Validates that label_ids / site_ids / value_codes are the same length and that every element in value_codes
+        references an element in value_table
+
+        Raises:
+            ValueError if the lists are different lengths or any value_code is out of range
+        """
+        expected = len(self.value_codes)
+        columns: list[tuple[str, Sequence[Optional[int]]]] = [
+            ("label_ids", self.label_ids),
+            ("site_ids", self.site_ids),
+        ]
+        for name, values in columns:
+            if len(values) != expected:
+                raise ValueError(f"{name} has {len(values)} elements but value_codes has {expected} elements")
+        if self.value_codes and (min(self.value_codes) < 0 or max(self.value_codes) >= len(self.value_table)):
+            raise ValueError(f"value_codes must be in the range [0, {len(self.value_table)})")
+        return self
+
+    def to_label_values(self) -> CalculationLogLabelValues:
+        """Expands this instance into the equivalent CalculationLogLabelValues. Repeated values will all reference the
+        same str instance from value_table."""
+        value_table = self.value_table
+        return CalculationLogLabelValues.model_construct(
+            label_ids=self.label_ids,
+            site_ids=self.site_ids,
+            values=[value_table[c] for c in self.value_codes],
+        )
+
 
 class CalculationLogRequest(BaseModel):
     """Represents the top level entity describing a single audit log of a historical calculation run.
@@ -157,6 +360,19 @@ class CalculationLogRequest(BaseModel):
     # The labels will have a defined sort order (see docs on CalculationLogLabelValues)
     label_values: Optional[CalculationLogLabelValues]
 
+    def model_dump_compact(self) -> dict[str, Any]:
+        """Equivalent to model_dump(mode="json") but variable_values will be encoded as a
+        CalculationLogVariableValuesRunLengthEncoded and label_values as a CalculationLogLabelValuesDictEncoded. The
+        result can be validated by this model type, as per normal."""
+        dumped = self.model_dump(mode="json", exclude={"variable_values", "label_values"})
+        dumped["variable_values"] = (
+            self.variable_values.to_run_length_encoded().model_dump(mode="json") if self.variable_values else None
+        )
+        dumped["label_values"] = (
+            self.label_values.to_dict_encoded().model_dump(mode="json") if self.label_values else None
+        )
+        return dumped
+
 
 class CalculationLogResponse(CalculationLogRequest):
     """Represents the top level entity describing a single audit log of a historical calculation run.
@@ -0,0 +1,109 @@
+"""Newline delimited JSON (NDJSON) streaming of the admin page models. A streamed page is encoded as a "header" line
+(every page property except the list of items) followed by one line per item. This allows large exports to be
+written/read one item at a time rather than buffering (and validating) an entire page."""
+
+import json
+from typing import Any, Iterable, Iterator, TypeVar, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+ItemType = TypeVar("ItemType", bound=BaseModel)
+PageType = TypeVar("PageType", bound=BaseModel)
+
+
+def _is_model_type(t: Any) -> bool:
+    """True if t is a BaseModel type (or a TypeVar that can only be BaseModel types)"""
+    if isinstance(t, TypeVar):
+        if t.__constraints__:
+            return all(_is_model_type(c) for c in t.__constraints__)
+        return _is_model_type(t.__bound__)
+    return isinstance(t, type) and issubclass(t, BaseModel)
+
+
+def get_page_items_field(page_type: type[BaseModel]) -> tuple[str, Any]:
+    """Finds the (name, item type) of the list[BaseModel] property of a page model eg: ("sites", SiteResponse) for
+    SitePageResponse. For an unparameterised generic page (eg ArchivePageResponse) the item type will be the TypeVar.
+
+    Raises:
+        ValueError if page_type doesn't have exactly one list[BaseModel] property"""
+    items_fields: list[tuple[str, Any]] = []
+    for name, field in page_type.model_fields.items():
+        args = get_args(field.annotation)
+        if get_origin(field.annotation) is list and _is_model_type(args[0]):
+            items_fields.append((name, args[0]))
+
+    if len(items_fields) != 1:
+        raise ValueError(f"{page_type} has {len(items_fields)} list[BaseModel] properties. Expected exactly 1.")
+    return items_fields[0]
+
+
+def iter_ndjson_items(items: Iterable[BaseModel]) -> Iterator[bytes]:
+    """Lazily encodes items as NDJSON lines (including the trailing newline)"""
+    for item in items:
+        yield item.model_dump_json().encode() + b"\n"
+
+
+def iter_ndjson_page(page: BaseModel) -> Iterator[bytes]:
+    """Lazily encodes page as a header line followed by one line per item (each including the trailing newline).
+    Can be decoded with parse_ndjson_page."""
+    items_name, _ = get_page_items_field(type(page))
+    yield page.model_dump_json(exclude={items_name}).encode() + b"\n"
+    yield from iter_ndjson_items(getattr(page, items_name))
+
+
+def split_ndjson_chunks(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Incrementally splits arbitrarily sized chunks of bytes (eg from a socket) into complete NDJSON lines. Only
+    the current partial line is buffered (as a list of parts that are only joined once the line is complete, so a
+    long line split over many chunks isn't repeatedly copied/rescanned)."""
+    parts: list[bytes] = []
+    for chunk in chunks:
+        lines = chunk.split(b"\n")
+        if len(lines) == 1:
+            if chunk:
+                parts.append(chunk)
+            continue
+
+        parts.append(lines[0])
+        yield b"".join(parts)
+        yield from lines[1:-1]
+        parts = [lines[-1]] if lines[-1] else []
+    if parts:
+        yield b"".join(parts)
+
+
+def parse_ndjson_items(lines: Iterable[Union[str, bytes]], item_type: type[ItemType]) -> Iterator[ItemType]:
+    """Lazily validates each (non blank) line as an instance of item_type
+
+    Raises:
+        pydantic.ValidationError (when iterating) if a line isn't valid for item_type"""
+    for line in lines:
+        if line.strip():
+            yield item_type.model_validate_json(line)
+
+
+def parse_ndjson_page(lines: Iterable[Union[str, bytes]], page_type: type[PageType]) -> tuple[PageType, Iterator[Any]]:
+    """Reverses iter_ndjson_page. The header line is consumed immediately and returned as an instance of page_type
+    (with an empty list of items) alongside a lazy iterator of the items (which consumes the remaining lines)
+
+    Raises:
+        ValueError if lines is empty, the header line isn't a JSON object or page_type is an unparameterised generic
+        pydantic.ValidationError if the header / any item line is invalid"""
+    items_name, item_type = get_page_items_field(page_type)
+    if isinstance(item_type, TypeVar):
+        raise ValueError(f"{page_type} must be parameterised eg: ArchivePageResponse[ArchiveSiteResponse]")
+
+    line_iter = iter(lines)
+    for line in line_iter:
+        if line.strip():
+            header_data = json.loads(line)
+            if not isinstance(header_data, dict):
+                raise ValueError(f"NDJSON page header must be a JSON object. Got {type(header_data).__name__}.")
+            header_data[items_name] = []
+            header = page_type.model_validate(header_data)
+            break
+    else:
+        raise ValueError("No header line found in NDJSON page.")
+
+    return header, parse_ndjson_items(line_iter, item_type)
@@ -1,7 +1,7 @@
-from datetime import datetime
-from typing import Optional
+from datetime import datetime, timezone
+from typing import Any, Iterator, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
 
 from envoy_schema.server.schema.sep2.types import (
     AccumulationBehaviourType,
@@ -76,6 +76,145 @@ class TariffGeneratedRateRequest(BaseModel):
     price_pow10_encoded_block_1: Optional[int] = None  # Price used after price_pow10_encoded_block_1 consumption
 
 
+def _to_epoch_seconds(value: datetime) -> int:
+    """Converts a timezone aware datetime with no sub second precision to epoch seconds
+
+    Raises:
+        ValueError if value is naive or has sub second precision"""
+    if value.tzinfo is None or value.utcoffset() is None:
+        raise ValueError(f"start_time {value} must be timezone aware.")
+    if value.microsecond:
+        raise ValueError(f"start_time {value} can't have sub second precision.")
+    return int(value.timestamp())
+
+
+class TariffGeneratedRateBatchRequest(BaseModel):
+    """A columnar alternative to a list[TariffGeneratedRateRequest] for submitting large numbers of rates. Every list
+    property must correspond 1-1 with site_id such that the Xth element of each list describes the Xth rate. Times are
+    encoded as epoch seconds (UTC) rather than datetime strings. The optional block columns must be specified (or
+    omitted) together.
+
+    eg: {
+      tariff_component_id: 1
+      calculation_log_id: 5
+      site_id: [1, 2]
+      start_time: [1704153600, 1704153600]
+      duration_seconds: [300, 300]
+      price_pow10_encoded: [123, 456]
+    }
+
+    Logically represents:
+
+    [
+        {tariff_component_id: 1, calculation_log_id: 5, site_id: 1, start_time: 2024-01-02T00:00:00Z, ... },
+        {tariff_component_id: 1, calculation_log_id: 5, site_id: 2, start_time: 2024-01-02T00:00:00Z, ... },
+    ]
+
+    Submitting this in place of a list[TariffGeneratedRateRequest] will return a BatchCreateResponse whose ids
+    correspond 1-1 with the expanded rows. Clients that opt in to the compact encoding will instead receive a
+    BatchCreateRangeResponse (the ids of a batch are typically contiguous so this is a handful of ranges regardless of
+    the batch size). See TariffGeneratedRateRequest for documentation on each of the fields."""
+
+    tariff_component_id: int  # Shared by every rate in this batch
+    calculation_log_id: Optional[int]  # Shared by every rate in this batch
+
+    site_id: list[int]
+    start_time: list[int]  # Epoch seconds (UTC)
+    duration_seconds: list[int]  # Must be strictly positive
+    price_pow10_encoded: list[int]
+    block_1_start_pow10_encoded: Optional[list[Optional[int]]] = (
+        None  # If set - price_pow10_encoded_block_1 must be set
+    )
+    price_pow10_encoded_block_1: Optional[list[Optional[int]]] = (
+        None  # If set - block_1_start_pow10_encoded must be set
+    )
+
+    @model_validator(mode="after")
+    def validate_columns(self) -> "TariffGeneratedRateBatchRequest":
+        """Validates that column lengths match, durations are positive and block columns are paired
+
+        Raises:
+            ValueError if any of the above checks fail
+        """
+        expected = len(self.site_id)
+        for name in TARIFF_GENERATED_RATE_BATCH_COLUMNS:
+            column = getattr(self, name)
+            if column is not None and len(column) != expected:
+                raise ValueError(f"{name} has {len(column)} elements but site_id has {expected} elements.")
+
+        if self.duration_seconds and min(self.duration_seconds) <= 0:
+            raise ValueError("duration_seconds must only contain positive values.")
+
+        block_starts = self.block_1_start_pow10_encoded
+        block_prices = self.price_pow10_encoded_block_1
+        if (block_starts is None) != (block_prices is None):
+            raise ValueError("block_1_start_pow10_encoded and price_pow10_encoded_block_1 must be set together.")
+        if block_starts is not None and block_prices is not None:
+            if any((s is None) != (p is None) for s, p in zip(block_starts, block_prices)):
+                raise ValueError("block_1_start_pow10_encoded and price_pow10_encoded_block_1 must be None together.")
+        return self
+
+    def iter_tariff_generated_rate_requests(self) -> Iterator[TariffGeneratedRateRequest]:
+        """Lazily expands this batch into TariffGeneratedRateRequest instances (one per row). As this batch has already
+        been validated, the yielded instances are constructed without revalidation."""
+        names = [name for name in TARIFF_GENERATED_RATE_BATCH_COLUMNS if getattr(self, name) is not None]
+        shared: dict[str, Any] = {
+            "tariff_component_id": self.tariff_component_id,
+            "calculation_log_id": self.calculation_log_id,
+        }
+
+        # rates are typically submitted in blocks that share a start_time - avoid recreating identical datetimes
+        start_times: dict[int, datetime] = {}
+        for row in zip(*(getattr(self, name) for name in names)):
+            values = dict(zip(names, row))
+            epoch = values["start_time"]
+            start_time = start_times.get(epoch, None)
+            if start_time is None:
+                start_time = datetime.fromtimestamp(epoch, tz=timezone.utc)
+                start_times[epoch] = start_time
+            values["start_time"] = start_time
+            yield TariffGeneratedRateRequest.model_construct(**shared, **values)
+
+    @classmethod
+    def from_tariff_generated_rate_requests(
+        cls, requests: list[TariffGeneratedRateRequest]
+    ) -> "TariffGeneratedRateBatchRequest":
+        """Creates a TariffGeneratedRateBatchRequest from a list of TariffGeneratedRateRequest's. Block columns will be
+        omitted if every value is None. The resulting batch is validated (see validate_columns).
+
+        Raises:
+            ValueError if requests have differing tariff_component_id / calculation_log_id values, requests is empty,
+            a start_time is naive (no timezone) or has sub second precision or the batch fails validation
+        """
+        if not requests:
+            raise ValueError("requests must contain at least one element.")
+
+        shared: dict[str, Any] = {}
+        for name in ["tariff_component_id", "calculation_log_id"]:
+            distinct_values = set(getattr(r, name) for r in requests)
+            if len(distinct_values) > 1:
+                raise ValueError(f"requests have multiple {name} values {distinct_values}.")
+            shared[name] = distinct_values.pop()
+
+        columns: dict[str, Any] = {}
+        for name in TARIFF_GENERATED_RATE_BATCH_COLUMNS:
+            if name == "start_time":
+                column = [_to_epoch_seconds(r.start_time) for r in requests]
+            else:
+                column = [getattr(r, name) for r in requests]
+            if cls.model_fields[name].is_required() or any(v is not None for v in column):
+                columns[name] = column
+        return cls(**shared, **columns)
+
+
+# The names of every TariffGeneratedRateBatchRequest list property (which map to TariffGeneratedRateRequest properties)
+TARIFF_GENERATED_RATE_BATCH_COLUMNS = [
+    n
+    for n in TariffGeneratedRateBatchRequest.model_fields.keys()
+    if n not in {"tariff_component_id", "calculation_log_id"}
+]
+
+
 class TariffGeneratedRateResponse(TariffGeneratedRateRequest):
     tariff_generated_rate_id: int
     tariff_id: int
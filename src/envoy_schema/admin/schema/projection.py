@@ -0,0 +1,90 @@
+"""Field projection (sparse fieldsets) for the admin models. A projection is a derived model class that only includes a
+subset of the original model's fields, eg: a SiteResponse projection of "site_id", "nmi" and "der_config.max_w".
+Serialising / validating a projection skips all the excluded fields (and sub models)."""
+
+from functools import lru_cache
+from typing import Any, Iterable, Optional, Union, get_args, get_origin
+
+from pydantic import BaseModel, create_model
+
+
+def parse_fieldset(raw: str) -> list[str]:
+    """Parses a comma separated fieldset (eg from a query string) like "site_id, nmi,der_config.max_w" into a list of
+    field paths"""
+    return [f.strip() for f in raw.split(",") if f.strip()]
+
+
+def _find_model_type(annotation: Any) -> Optional[type[BaseModel]]:
+    """Finds the BaseModel type in annotation if it's of the form Model, Optional[Model], list[Model] etc"""
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    for arg in get_args(annotation):
+        model_type = _find_model_type(arg)
+        if model_type is not None:
+            return model_type
+    return None
+
+
+def _replace_model_type(annotation: Any, model_type: type[BaseModel], replacement: type[BaseModel]) -> Any:
+    """Creates a copy of annotation with every reference to model_type replaced with replacement"""
+    if annotation is model_type:
+        return replacement
+
+    origin = get_origin(annotation)
+    if origin is Union:
+        return Union[tuple(_replace_model_type(a, model_type, replacement) for a in get_args(annotation))]
+    if origin is list:
+        return list[_replace_model_type(get_args(annotation)[0], model_type, replacement)]  # type: ignore[misc]
+    return annotation
+
+
+@lru_cache(maxsize=256)
+def _project_model(model_type: type[BaseModel], fields: tuple[str, ...]) -> type[BaseModel]:
+    """Cached implementation of project_model (fields must be sorted/distinct)"""
+
+    # Group the field paths by their top level name. An empty set means "include everything"
+    sub_fields: dict[str, set[str]] = {}
+    for path in fields:
+        name, _, remainder = path.partition(".")
+        if name not in model_type.model_fields:
+            raise ValueError(f"'{name}' is not a field of {model_type.__name__}")
+        existing = sub_fields.get(name, None)
+        if remainder and (existing is None or existing):
+            sub_fields.setdefault(name, set()).add(remainder)
+        else:
+            sub_fields[name] = set()
+
+    field_definitions: dict[str, Any] = {}
+    for name, field in model_type.model_fields.items():
+        if name not in sub_fields:
+            continue
+
+        annotation = field.annotation
+        if sub_fields[name]:
+            nested_type = _find_model_type(annotation)
+            if nested_type is None:
+                raise ValueError(f"'{name}' of {model_type.__name__} doesn't have any sub fields")
+            projected_type = _project_model(nested_type, tuple(sorted(sub_fields[name])))
+            annotation = _replace_model_type(annotation, nested_type, projected_type)
+        field_definitions[name] = (annotation, field)
+
+    return create_model(f"{model_type.__name__}Projection", **field_definitions)
+
+
+def project_model(model_type: type[BaseModel], fields: Iterable[str]) -> type[BaseModel]:
+    """Creates (or fetches from cache) a model class derived from model_type that only includes the specified fields.
+
+    fields are names of model_type's fields. Sub models can be partially included using a dotted path, eg:
+    "der_config.max_w" will include der_config but der_config will only include max_w. This also applies to lists of
+    sub models, eg: "sites.site_id" for a SitePageResponse. Specifying a field without a dotted path will include
+    the entire field (and all sub fields).
+
+    Raises:
+        ValueError if a field doesn't exist or a dotted path is used for a field that isn't a model
+    """
+    return _project_model(model_type, tuple(sorted(set(fields))))
+
+
+def project_instance(instance: BaseModel, fields: Iterable[str]) -> BaseModel:
+    """Converts instance to the equivalent projection of project_model(type(instance), fields)"""
+    return project_model(type(instance), fields).model_validate(instance, from_attributes=True)
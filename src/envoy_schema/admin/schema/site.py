@@ -4,6 +4,7 @@ from typing import Optional
 
 from pydantic import BaseModel
 
+from envoy_schema.admin.schema.base import BaseCursorPageModel
 from envoy_schema.server.schema.sep2.der import (
     AbnormalCategoryType,
     AlarmStatusType,
@@ -132,6 +133,14 @@ class SitePageResponse(BaseModel):
     sites: list[SiteResponse]  # The site models in this page
 
 
+class SiteCursorPageResponse(BaseCursorPageModel):
+    """Represents a keyset (cursor) paginated response of Site"""
+
+    group: Optional[str]  # The "group" filter set by the query (if any)
+    after: Optional[datetime]  # The "after" filter set by the query (if any)
+    sites: list[SiteResponse]  # The site models in this page
+
+
 class SiteUpdateRequest(BaseModel):
     """Used for updating a specific site's configuration"""
 
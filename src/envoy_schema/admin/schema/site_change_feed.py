@@ -0,0 +1,99 @@
+"""A change feed for sites merges site upserts (SiteResponse) and deletions (ArchiveSiteResponse with a deleted_time)
+into a single ordered stream that can be resumed via an opaque watermark."""
+
+import heapq
+from datetime import datetime
+from typing import Iterable, Iterator, Optional
+
+from pydantic import BaseModel
+
+from envoy_schema.admin.schema.archive import ArchiveSiteResponse
+from envoy_schema.admin.schema.base import KeysetCursor, decode_page_cursor, encode_page_cursor
+from envoy_schema.admin.schema.site import SiteResponse
+
+
+class SiteChange(BaseModel):
+    """A single change to a site. Will either be an upsert (site is set) or a deletion (deleted_time is set)"""
+
+    site_id: int  # The site that changed
+    change_time: datetime  # When the change occurred (site.changed_time or deleted_time)
+    site: Optional[SiteResponse]  # The current state of the site (if not deleted)
+    deleted_time: Optional[datetime]  # When the site was deleted (if deleted)
+
+
+class SiteChangeFeedResponse(BaseModel):
+    """Represents a page of changes to sites, ordered by change_time then site_id ASCENDING"""
+
+    limit: int  # The maximum number of changes that could've been returned (the limit set by the query)
+    watermark: Optional[str]  # The "watermark" set by the query (if any). Only changes AFTER this will be returned
+    next_watermark: Optional[str]  # Pass as watermark in a subsequent query to resume after the last change
+    changes: list[SiteChange]  # The changes in this page
+
+
+def site_change_watermark(change: SiteChange) -> str:
+    """Encodes the watermark for resuming a change feed after change"""
+    return encode_page_cursor(KeysetCursor(last_id=change.site_id, last_changed_time=change.change_time))
+
+
+def merge_site_changes(
+    sites: Iterable[SiteResponse], archived_sites: Iterable[ArchiveSiteResponse], watermark: Optional[str] = None
+) -> Iterator[SiteChange]:
+    """Lazily merges sites (ordered by changed_time, site_id) and archived_sites (ordered by deleted_time, site_id) into
+    a single stream of SiteChange ordered by (change_time, site_id). Archived sites without a deleted_time are
+    ignored as are any changes at/before watermark.
+
+    Raises:
+        ValueError if watermark can't be decoded"""
+    upserts = (SiteChange(site_id=s.site_id, change_time=s.changed_time, site=s, deleted_time=None) for s in sites)
+    deletes = (
+        SiteChange(site_id=a.site_id, change_time=a.deleted_time, site=None, deleted_time=a.deleted_time)
+        for a in archived_sites
+        if a.deleted_time is not None
+    )
+    changes = heapq.merge(upserts, deletes, key=lambda c: (c.change_time, c.site_id))
+
+    if watermark is None:
+        yield from changes
+        return
+
+    cursor = decode_page_cursor(watermark, KeysetCursor)
+    if cursor.last_changed_time is None:
+        raise ValueError(f"Invalid watermark '{watermark}'. No change time.")
+    after = (cursor.last_changed_time, cursor.last_id)
+    for change in changes:
+        if (change.change_time, change.site_id) > after:
+            yield change
+
+
+class SiteChangeFeedApplier:
+    """Client side maintenance of a local copy of sites (keyed by site_id) from a change feed"""
+
+    sites: dict[int, SiteResponse]  # The current local copy of all sites
+    watermark: Optional[str]  # The watermark to resume the change feed from
+
+    def __init__(self, sites: Optional[dict[int, SiteResponse]] = None, watermark: Optional[str] = None):
+        self.sites = sites if sites is not None else {}
+        self.watermark = watermark
+
+    def apply(self, changes: Iterable[SiteChange]) -> int:
+        """Applies changes (in order) to sites, updating watermark to the last change. Returns the number applied"""
+        applied = 0
+        last_change: Optional[SiteChange] = None
+        for change in changes:
+            if change.site is None:
+                self.sites.pop(change.site_id, None)
+            else:
+                self.sites[change.site_id] = change.site
+            last_change = change
+            applied += 1
+
+        if last_change is not None:
+            self.watermark = site_change_watermark(last_change)
+        return applied
+
+    def apply_response(self, response: SiteChangeFeedResponse) -> int:
+        """Applies a page from the change feed. Returns the number of changes applied"""
+        applied = self.apply(response.changes)
+        if response.next_watermark is not None:
+            self.watermark = response.next_watermark
+        return applied
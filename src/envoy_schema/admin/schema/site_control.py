@@ -1,8 +1,10 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
+from typing import Any, Iterator, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
+
+from envoy_schema.admin.schema.base import BaseCursorPageModel
 
 
 class SiteControlRequest(BaseModel):
@@ -42,6 +44,97 @@ class SiteControlRequest(BaseModel):
     )
 
 
+class SiteControlBatchRequest(BaseModel):
+    """A columnar alternative to a list[SiteControlRequest] for submitting large numbers of SiteControls. Every
+    property (besides calculation_log_id) is a list that must correspond 1-1 with site_id such that the Xth element
+    of each list describes the Xth SiteControlRequest. Optional columns can be omitted entirely (equivalent to every
+    element being None).
+
+    eg: {
+      calculation_log_id: 5
+      site_id: [1, 2]
+      duration_seconds: [300, 300]
+      start_time: ["2024-01-02T00:00:00Z", "2024-01-02T00:05:00Z"]
+      import_limit_watts: [1500, None]
+    }
+
+    Logically represents:
+
+    [
+        {calculation_log_id: 5, site_id: 1, duration_seconds: 300, start_time: ..., import_limit_watts: 1500},
+        {calculation_log_id: 5, site_id: 2, duration_seconds: 300, start_time: ..., import_limit_watts: None},
+    ]
+
+    Submitting this in place of a list[SiteControlRequest] will return a BatchCreateResponse whose ids correspond 1-1
+    with the expanded rows. See SiteControlRequest for documentation on each of the fields."""
+
+    calculation_log_id: Optional[int]  # Shared by every SiteControl in this batch
+
+    site_id: list[int]
+    duration_seconds: list[int]
+    start_time: list[datetime]
+
+    randomize_start_seconds: Optional[list[Optional[int]]] = None
+    set_energized: Optional[list[Optional[bool]]] = None
+    set_connect: Optional[list[Optional[bool]]] = None
+    import_limit_watts: Optional[list[Optional[Decimal]]] = None
+    export_limit_watts: Optional[list[Optional[Decimal]]] = None
+    generation_limit_watts: Optional[list[Optional[Decimal]]] = None
+    load_limit_watts: Optional[list[Optional[Decimal]]] = None
+    set_point_percentage: Optional[list[Optional[Decimal]]] = None
+    ramp_time_seconds: Optional[list[Optional[Decimal]]] = None
+    storage_target_watts: Optional[list[Optional[Decimal]]] = None
+    display_id: Optional[list[Optional[int]]] = None
+
+    @model_validator(mode="after")
+    def validate_column_lengths(self) -> "SiteControlBatchRequest":
+        """Validates that every (specified) column has the same length as site_id
+
+        Raises:
+            ValueError if any column length differs from site_id
+        """
+        expected = len(self.site_id)
+        for name in SITE_CONTROL_BATCH_COLUMNS:
+            column = getattr(self, name)
+            if column is not None and len(column) != expected:
+                raise ValueError(f"{name} has {len(column)} elements but site_id has {expected} elements.")
+        return self
+
+    def iter_site_control_requests(self) -> Iterator[SiteControlRequest]:
+        """Lazily expands this batch into SiteControlRequest instances (one per row). As this batch has already been
+        validated, the yielded instances are constructed without revalidation. Omitted columns will be left "unset"
+        on the yielded instances."""
+        names = [name for name in SITE_CONTROL_BATCH_COLUMNS if getattr(self, name) is not None]
+        calculation_log_id = self.calculation_log_id
+        for row in zip(*(getattr(self, name) for name in names)):
+            yield SiteControlRequest.model_construct(calculation_log_id=calculation_log_id, **dict(zip(names, row)))
+
+    @classmethod
+    def from_site_control_requests(cls, requests: list[SiteControlRequest]) -> "SiteControlBatchRequest":
+        """Creates a SiteControlBatchRequest from a list of SiteControlRequest's. Columns where every value is None will
+        be omitted.
+
+        Raises:
+            ValueError if requests have differing calculation_log_id values
+        """
+        calculation_log_ids = set(r.calculation_log_id for r in requests)
+        if len(calculation_log_ids) > 1:
+            raise ValueError(f"requests have multiple calculation_log_id values {calculation_log_ids}.")
+
+        columns: dict[str, Any] = {}
+        for name in SITE_CONTROL_BATCH_COLUMNS:
+            column = [getattr(r, name) for r in requests]
+            if cls.model_fields[name].is_required() or any(v is not None for v in column):
+                columns[name] = column
+        return cls.model_construct(
+            calculation_log_id=calculation_log_ids.pop() if calculation_log_ids else None, **columns
+        )
+
+
+# The names of every SiteControlBatchRequest list property (which also maps to the SiteControlRequest property names)
+SITE_CONTROL_BATCH_COLUMNS = [n for n in SiteControlBatchRequest.model_fields.keys() if n != "calculation_log_id"]
+
+
 class SiteControlResponse(SiteControlRequest):
     """Site Control basic model when being queried externally"""
 
@@ -61,6 +154,13 @@ class SiteControlPageResponse(BaseModel):
     controls: list[SiteControlResponse]  # The control models in this paged response
 
 
+class SiteControlCursorPageResponse(BaseCursorPageModel):
+    """Represents a keyset (cursor) paginated response of SiteControlResponse"""
+
+    after: Optional[datetime]  # The "after" filter set by the query
+    controls: list[SiteControlResponse]  # The control models in this paged response
+
+
 class SiteControlGroupRequest(BaseModel):
     """Used for creating new SiteControlGroups (used for grouping SiteControls)"""
 
@@ -0,0 +1,138 @@
+"""Compaction of SiteControlRequests by merging contiguous controls with identical control values.
+
+Optimisers typically emit fixed length (eg 5 minute) controls where many consecutive controls share the same limits.
+Two controls are merged if they:
+
+    1. Belong to the same SiteControlGroup (see group_ids)
+    2. Have equal values for every field besides start_time / duration_seconds (COMPACTION_KEY_FIELDS). This includes
+       site_id and calculation_log_id.
+    3. Are contiguous (one starts exactly when the other ends)
+
+The merged control is the earliest control with its duration extended to cover the run. The start / duration of every
+merged control is retained so the compaction can be exactly reversed (see expand_site_controls)."""
+
+from datetime import datetime, timedelta
+from typing import Any, Optional, Sequence
+
+from envoy_schema.admin.schema.site_control import SiteControlRequest
+
+# The fields that must be equal for two controls to be merged
+COMPACTION_KEY_FIELDS: tuple[str, ...] = tuple(
+    n for n in SiteControlRequest.model_fields.keys() if n not in ("start_time", "duration_seconds")
+)
+
+
+class SiteControlCompaction:
+    """The results of compact_site_controls"""
+
+    controls: list[SiteControlRequest]  # The compacted controls (ordered by the position of their first source)
+    sources: list[list[int]]  # For each compacted control - the (time ordered) indexes of the source controls
+    segments: list[list[tuple[datetime, int]]]  # For each compacted control - the (start_time, duration_seconds) of
+    # each of the source controls (corresponds 1-1 with sources)
+    original_count: int  # The number of controls before compaction
+
+    def __init__(self, original_count: int) -> None:
+        self.controls = []
+        self.sources = []
+        self.segments = []
+        self.original_count = original_count
+
+    @property
+    def reduction(self) -> float:
+        """The fraction of controls removed by the compaction (0.0 is no reduction, 0.75 is a 4x reduction)"""
+        if not self.original_count:
+            return 0.0
+        return 1.0 - (len(self.controls) / self.original_count)
+
+
+def compact_site_controls(
+    controls: Sequence[SiteControlRequest], group_ids: Optional[Sequence[int]] = None
+) -> SiteControlCompaction:
+    """Merges contiguous controls with identical values (see module docs). group_ids (if specified) is the
+    SiteControlGroup id of each control (controls in different groups are never merged). Controls with a non positive
+    duration are never merged. The source controls are not modified.
+
+    Raises:
+        ValueError if group_ids is a different length to controls"""
+    if group_ids is not None and len(group_ids) != len(controls):
+        raise ValueError(f"Got {len(group_ids)} group_ids for {len(controls)} controls.")
+
+    buckets: dict[tuple[Any, ...], list[int]] = {}
+    for idx, control in enumerate(controls):
+        key = (group_ids[idx] if group_ids is not None else None,) + tuple(
+            getattr(control, name) for name in COMPACTION_KEY_FIELDS
+        )
+        buckets.setdefault(key, []).append(idx)
+
+    runs: list[list[int]] = []
+    for indexes in buckets.values():
+        indexes.sort(key=lambda i: controls[i].start_time)
+        run: list[int] = []
+        run_end: Optional[datetime] = None
+        for idx in indexes:
+            control = controls[idx]
+            if control.duration_seconds <= 0:
+                runs.append([idx])  # Never merged (and doesn't interrupt the current run)
+                continue
+
+            if run and control.start_time == run_end:
+                run.append(idx)
+            else:
+                if run:
+                    runs.append(run)
+                run = [idx]
+            run_end = control.start_time + timedelta(seconds=control.duration_seconds)
+        if run:
+            runs.append(run)
+
+    result = SiteControlCompaction(len(controls))
+    for run in sorted(runs, key=min):
+        first = controls[run[0]]
+        segments = [(controls[i].start_time, controls[i].duration_seconds) for i in run]
+        if len(run) == 1:
+            result.controls.append(first)
+        else:
+            result.controls.append(
+                first.model_copy(update={"duration_seconds": sum(duration for _, duration in segments)})
+            )
+        result.sources.append(run)
+        result.segments.append(segments)
+    return result
+
+
+def expand_site_controls(compaction: SiteControlCompaction) -> list[SiteControlRequest]:
+    """Reverses compact_site_controls - returns the equivalent of the original controls (in their original order)"""
+    expanded: list[Optional[SiteControlRequest]] = [None] * compaction.original_count
+    for control, sources, segments in zip(compaction.controls, compaction.sources, compaction.segments):
+        for idx, (start_time, duration_seconds) in zip(sources, segments):
+            if start_time == control.start_time and duration_seconds == control.duration_seconds:
+                expanded[idx] = control
+            else:
+                expanded[idx] = control.model_copy(
+                    update={"start_time": start_time, "duration_seconds": duration_seconds}
+                )
+    return [c for c in expanded if c is not None]
+
+
+def split_site_control(control: SiteControlRequest, segment_seconds: int) -> list[SiteControlRequest]:
+    """Splits control into consecutive controls of segment_seconds (the final control may be shorter). This is an
+    approximate reversal of compaction for controls where the original segments aren't known.
+
+    Raises:
+        ValueError if segment_seconds isn't positive"""
+    if segment_seconds <= 0:
+        raise ValueError(f"segment_seconds must be positive. Got {segment_seconds}.")
+    if control.duration_seconds <= segment_seconds:
+        return [control]
+
+    results: list[SiteControlRequest] = []
+    for offset in range(0, control.duration_seconds, segment_seconds):
+        results.append(
+            control.model_copy(
+                update={
+                    "start_time": control.start_time + timedelta(seconds=offset),
+                    "duration_seconds": min(segment_seconds, control.duration_seconds - offset),
+                }
+            )
+        )
+    return results
@@ -0,0 +1,155 @@
+"""Batched conversion of admin SiteControlRequest / SiteControlResponse into sep2 DERControlResponse.
+
+The conversion is table driven (see SITE_CONTROL_DER_CONTROL_FIELDS) and processes a whole column of values at a time.
+Decimal -> pow10 encodings are cached (controls typically share a small number of distinct limits) and the output
+models are validated in a single pass (a cached list TypeAdapter) from plain dicts, which is considerably faster than
+constructing each (sub) model individually."""
+
+from datetime import datetime
+from decimal import ROUND_HALF_EVEN, Decimal
+from functools import lru_cache
+from typing import Any, Callable, Optional, Sequence, Union
+
+from pydantic import TypeAdapter
+
+from envoy_schema.admin.schema.base import identity
+from envoy_schema.admin.schema.site_control import SiteControlRequest, SiteControlResponse
+from envoy_schema.server.schema.sep2.der import DERControlListResponse, DERControlResponse
+from envoy_schema.server.schema.sep2.der_control_types import ActivePower
+from envoy_schema.server.schema.sep2.event import EventStatusType
+from envoy_schema.server.schema.sep2.pow10 import INT16_RANGE, encode_pow10
+from envoy_schema.server.schema.uri import DERControlListUri, DERControlUri
+
+HUNDREDTHS = Decimal("100")
+
+_der_control_list_adapter: TypeAdapter[list[DERControlResponse]] = TypeAdapter(list[DERControlResponse])
+
+
+def encode_active_power(watts: Decimal) -> ActivePower:
+    """Encodes watts as an ActivePower whose value fits in an Int16. The smallest multiplier that exactly encodes watts
+    is used, otherwise watts is rounded to the smallest multiplier that will fit. Encodings are cached.
+
+    Raises:
+        ValueError if watts can't be encoded (see encode_pow10)"""
+    value, multiplier = encode_pow10(watts, INT16_RANGE)
+    return ActivePower.model_construct(value=value, multiplier=multiplier)
+
+
+@lru_cache(maxsize=4096)
+def _encode_active_power_dict(watts: Decimal) -> dict[str, int]:
+    """encode_active_power as a dict for validation. The returned dict is cached and MUST NOT be modified"""
+    value, multiplier = encode_pow10(watts, INT16_RANGE)
+    return {"value": value, "multiplier": multiplier}
+
+
+@lru_cache(maxsize=4096)
+def _encode_hundredths(value: Decimal) -> int:
+    """Encodes value in hundredths (eg a percentage as sep2 PerCent or seconds as hundredths of a second)"""
+    return int((value * HUNDREDTHS).to_integral_value(rounding=ROUND_HALF_EVEN))
+
+
+# (SiteControlRequest field, DERControlBase field, encoder) - The table driving the DERControlBase conversion
+SITE_CONTROL_DER_CONTROL_FIELDS: list[tuple[str, str, Callable[[Any], Any]]] = [
+    ("set_connect", "opModConnect", identity),
+    ("set_energized", "opModEnergize", identity),
+    ("set_point_percentage", "opModFixedW", _encode_hundredths),
+    ("ramp_time_seconds", "rampTms", _encode_hundredths),
+    ("import_limit_watts", "opModImpLimW", _encode_active_power_dict),
+    ("export_limit_watts", "opModExpLimW", _encode_active_power_dict),
+    ("generation_limit_watts", "opModGenLimW", _encode_active_power_dict),
+    ("load_limit_watts", "opModLoadLimW", _encode_active_power_dict),
+    ("storage_target_watts", "opModStorageTargetW", _encode_active_power_dict),
+]
+
+
+def site_control_mrid(derc_id: int, display_id: Optional[int] = None) -> str:
+    """The mRID (HexBinary128) for a converted control. Equal display_id (if set) means equal mRID"""
+    return f"{display_id if display_id is not None else derc_id:032X}"
+
+
+def site_controls_to_der_controls(
+    controls: Sequence[SiteControlRequest],
+    der_program_id: Union[int, str],
+    now: datetime,
+    derc_ids: Optional[Sequence[int]] = None,
+) -> list[DERControlResponse]:
+    """Converts controls to the equivalent DERControlResponse (under the DERProgram der_program_id). now is used for the
+    EventStatus / creationTime (SiteControlResponse instances will use their created_time for creationTime).
+
+    derc_ids are the ids used to generate each DERControl href. They can be omitted if every control is a
+    SiteControlResponse (site_control_id will be used).
+
+    Raises:
+        ValueError if derc_ids is omitted and a control has no site_control_id or derc_ids is a different length"""
+    if derc_ids is None:
+        if not all(isinstance(c, SiteControlResponse) for c in controls):
+            raise ValueError("derc_ids must be specified for controls that aren't SiteControlResponse.")
+        derc_ids = [c.site_control_id for c in controls]  # type: ignore[attr-defined]
+    elif len(derc_ids) != len(controls):
+        raise ValueError(f"Got {len(derc_ids)} derc_ids for {len(controls)} controls.")
+
+    # Build each DERControlBase column by column
+    base_values: list[dict[str, Any]] = [{} for _ in controls]
+    for request_field, base_field, encoder in SITE_CONTROL_DER_CONTROL_FIELDS:
+        for values, control in zip(base_values, controls):
+            value = getattr(control, request_field)
+            if value is not None:
+                values[base_field] = encoder(value)
+
+    now_timestamp = int(now.timestamp())
+    rows: list[dict[str, Any]] = []
+    for values, control, derc_id in zip(base_values, controls, derc_ids):
+        start = int(control.start_time.timestamp())
+        if isinstance(control, SiteControlResponse):
+            creation_time = int(control.created_time.timestamp())
+            superseded = control.superseded
+        else:
+            creation_time = now_timestamp
+            superseded = False
+
+        if superseded:
+            status = EventStatusType.Superseded
+        elif start <= now_timestamp:
+            status = EventStatusType.Active
+        else:
+            status = EventStatusType.Scheduled
+
+        rows.append(
+            {
+                "href": DERControlUri.format(site_id=control.site_id, der_program_id=der_program_id, derc_id=derc_id),
+                "mRID": site_control_mrid(derc_id, control.display_id),
+                "creationTime": creation_time,
+                "EventStatus_": {
+                    "currentStatus": status,
+                    "dateTime": now_timestamp,
+                    "potentiallySuperseded": superseded,
+                },
+                "interval": {"start": start, "duration": control.duration_seconds},
+                "randomizeStart": control.randomize_start_seconds,
+                "DERControlBase_": values,
+            }
+        )
+    return _der_control_list_adapter.validate_python(rows)
+
+
+def site_controls_to_der_control_list(
+    site_id: int,
+    controls: Sequence[SiteControlRequest],
+    der_program_id: Union[int, str],
+    now: datetime,
+    total_count: Optional[int] = None,
+    derc_ids: Optional[Sequence[int]] = None,
+) -> DERControlListResponse:
+    """Converts controls (for site_id) into a DERControlListResponse. See site_controls_to_der_controls for details.
+    total_count is the "all" attribute (defaults to len(controls))
+
+    Raises:
+        ValueError if any control isn't for site_id (or see site_controls_to_der_controls)"""
+    if any(c.site_id != site_id for c in controls):
+        raise ValueError(f"Every control must be for site_id {site_id}.")
+    return DERControlListResponse.model_construct(
+        href=DERControlListUri.format(site_id=site_id, der_program_id=der_program_id),
+        all_=len(controls) if total_count is None else total_count,
+        results=len(controls),
+        DERControl=site_controls_to_der_controls(controls, der_program_id, now, derc_ids),
+    )
@@ -0,0 +1,119 @@
+"""Sweep line evaluation of which SiteControls are superseded (and the resulting effective timeline) for many sites at
+once. This replaces the nested loop comparison of every control with every other control for the same site.
+
+Controls are ranked by:
+
+    1. The primacy of their SiteControlGroup (lower values take precedence)
+    2. created_time (the most recently created control takes precedence)
+    3. site_control_id (the higher id takes precedence - as a deterministic final tie break)
+
+A control is superseded if it overlaps (for any amount of time) a higher ranked control for the same site. Controls that
+are already flagged as superseded remain superseded and are otherwise ignored (they can't supersede other controls).
+
+The effective timeline for a site is built from the controls that remain non superseded after evaluation (superseded
+controls won't be executed by the device). These controls never overlap each other, so re-evaluating the output (with
+the updated superseded flags) will produce the same flags and timeline."""
+
+import heapq
+from datetime import datetime, timedelta
+from typing import Iterable
+
+from pydantic import BaseModel
+
+from envoy_schema.admin.schema.site_control import SiteControlResponse
+
+RankKey = tuple[int, float, int]
+
+
+class SiteControlTimelineSegment(BaseModel):
+    """A period of time where a single SiteControl is the effective control for a site"""
+
+    site_id: int
+    start_time: datetime  # Inclusive start of this segment
+    end_time: datetime  # Exclusive end of this segment
+    site_control_id: int  # The effective (highest ranked) control for this period
+
+
+class SiteControlSupersession:
+    """The results of evaluate_supersession"""
+
+    superseded: dict[int, bool]  # The superseded flag for every evaluated control, keyed by site_control_id
+    newly_superseded: list[int]  # site_control_ids that are superseded but weren't flagged as superseded on input
+    timelines: dict[int, list[SiteControlTimelineSegment]]  # The effective timeline (ordered by time) keyed by site_id
+
+    def __init__(self) -> None:
+        self.superseded = {}
+        self.newly_superseded = []
+        self.timelines = {}
+
+
+def site_control_rank(primacy: int, control: SiteControlResponse) -> RankKey:
+    """Sort key for ordering controls from highest to lowest precedence"""
+    return (primacy, -control.created_time.timestamp(), -control.site_control_id)
+
+
+def _evaluate_site(
+    site_id: int, ranked: list[tuple[RankKey, SiteControlResponse]], result: SiteControlSupersession
+) -> None:
+    """Sweeps the (non superseded) controls for a single site, updating result"""
+    # Events are (time, is_start, idx) - ends sort before starts at the same time (intervals are [start, end))
+    events: list[tuple[datetime, bool, int]] = []
+    for idx, (_, control) in enumerate(ranked):
+        if control.duration_seconds <= 0:
+            continue
+        events.append((control.start_time, True, idx))
+        events.append((control.start_time + timedelta(seconds=control.duration_seconds), False, idx))
+    events.sort(key=lambda e: (e[0], e[1]))
+
+    active: list[tuple[RankKey, int]] = []  # heap of the active controls (with lazy removal of ended controls)
+    ended: set[int] = set()
+    for _, is_start, idx in events:
+        if not is_start:
+            ended.add(idx)
+            continue
+
+        while active and active[0][1] in ended:
+            heapq.heappop(active)
+        key = ranked[idx][0]
+        if active:
+            current_top = active[0][1]
+            if ranked[current_top][0] < key:
+                result.superseded[ranked[idx][1].site_control_id] = True
+            else:
+                result.superseded[ranked[current_top][1].site_control_id] = True
+        heapq.heappush(active, (key, idx))
+
+    # The remaining (non superseded) controls can't overlap so each is a single segment of the timeline
+    result.timelines[site_id] = [
+        SiteControlTimelineSegment.model_construct(
+            site_id=site_id,
+            start_time=control.start_time,
+            end_time=control.start_time + timedelta(seconds=control.duration_seconds),
+            site_control_id=control.site_control_id,
+        )
+        for control in sorted((c for _, c in ranked), key=lambda c: c.start_time)
+        if control.duration_seconds > 0 and not result.superseded[control.site_control_id]
+    ]
+
+
+def evaluate_supersession(groups: Iterable[tuple[int, Iterable[SiteControlResponse]]]) -> SiteControlSupersession:
+    """Evaluates the superseded flag for every control in groups (and the effective timeline for each site).
+
+    groups is a collection of (primacy, controls) where primacy is the SiteControlGroup.primacy of the group that the
+    controls belong to. Controls can be for any number of sites and in any order. This runs in O(n log n)."""
+    result = SiteControlSupersession()
+    controls_by_site: dict[int, list[tuple[RankKey, SiteControlResponse]]] = {}
+    for primacy, controls in groups:
+        for control in controls:
+            result.superseded[control.site_control_id] = control.superseded
+            if not control.superseded:
+                controls_by_site.setdefault(control.site_id, []).append((site_control_rank(primacy, control), control))
+
+    for site_id in sorted(controls_by_site.keys()):
+        _evaluate_site(site_id, controls_by_site[site_id], result)
+
+    for site_controls in controls_by_site.values():
+        for _, control in site_controls:
+            if result.superseded[control.site_control_id]:
+                result.newly_superseded.append(control.site_control_id)
+    return result
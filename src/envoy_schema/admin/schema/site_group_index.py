@@ -0,0 +1,323 @@
+"""An in-memory index of site group membership (site_group_id -> site_ids) for answering questions like "which sites are
+in groups A and B but not C" without materialising lists of sites.
+
+Membership is stored as a compressed bitmap (SiteIdBitmap) using the same approach as "roaring" bitmaps. site_ids are
+split into chunks by their upper bits (65536 site_ids per chunk). A sparse chunk is stored as a sorted array of the
+lower 16 bits and a dense chunk is stored as a single int bitset."""
+
+import operator
+from array import array
+from bisect import bisect_left
+from typing import Callable, Iterable, Iterator, Optional, Union
+
+from envoy_schema.admin.schema.site import SitePageResponse, SiteResponse
+
+CHUNK_BITS = 16
+CHUNK_SIZE = 1 << CHUNK_BITS
+CHUNK_MASK = CHUNK_SIZE - 1
+MAX_ARRAY_CHUNK_SIZE = 4096  # Chunks with more values than this are stored as a bitset (an array would be larger)
+
+Chunk = Union[array, int]  # Sorted array("H") of low values (sparse) OR an int bitset (dense)
+
+
+def _popcount(bits: int) -> int:
+    """Number of set bits in bits (int.bit_count is only available from python 3.10)"""
+    return bin(bits).count("1")
+
+
+def _chunk_len(chunk: Chunk) -> int:
+    return len(chunk) if isinstance(chunk, array) else _popcount(chunk)
+
+
+def _chunk_to_bits(chunk: Chunk) -> int:
+    """Converts chunk to its int bitset equivalent"""
+    if not isinstance(chunk, array):
+        return chunk
+    data = bytearray(CHUNK_SIZE // 8)
+    for low in chunk:
+        data[low >> 3] |= 1 << (low & 7)
+    return int.from_bytes(data, "little")
+
+
+def _bits_to_lows(bits: int) -> list[int]:
+    """Sorted list of every set bit position in bits"""
+    data = bits.to_bytes(CHUNK_SIZE // 8, "little")
+    return [(i << 3) | j for i, b in enumerate(data) if b for j in range(8) if (b >> j) & 1]
+
+
+def _bits_to_chunk(bits: int) -> Optional[Chunk]:
+    """Converts an int bitset to the most compact chunk representation (None if empty)"""
+    if not bits:
+        return None
+    if _popcount(bits) > MAX_ARRAY_CHUNK_SIZE:
+        return bits
+    return array("H", _bits_to_lows(bits))
+
+
+def _and_not(a: int, b: int) -> int:
+    return a & ~b
+
+
+# The set equivalents of each bitwise op (for combining two sparse array chunks without building bitsets)
+_ARRAY_CHUNK_SET_OPS: dict[Callable[[int, int], int], Callable[[set[int], Iterable[int]], set[int]]] = {
+    operator.or_: set.union,
+    operator.xor: set.symmetric_difference,
+    _and_not: set.difference,
+}
+
+
+def _combine_chunks(a: Chunk, b: Chunk, op: Callable[[int, int], int]) -> Optional[Chunk]:
+    """Applies the bitwise op (and/or/xor/sub) to a and b. Returns None if the result is empty"""
+    if op is operator.and_ and not isinstance(a, array) and isinstance(b, array):
+        a, b = b, a  # Intersection is symmetric - prefer iterating the sparse chunk
+    if isinstance(a, array) and isinstance(b, array):
+        if op is operator.and_:
+            b_set = set(b)
+            lows = [low for low in a if low in b_set]
+        else:
+            lows = sorted(_ARRAY_CHUNK_SET_OPS[op](set(a), b))
+        if not lows:
+            return None
+        if len(lows) > MAX_ARRAY_CHUNK_SIZE:
+            return _chunk_to_bits(array("H", lows))  # Only a union/xor can grow past the array limit
+        return array("H", lows)
+    if isinstance(a, array) and op in (operator.and_, _and_not):
+        b_bits = _chunk_to_bits(b)
+        if op is operator.and_:
+            lows = [low for low in a if (b_bits >> low) & 1]
+        else:
+            lows = [low for low in a if not (b_bits >> low) & 1]
+        return array("H", lows) if lows else None
+    return _bits_to_chunk(op(_chunk_to_bits(a), _chunk_to_bits(b)))
+
+
+class SiteIdBitmap:
+    """A compressed set of (non negative) site_ids supporting fast set algebra (&, |, ^, -) and cardinality (len)"""
+
+    _chunks: dict[int, Chunk]  # Keyed by the upper bits of site_id
+
+    def __init__(self, site_ids: Iterable[int] = ()):
+        self._chunks = {}
+        lows_by_key: dict[int, set[int]] = {}
+        for site_id in site_ids:
+            if site_id < 0:
+                raise ValueError(f"site_id {site_id} must be non negative.")
+            lows_by_key.setdefault(site_id >> CHUNK_BITS, set()).add(site_id & CHUNK_MASK)
+
+        for key, lows in lows_by_key.items():
+            if len(lows) > MAX_ARRAY_CHUNK_SIZE:
+                self._chunks[key] = _chunk_to_bits(array("H", lows))
+            else:
+                self._chunks[key] = array("H", sorted(lows))
+
+    @classmethod
+    def _from_chunks(cls, chunks: dict[int, Chunk]) -> "SiteIdBitmap":
+        bitmap = cls()
+        bitmap._chunks = chunks
+        return bitmap
+
+    def add(self, site_id: int) -> None:
+        """Adds site_id to this set (does nothing if it's already present)
+
+        Raises:
+            ValueError if site_id is negative"""
+        if site_id < 0:
+            raise ValueError(f"site_id {site_id} must be non negative.")
+        key, low = site_id >> CHUNK_BITS, site_id & CHUNK_MASK
+        chunk = self._chunks.get(key, None)
+        if chunk is None:
+            self._chunks[key] = array("H", [low])
+        elif isinstance(chunk, array):
+            idx = bisect_left(chunk, low)
+            if idx < len(chunk) and chunk[idx] == low:
+                return
+            chunk.insert(idx, low)
+            if len(chunk) > MAX_ARRAY_CHUNK_SIZE:
+                self._chunks[key] = _chunk_to_bits(chunk)
+        else:
+            self._chunks[key] = chunk | (1 << low)
+
+    def discard(self, site_id: int) -> None:
+        """Removes site_id from this set (does nothing if it's not present)"""
+        if site_id < 0:
+            return
+        key, low = site_id >> CHUNK_BITS, site_id & CHUNK_MASK
+        chunk = self._chunks.get(key, None)
+        if chunk is None:
+            return
+
+        if isinstance(chunk, array):
+            idx = bisect_left(chunk, low)
+            if idx < len(chunk) and chunk[idx] == low:
+                del chunk[idx]
+            new_chunk: Optional[Chunk] = chunk if len(chunk) else None
+        else:
+            new_chunk = _bits_to_chunk(chunk & ~(1 << low))
+
+        if new_chunk is None:
+            del self._chunks[key]
+        else:
+            self._chunks[key] = new_chunk
+
+    def copy(self) -> "SiteIdBitmap":
+        return SiteIdBitmap._from_chunks(
+            {k: array("H", c) if isinstance(c, array) else c for k, c in self._chunks.items()}
+        )
+
+    def _combine(self, other: "SiteIdBitmap", op: Callable[[int, int], int]) -> "SiteIdBitmap":
+        if op is operator.and_:
+            keys: Iterable[int] = [k for k in self._chunks if k in other._chunks]
+        elif op is _and_not:
+            keys = self._chunks.keys()
+        else:
+            keys = sorted(self._chunks.keys() | other._chunks.keys())
+
+        chunks: dict[int, Chunk] = {}
+        for key in keys:
+            a = self._chunks.get(key, None)
+            b = other._chunks.get(key, None)
+            if a is None:
+                result: Optional[Chunk] = b  # Only for or/xor (other's chunk is unchanged)
+            elif b is None:
+                result = a  # Only for or/xor/sub (this chunk is unchanged)
+            else:
+                result = _combine_chunks(a, b, op)
+
+            if result is not None:
+                chunks[key] = array("H", result) if isinstance(result, array) else result
+        return SiteIdBitmap._from_chunks(chunks)
+
+    def __and__(self, other: "SiteIdBitmap") -> "SiteIdBitmap":
+        return self._combine(other, operator.and_)
+
+    def __or__(self, other: "SiteIdBitmap") -> "SiteIdBitmap":
+        return self._combine(other, operator.or_)
+
+    def __xor__(self, other: "SiteIdBitmap") -> "SiteIdBitmap":
+        return self._combine(other, operator.xor)
+
+    def __sub__(self, other: "SiteIdBitmap") -> "SiteIdBitmap":
+        return self._combine(other, _and_not)
+
+    def __contains__(self, site_id: object) -> bool:
+        if not isinstance(site_id, int) or site_id < 0:
+            return False
+        chunk = self._chunks.get(site_id >> CHUNK_BITS, None)
+        if chunk is None:
+            return False
+        low = site_id & CHUNK_MASK
+        if isinstance(chunk, array):
+            idx = bisect_left(chunk, low)
+            return idx < len(chunk) and chunk[idx] == low
+        return bool((chunk >> low) & 1)
+
+    def __len__(self) -> int:
+        return sum(_chunk_len(c) for c in self._chunks.values())
+
+    def __bool__(self) -> bool:
+        return bool(self._chunks)
+
+    def __iter__(self) -> Iterator[int]:
+        """Iterates site_ids in ascending order"""
+        for key in sorted(self._chunks.keys()):
+            chunk = self._chunks[key]
+            base = key << CHUNK_BITS
+            for low in chunk if isinstance(chunk, array) else _bits_to_lows(chunk):
+                yield base | low
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, SiteIdBitmap):
+            return NotImplemented
+        if self._chunks.keys() != other._chunks.keys():
+            return False
+        return all(_chunk_to_bits(c) == _chunk_to_bits(other._chunks[k]) for k, c in self._chunks.items())
+
+    def __repr__(self) -> str:
+        return f"SiteIdBitmap(len={len(self)}, chunks={len(self._chunks)})"
+
+
+class SiteGroupIndex:
+    """Index of site group membership (keyed by site_group_id) built from SiteResponse.groups"""
+
+    groups: dict[int, SiteIdBitmap]  # The site_ids belonging to each site_group_id
+    sites: SiteIdBitmap  # Every site_id that has been added to this index (regardless of group)
+
+    def __init__(self) -> None:
+        self.groups = {}
+        self.sites = SiteIdBitmap()
+
+    @classmethod
+    def from_pages(cls, pages: Iterable[SitePageResponse]) -> "SiteGroupIndex":
+        """Creates a new index from every site in pages"""
+        index = cls()
+        for page in pages:
+            index.add_page(page)
+        return index
+
+    def add_page(self, page: SitePageResponse) -> None:
+        """Adds (or updates) every site in page"""
+        for site in page.sites:
+            self.add_site(site)
+
+    def add_site(self, site: SiteResponse) -> None:
+        """Adds site to the index. If site already exists, its group membership will be replaced with site.groups"""
+        if site.site_id in self.sites:
+            self.remove_site(site.site_id)
+
+        self.sites.add(site.site_id)
+        for group in site.groups:
+            bitmap = self.groups.get(group.site_group_id, None)
+            if bitmap is None:
+                self.groups[group.site_group_id] = SiteIdBitmap([site.site_id])
+            else:
+                bitmap.add(site.site_id)
+
+    def remove_site(self, site_id: int) -> None:
+        """Removes site_id (and all its group memberships) from the index"""
+        self.sites.discard(site_id)
+        for site_group_id in list(self.groups.keys()):
+            bitmap = self.groups[site_group_id]
+            bitmap.discard(site_id)
+            if not bitmap:
+                del self.groups[site_group_id]
+
+    def group_sites(self, site_group_id: int) -> SiteIdBitmap:
+        """The site_ids in site_group_id (empty if the group has no sites)"""
+        bitmap = self.groups.get(site_group_id, None)
+        return bitmap.copy() if bitmap is not None else SiteIdBitmap()
+
+    def group_count(self, site_group_id: int) -> int:
+        """The number of sites in site_group_id"""
+        bitmap = self.groups.get(site_group_id, None)
+        return len(bitmap) if bitmap is not None else 0
+
+    def query(
+        self,
+        all_of: Iterable[int] = (),
+        any_of: Iterable[int] = (),
+        none_of: Iterable[int] = (),
+    ) -> SiteIdBitmap:
+        """Finds the site_ids that are in every all_of group AND at least one any_of group AND none of the none_of
+        groups. An empty all_of / any_of will not restrict the result (starting from every site in this index)."""
+        result: Optional[SiteIdBitmap] = None
+        for site_group_id in all_of:
+            bitmap = self.groups.get(site_group_id, None)
+            if bitmap is None:
+                return SiteIdBitmap()
+            result = bitmap if result is None else result & bitmap
+
+        any_of = list(any_of)
+        if any_of:
+            union = SiteIdBitmap()
+            for site_group_id in any_of:
+                bitmap = self.groups.get(site_group_id, None)
+                if bitmap is not None:
+                    union = union | bitmap
+            result = union if result is None else result & union
+
+        result = result if result is not None else self.sites
+        for site_group_id in none_of:
+            bitmap = self.groups.get(site_group_id, None)
+            if bitmap is not None:
+                result = result - bitmap
+        return result.copy()
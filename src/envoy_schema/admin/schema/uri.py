@@ -28,6 +28,7 @@ SiteListUri = "/site"
 SiteUri = "/site/{site_id}"  # Supports updating/deleting single sites
 SiteGroupUri = "/site_group/{group_name}"
 SiteGroupListUri = "/site_group"
+SiteChangeFeedUri = "/site_change_feed"  # Fetching SiteChangeFeedResponse (resumable via the "watermark" query param)
 CSIPAusSiteReadingUri = "/site_readings/{site_id}/csip_aus_unit/{unit_enum}/period/{period_start}/{period_end}"
 CalculationLogCreateUri = "/calculation_log"
 CalculationLogUri = "/calculation_log/{calculation_log_id}"
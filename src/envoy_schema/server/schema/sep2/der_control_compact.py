@@ -0,0 +1,164 @@
+"""A compact (memory efficient) representation of DERControlBase for holding large numbers of controls in memory.
+
+A DERControlBase instance carries 30+ (mostly None) fields with each set field being a nested pydantic model. The
+compact form instead stores:
+
+    mask: An int bitmap of which DERControlBase fields are set (bit i = the ith field of DERControlBase)
+    values: A tuple of the packed values (for set fields only, in field order)
+
+Values are packed as follows:
+
+    ActivePower / ReactivePower: A single int of (value << 8) | (multiplier & 0xFF)
+    Link: The href str
+    Other sub models (eg FixedVar): A tuple of the sub model field values
+    bool / int: Stored as is
+
+Any value that can't be packed losslessly (eg a multiplier outside of [-128, 127]) is stored as is."""
+
+from typing import Any, Iterable, Optional, Union, get_args, get_origin
+
+from pydantic import BaseModel
+
+from envoy_schema.server.schema.sep2.der import DERControlBase
+from envoy_schema.server.schema.sep2.der_control_types import ActivePower, ReactivePower
+from envoy_schema.server.schema.sep2.identification import Link
+
+_KIND_RAW = 0
+_KIND_POWER = 1
+_KIND_LINK = 2
+_KIND_MODEL = 3
+
+
+def _field_model_type(annotation: Any) -> Optional[type[BaseModel]]:
+    """The BaseModel type of an Optional[Model] annotation (None if it's not a model)"""
+    if get_origin(annotation) is Union:
+        args = [a for a in get_args(annotation) if a is not type(None)]
+        annotation = args[0] if len(args) == 1 else None
+    if isinstance(annotation, type) and issubclass(annotation, BaseModel):
+        return annotation
+    return None
+
+
+def _field_kind(model_type: Optional[type[BaseModel]]) -> int:
+    if model_type is None:
+        return _KIND_RAW
+    if model_type in (ActivePower, ReactivePower):
+        return _KIND_POWER
+    if model_type is Link:
+        return _KIND_LINK
+    return _KIND_MODEL
+
+
+FIELD_NAMES: tuple[str, ...] = tuple(DERControlBase.model_fields.keys())
+_FIELD_TYPES: tuple[Optional[type[BaseModel]], ...] = tuple(
+    _field_model_type(f.annotation) for f in DERControlBase.model_fields.values()
+)
+_FIELD_KINDS: tuple[int, ...] = tuple(_field_kind(t) for t in _FIELD_TYPES)
+_FIELD_BITS: dict[str, int] = {name: idx for idx, name in enumerate(FIELD_NAMES)}
+
+
+def _pack(kind: int, model_type: Optional[type[BaseModel]], value: Any) -> Any:
+    """Packs value (for a field of kind / model_type). Values that can't be losslessly packed are returned as is"""
+    if kind == _KIND_RAW or model_type is None or type(value) is not model_type:
+        return value
+    if value.model_fields_set != set(model_type.model_fields.keys()):
+        return value
+    if isinstance(value, (ActivePower, ReactivePower)):
+        if -128 <= value.multiplier <= 127:
+            return (value.value << 8) | (value.multiplier & 0xFF)
+        return value
+    if isinstance(value, Link):
+        return value.href
+    return tuple(getattr(value, name) for name in model_type.model_fields.keys())
+
+
+def _unpack(kind: int, model_type: Optional[type[BaseModel]], packed: Any) -> Any:
+    """Reverses _pack"""
+    if kind == _KIND_RAW or isinstance(packed, BaseModel) or model_type is None:
+        return packed
+    if kind == _KIND_POWER:
+        multiplier = packed & 0xFF
+        return model_type.model_construct(
+            multiplier=multiplier - 256 if multiplier > 127 else multiplier, value=packed >> 8
+        )
+    if kind == _KIND_LINK:
+        return model_type.model_construct(href=packed)
+    return model_type.model_construct(**dict(zip(model_type.model_fields.keys(), packed)))
+
+
+class CompactDERControlBase:
+    """A compact, immutable equivalent of DERControlBase. See module docs for details of the encoding"""
+
+    __slots__ = ("mask", "values")
+
+    mask: int  # Bit i is set if FIELD_NAMES[i] is set
+    values: tuple[Any, ...]  # The packed values for every set field (in field order)
+
+    def __init__(self, mask: int, values: tuple[Any, ...]):
+        self.mask = mask
+        self.values = values
+
+    @classmethod
+    def from_control_base(cls, base: DERControlBase) -> "CompactDERControlBase":
+        """Compacts base. Fields that are None are treated as unset (they are never encoded)"""
+        mask = 0
+        values: list[Any] = []
+        for idx, name in enumerate(FIELD_NAMES):
+            value = getattr(base, name)
+            if value is not None:
+                mask |= 1 << idx
+                values.append(_pack(_FIELD_KINDS[idx], _FIELD_TYPES[idx], value))
+        return cls(mask, tuple(values))
+
+    def to_control_base(self) -> DERControlBase:
+        """Expands this back to the original DERControlBase (without revalidation)"""
+        return DERControlBase.model_construct(**self.to_dict())
+
+    def to_dict(self) -> dict[str, Any]:
+        """The (unpacked) values of every set field, keyed by field name"""
+        result: dict[str, Any] = {}
+        mask = self.mask
+        value_idx = 0
+        idx = 0
+        while mask:
+            if mask & 1:
+                result[FIELD_NAMES[idx]] = _unpack(_FIELD_KINDS[idx], _FIELD_TYPES[idx], self.values[value_idx])
+                value_idx += 1
+            mask >>= 1
+            idx += 1
+        return result
+
+    def get(self, name: str) -> Any:
+        """The (unpacked) value for the DERControlBase field name (None if unset)
+
+        Raises:
+            KeyError if name isn't a DERControlBase field"""
+        bit = _FIELD_BITS[name]
+        if not (self.mask >> bit) & 1:
+            return None
+        value_idx = bin(self.mask & ((1 << bit) - 1)).count("1")
+        return _unpack(_FIELD_KINDS[bit], _FIELD_TYPES[bit], self.values[value_idx])
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CompactDERControlBase):
+            return NotImplemented
+        return self.mask == other.mask and self.values == other.values
+
+    def __hash__(self) -> int:
+        return hash((self.mask, self.values))
+
+    def __repr__(self) -> str:
+        return f"CompactDERControlBase({self.to_dict()})"
+
+
+def compact_control_bases(bases: Iterable[DERControlBase]) -> list[CompactDERControlBase]:
+    """Compacts every DERControlBase in bases. Identical compacted controls share the same instance"""
+    interned: dict[CompactDERControlBase, CompactDERControlBase] = {}
+    results: list[CompactDERControlBase] = []
+    for base in bases:
+        compact = CompactDERControlBase.from_control_base(base)
+        try:
+            results.append(interned.setdefault(compact, compact))
+        except TypeError:
+            results.append(compact)  # Contains an unpackable (unhashable) value - can't be interned
+    return results
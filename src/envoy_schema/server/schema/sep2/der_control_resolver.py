@@ -0,0 +1,176 @@
+"""Resolves "which DERControl applies at time t" for the DERControls of one or more DERPrograms.
+
+Only DERControls with an EventStatus.currentStatus of Scheduled/Active are considered (Cancelled / Superseded events
+are ignored). Where multiple controls overlap, they are ranked by:
+
+    1. The primacy of their DERProgram (lower values take precedence - see PrimacyType)
+    2. creationTime (the most recently created control takes precedence)
+    3. mRID (as a deterministic final tie break)
+
+The effective DERControlBase is merged field by field - each field is taken from the highest ranked control that sets
+it, falling back to the DefaultDERControl of the programs (in primacy order) if no active control sets it."""
+
+from bisect import bisect_right
+from typing import Any, Iterable, Optional, Union
+
+from envoy_schema.server.schema.sep2.der import (
+    DefaultDERControl,
+    DERControlBase,
+    DERControlListResponse,
+    DERControlResponse,
+)
+from envoy_schema.server.schema.sep2.event import EventStatusType
+
+ACTIVE_EVENT_STATUSES = frozenset([EventStatusType.Scheduled, EventStatusType.Active])
+
+RankedControl = tuple[int, DERControlResponse]  # (program primacy, control)
+
+
+class DERProgramControls:
+    """The DERControls (and optional DefaultDERControl) belonging to a single DERProgram"""
+
+    primacy: int  # The DERProgram.primacy - encodes a PrimacyType value
+    controls: list[DERControlResponse]
+    default: Optional[DefaultDERControl]
+
+    def __init__(
+        self,
+        primacy: int,
+        controls: Union[DERControlListResponse, Iterable[DERControlResponse]],
+        default: Optional[DefaultDERControl] = None,
+    ):
+        self.primacy = primacy
+        if isinstance(controls, DERControlListResponse):
+            self.controls = list(controls.DERControl or [])
+        else:
+            self.controls = list(controls)
+        self.default = default
+
+
+def control_rank(ranked: RankedControl) -> tuple[int, int, str]:
+    """Sort key for ordering controls from highest to lowest precedence"""
+    primacy, control = ranked
+    return (primacy, -control.creationTime, control.mRID)
+
+
+def is_control_eligible(control: DERControlResponse) -> bool:
+    """True if control has a status that allows it to be applied (and a non empty interval)"""
+    return control.EventStatus_.currentStatus in ACTIVE_EVENT_STATUSES and control.interval.duration > 0
+
+
+def merge_control_bases(
+    controls: Iterable[DERControlResponse], defaults: Iterable[DefaultDERControl] = ()
+) -> DERControlBase:
+    """Merges the DERControlBase of controls (highest precedence first) field by field, falling back to defaults
+    (highest precedence first) for any fields that none of the controls set"""
+    bases = [c.DERControlBase_ for c in controls] + [d.DERControlBase_ for d in defaults]
+    values: dict[str, Any] = {}
+    for name in DERControlBase.model_fields.keys():
+        for base in bases:
+            value = getattr(base, name)
+            if value is not None:
+                values[name] = value
+                break
+    return DERControlBase.model_construct(_fields_set=set(values.keys()), **values)
+
+
+class ResolvedControl:
+    """The resolved controls for a period of time (where the set of applicable controls doesn't change)"""
+
+    start: Optional[int]  # Inclusive start of the period (None if unbounded)
+    end: Optional[int]  # Exclusive end of the period (None if unbounded)
+    controls: tuple[RankedControl, ...]  # The applicable controls, highest precedence first
+    effective: DERControlBase  # The merged effective control for this period
+
+    def __init__(
+        self,
+        start: Optional[int],
+        end: Optional[int],
+        controls: tuple[RankedControl, ...],
+        effective: DERControlBase,
+    ):
+        self.start = start
+        self.end = end
+        self.controls = controls
+        self.effective = effective
+
+    @property
+    def control(self) -> Optional[DERControlResponse]:
+        """The highest precedence control (if any)"""
+        return self.controls[0][1] if self.controls else None
+
+
+class DERControlResolver:
+    """Index over the DERControls of a set of programs that answers point / range queries in O(log n).
+
+    The index is built once (a sweep over every control start/end) and stores the distinct "segments" of time with the
+    ranked controls applicable for each segment. A query is then a binary search for the segment(s)."""
+
+    _boundaries: list[int]  # Sorted distinct control start/end times. Segment i is [_boundaries[i], _boundaries[i+1])
+    _segments: list[tuple[RankedControl, ...]]  # Ranked controls for each segment
+    _effective: dict[int, DERControlBase]  # Lazily calculated effective control for each segment
+    _defaults: list[DefaultDERControl]  # Defaults - highest precedence first
+    _default_effective: DERControlBase  # The effective control when no controls apply
+
+    def __init__(self, programs: Iterable[DERProgramControls]):
+        programs = sorted(programs, key=lambda p: p.primacy)
+        self._defaults = [p.default for p in programs if p.default is not None]
+        self._default_effective = merge_control_bases([], self._defaults)
+        self._effective = {}
+
+        starts: dict[int, list[RankedControl]] = {}
+        ends: dict[int, list[RankedControl]] = {}
+        for program in programs:
+            for control in program.controls:
+                if not is_control_eligible(control):
+                    continue
+                ranked = (program.primacy, control)
+                starts.setdefault(control.interval.start, []).append(ranked)
+                ends.setdefault(control.interval.start + control.interval.duration, []).append(ranked)
+
+        self._boundaries = sorted(starts.keys() | ends.keys())
+        self._segments = []
+        active: dict[int, RankedControl] = {}
+        for boundary in self._boundaries[:-1]:
+            for ranked in ends.get(boundary, []):
+                del active[id(ranked)]
+            for ranked in starts.get(boundary, []):
+                active[id(ranked)] = ranked
+            self._segments.append(tuple(sorted(active.values(), key=control_rank)))
+
+    def _resolve_segment(self, idx: int, start: Optional[int], end: Optional[int]) -> ResolvedControl:
+        """Resolves segment idx (or the default if idx is outside the segments) for the period start -> end"""
+        if idx < 0 or idx >= len(self._segments):
+            return ResolvedControl(start, end, (), self._default_effective)
+
+        controls = self._segments[idx]
+        effective = self._effective.get(idx, None)
+        if effective is None:
+            effective = merge_control_bases((c for _, c in controls), self._defaults)
+            self._effective[idx] = effective
+        return ResolvedControl(start, end, controls, effective)
+
+    def resolve(self, t: int) -> ResolvedControl:
+        """Resolves the controls applicable at time t (TimeType). The start/end of the result is the period (around t)
+        over which the result remains the same."""
+        idx = bisect_right(self._boundaries, t) - 1
+        start = self._boundaries[idx] if idx >= 0 else None
+        end = self._boundaries[idx + 1] if idx + 1 < len(self._boundaries) else None
+        return self._resolve_segment(idx, start, end)
+
+    def resolve_range(self, start: int, end: int) -> list[ResolvedControl]:
+        """Resolves the controls for every distinct period from start (inclusive) to end (exclusive). The results are
+        contiguous, ordered by start and clipped to start/end."""
+        results: list[ResolvedControl] = []
+        if end <= start:
+            return results
+
+        idx = bisect_right(self._boundaries, start) - 1
+        period_start = start
+        while period_start < end:
+            next_boundary = self._boundaries[idx + 1] if idx + 1 < len(self._boundaries) else end
+            period_end = min(next_boundary, end)
+            results.append(self._resolve_segment(idx, period_start, period_end))
+            period_start = period_end
+            idx += 1
+        return results
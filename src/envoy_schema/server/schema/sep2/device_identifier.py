@@ -0,0 +1,127 @@
+"""Utilities for deriving / verifying the sep2 device identifiers from a device certificate.
+
+LFDI (Long Form Device Identifier): The leftmost 160 bits of the SHA-256 fingerprint of the device certificate (encoded
+as 40 hex characters).
+
+SFDI (Short Form Device Identifier): The leftmost 36 bits of the SHA-256 fingerprint (as a decimal integer) with a
+single check digit appended such that the sum of all digits (including the check digit) is a multiple of 10.
+
+The batch functions are intended for bulk onboarding and avoid the per call overheads of the single value functions."""
+
+import hashlib
+from typing import Iterable, Optional
+
+LFDI_HEX_LENGTH = 40  # 160 bits
+SFDI_BITS = 36
+SFDI_HEX_LENGTH = SFDI_BITS // 4
+MAX_SFDI = ((1 << SFDI_BITS) - 1) * 10 + 9  # Largest 36 bit value with a check digit appended
+
+_DIGIT_BLOCK = 10000
+_DIGIT_SUMS = bytes(sum(int(c) for c in str(i)) for i in range(_DIGIT_BLOCK))  # Digit sums for 4 digit blocks
+_HEX_CHARACTERS = frozenset("0123456789abcdefABCDEF")
+
+
+def sum_of_digits(value: int) -> int:
+    """Sum of the decimal digits of the (non negative) value"""
+    total = 0
+    while value:
+        value, block = divmod(value, _DIGIT_BLOCK)
+        total += _DIGIT_SUMS[block]
+    return total
+
+
+def calculate_check_digit(value: int) -> int:
+    """The sep2 check digit for value - the digit that makes the sum of all digits a multiple of 10"""
+    return (10 - sum_of_digits(value) % 10) % 10
+
+
+def add_check_digit(value: int) -> int:
+    """Appends the sep2 check digit to value (eg 123 becomes 1234)"""
+    return value * 10 + calculate_check_digit(value)
+
+
+def is_valid_check_digit(value_with_check_digit: int) -> bool:
+    """True if the last digit of value_with_check_digit is the correct sep2 check digit for the remaining digits"""
+    return value_with_check_digit >= 0 and sum_of_digits(value_with_check_digit) % 10 == 0
+
+
+def is_valid_lfdi(lfdi: str) -> bool:
+    """True if lfdi is 40 hex characters (case insensitive)"""
+    return len(lfdi) == LFDI_HEX_LENGTH and _HEX_CHARACTERS.issuperset(lfdi)
+
+
+def lfdi_from_fingerprint(fingerprint: bytes) -> str:
+    """Derives the LFDI (upper case hex) from a SHA-256 certificate fingerprint"""
+    return fingerprint[: LFDI_HEX_LENGTH // 2].hex().upper()
+
+
+def sfdi_from_lfdi(lfdi: str) -> int:
+    """Derives the SFDI from a (valid) LFDI. The leftmost 36 bits of the LFDI are the leftmost 36 bits of the
+    fingerprint so the certificate isn't required.
+
+    Raises:
+        ValueError if lfdi isn't valid"""
+    if not is_valid_lfdi(lfdi):
+        raise ValueError(f"'{lfdi}' is not a valid LFDI.")
+    return add_check_digit(int(lfdi[:SFDI_HEX_LENGTH], 16))
+
+
+def sfdi_from_fingerprint(fingerprint: bytes) -> int:
+    """Derives the SFDI from a SHA-256 certificate fingerprint"""
+    return add_check_digit(int.from_bytes(fingerprint[:5], "big") >> 4)  # 5 bytes = 40 bits, drop the lowest 4
+
+
+def certificate_fingerprint(certificate: bytes) -> bytes:
+    """The SHA-256 fingerprint of a (DER encoded) certificate"""
+    return hashlib.sha256(certificate).digest()
+
+
+def derive_lfdi_sfdi_batch(certificates: Iterable[bytes]) -> list[tuple[str, int]]:
+    """Derives the (LFDI, SFDI) for each of the (DER encoded) certificates"""
+    sha256 = hashlib.sha256
+    results: list[tuple[str, int]] = []
+    for certificate in certificates:
+        prefix = sha256(certificate).digest()[: LFDI_HEX_LENGTH // 2]
+        results.append((prefix.hex().upper(), add_check_digit(int.from_bytes(prefix[:5], "big") >> 4)))
+    return results
+
+
+def verify_lfdi_sfdi(lfdi: str, sfdi: int, fingerprint: Optional[bytes] = None) -> Optional[str]:
+    """Checks that lfdi / sfdi are valid and consistent with each other (and fingerprint, if specified). Returns None
+    if everything is consistent or a description of the first inconsistency encountered."""
+    if not is_valid_lfdi(lfdi):
+        return f"lfdi '{lfdi}' is not {LFDI_HEX_LENGTH} hex characters."
+    if sfdi < 0 or sfdi > MAX_SFDI:
+        return f"sfdi {sfdi} is out of range."
+    if not is_valid_check_digit(sfdi):
+        return f"sfdi {sfdi} has an invalid check digit."
+    if sfdi // 10 != int(lfdi[:SFDI_HEX_LENGTH], 16):
+        return f"sfdi {sfdi} does not match lfdi '{lfdi}'."
+    if fingerprint is not None and lfdi.upper() != lfdi_from_fingerprint(fingerprint):
+        return f"lfdi '{lfdi}' does not match the certificate fingerprint."
+    return None
+
+
+def verify_lfdi_sfdi_batch(
+    identifiers: Iterable[tuple[str, int]], fingerprints: Optional[Iterable[bytes]] = None
+) -> list[tuple[int, str]]:
+    """Runs verify_lfdi_sfdi over every (lfdi, sfdi) in identifiers (with the corresponding fingerprints, if
+    specified). Returns (index, description) for every inconsistent identifier.
+
+    Raises:
+        ValueError if fingerprints is a different length to identifiers"""
+    identifiers = list(identifiers)
+    fingerprint_list: list[Optional[bytes]]
+    if fingerprints is None:
+        fingerprint_list = [None] * len(identifiers)
+    else:
+        fingerprint_list = list(fingerprints)
+        if len(fingerprint_list) != len(identifiers):
+            raise ValueError(f"Got {len(fingerprint_list)} fingerprints for {len(identifiers)} identifiers.")
+
+    errors: list[tuple[int, str]] = []
+    for idx, ((lfdi, sfdi), fingerprint) in enumerate(zip(identifiers, fingerprint_list)):
+        error = verify_lfdi_sfdi(lfdi, sfdi, fingerprint)
+        if error is not None:
+            errors.append((idx, error))
+    return errors
@@ -0,0 +1,170 @@
+"""Deterministic reproduction of the start / duration randomization that devices apply to a RandomizableEvent.
+
+RandomizableEvent.randomizeStart / randomizeDuration (OneHourRangeType) are a bound inside which a device selects a
+random offset to apply to the event start / duration. A positive bound selects an offset in [0, bound] and a negative
+bound selects an offset in [bound, 0]. Here that "random" offset is a pure function of the device LFDI and the event
+mRID so that simulators / forecasting can reproduce each device's effective start and end:
+
+    effective_start = interval.start + start_offset
+    effective_end = effective_start + max(interval.duration + duration_offset, 0)
+
+Each LFDI and mRID is hashed once (BLAKE2b) and each (device, event) offset is then derived by a splitmix64 mix of the
+two seeds, allowing large device x event grids to be evaluated in bulk."""
+
+import hashlib
+from typing import Optional, Sequence
+
+from envoy_schema.server.schema.sep2.event import RandomizableEvent
+from envoy_schema.server.schema.sep2.types import OneHourRangeType, TimeType
+
+_MASK64 = (1 << 64) - 1
+_START_SALT = 0x9E3779B97F4A7C15
+_DURATION_SALT = 0xD1B54A32D192ED03
+
+
+def identifier_seed(identifier: str) -> int:
+    """The 64 bit seed for a hex identifier (eg LFDI or mRID). Identifiers are case insensitive"""
+    return int.from_bytes(hashlib.blake2b(identifier.lower().encode(), digest_size=8).digest(), "big")
+
+
+def _mix(seed: int) -> int:
+    """splitmix64 finalizer - maps seed to a well distributed 64 bit value"""
+    seed = ((seed ^ (seed >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    seed = ((seed ^ (seed >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return seed ^ (seed >> 31)
+
+
+def _offset(bound: Optional[OneHourRangeType], device_seed: int, event_seed: int) -> int:
+    """The offset (in [0, bound] or [bound, 0]) for a device / (salted) event seed. A None/0 bound is always 0"""
+    if not bound:
+        return 0
+    value = _mix((device_seed + event_seed) & _MASK64) % (abs(bound) + 1)
+    return value if bound > 0 else -value
+
+
+def randomization_offsets(
+    lfdi: str,
+    mrid: str,
+    randomize_start: Optional[OneHourRangeType],
+    randomize_duration: Optional[OneHourRangeType],
+) -> tuple[int, int]:
+    """The (start offset, duration offset) that the device lfdi will apply to the event mrid"""
+    device_seed = identifier_seed(lfdi)
+    event_seed = identifier_seed(mrid)
+    return (
+        _offset(randomize_start, device_seed, (event_seed + _START_SALT) & _MASK64),
+        _offset(randomize_duration, device_seed, (event_seed + _DURATION_SALT) & _MASK64),
+    )
+
+
+class RandomizedEventColumns:
+    """The (per event) inputs for randomize_events. Every column has one entry per event (None randomize columns are
+    treated as no randomization).
+
+    Raises:
+        ValueError if the columns are different lengths"""
+
+    mrids: list[str]
+    starts: list[TimeType]
+    durations: list[int]
+    randomize_starts: list[Optional[OneHourRangeType]]
+    randomize_durations: list[Optional[OneHourRangeType]]
+
+    def __init__(
+        self,
+        mrids: Sequence[str],
+        starts: Sequence[TimeType],
+        durations: Sequence[int],
+        randomize_starts: Optional[Sequence[Optional[OneHourRangeType]]] = None,
+        randomize_durations: Optional[Sequence[Optional[OneHourRangeType]]] = None,
+    ):
+        count = len(mrids)
+        if len(starts) != count or len(durations) != count:
+            raise ValueError("mrids, starts and durations must be the same length.")
+        if (randomize_starts is not None and len(randomize_starts) != count) or (
+            randomize_durations is not None and len(randomize_durations) != count
+        ):
+            raise ValueError("randomize_starts and randomize_durations must be the same length as mrids.")
+
+        self.mrids = list(mrids)
+        self.starts = list(starts)
+        self.durations = list(durations)
+        self.randomize_starts = list(randomize_starts) if randomize_starts is not None else [None] * count
+        self.randomize_durations = list(randomize_durations) if randomize_durations is not None else [None] * count
+
+    @classmethod
+    def from_events(cls, events: Sequence[RandomizableEvent]) -> "RandomizedEventColumns":
+        """Extracts the columns from RandomizableEvent's (eg DERControlResponse)"""
+        return cls(
+            [e.mRID for e in events],
+            [e.interval.start for e in events],
+            [e.interval.duration for e in events],
+            [e.randomizeStart for e in events],
+            [e.randomizeDuration for e in events],
+        )
+
+
+def randomize_events(
+    lfdis: Sequence[str], events: RandomizedEventColumns
+) -> tuple[list[list[TimeType]], list[list[TimeType]]]:
+    """Evaluates the effective (start, end) of every event for every device (see module docs). Returns the
+    (effective_starts, effective_ends) grids indexed by [device][event] (in the order of lfdis / events)."""
+    mask = _MASK64
+
+    # Per event precalculation - (start, duration, start modulus, start sign, event start seed, duration modulus ...)
+    event_params: list[tuple[int, int, int, int, int, int, int, int]] = []
+    for mrid, start, duration, randomize_start, randomize_duration in zip(
+        events.mrids, events.starts, events.durations, events.randomize_starts, events.randomize_durations
+    ):
+        seed = identifier_seed(mrid)
+        event_params.append(
+            (
+                start,
+                duration,
+                abs(randomize_start) + 1 if randomize_start else 0,
+                -1 if randomize_start and randomize_start < 0 else 1,
+                (seed + _START_SALT) & mask,
+                abs(randomize_duration) + 1 if randomize_duration else 0,
+                -1 if randomize_duration and randomize_duration < 0 else 1,
+                (seed + _DURATION_SALT) & mask,
+            )
+        )
+
+    all_starts: list[list[TimeType]] = []
+    all_ends: list[list[TimeType]] = []
+    for lfdi in lfdis:
+        device_seed = identifier_seed(lfdi)
+        device_starts: list[TimeType] = []
+        device_ends: list[TimeType] = []
+        for (
+            start,
+            duration,
+            start_mod,
+            start_sign,
+            start_seed,
+            duration_mod,
+            duration_sign,
+            duration_seed,
+        ) in event_params:
+            # These are _mix inlined (function call overhead dominates at this scale)
+            if start_mod:
+                x = (device_seed + start_seed) & mask
+                x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & mask
+                x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & mask
+                start += start_sign * ((x ^ (x >> 31)) % start_mod)
+            if duration_mod:
+                x = (device_seed + duration_seed) & mask
+                x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & mask
+                x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & mask
+                duration += duration_sign * ((x ^ (x >> 31)) % duration_mod)
+            device_starts.append(start)
+            device_ends.append(start + (duration if duration > 0 else 0))
+        all_starts.append(device_starts)
+        all_ends.append(device_ends)
+    return all_starts, all_ends
+
+
+def randomize_event(lfdi: str, event: RandomizableEvent) -> tuple[TimeType, TimeType]:
+    """The effective (start, end) of event for the device lfdi. See randomize_events for details"""
+    starts, ends = randomize_events([lfdi], RandomizedEventColumns.from_events([event]))
+    return starts[0][0], ends[0][0]
@@ -0,0 +1,125 @@
+"""Batch evaluation of EventStatus (currentStatus / potentiallySuperseded) for many Events (eg DERControlResponse or
+TimeTariffIntervalResponse) at a single point in time.
+
+Inputs are parallel columns (one entry per event) and the currentStatus of each event is evaluated as:
+
+    1. Cancelled (or CancelledWithRandomization if the event is randomized) if the event is flagged as cancelled
+    2. Superseded if the event is flagged as superseded
+    3. Active if the event start <= now
+    4. Scheduled otherwise
+
+potentiallySuperseded is set for superseded events and for any (non cancelled) event that overlaps another (non
+cancelled) event in the same batch. Overlap detection is a single sort + sweep (O(n log n))."""
+
+from itertools import compress
+from typing import Iterable, Optional, Sequence, TypeVar
+
+from envoy_schema.server.schema.sep2.event import Event, EventStatusType
+from envoy_schema.server.schema.sep2.types import TimeType
+
+EventType = TypeVar("EventType", bound=Event)
+
+CANCELLED_EVENT_STATUSES = frozenset([EventStatusType.Cancelled, EventStatusType.CancelledWithRandomization])
+
+
+def _check_length(name: str, values: Optional[Sequence], count: int) -> None:
+    if values is not None and len(values) != count:
+        raise ValueError(f"Got {len(values)} {name} for {count} events.")
+
+
+def find_overlapping_events(
+    starts: Sequence[TimeType], durations: Sequence[int], excluded: Optional[Sequence[bool]] = None
+) -> list[bool]:
+    """For each event (start, duration) - True if it overlaps (for any amount of time) at least one other event.
+    Events flagged in excluded (and events with a non positive duration) never overlap.
+
+    Raises:
+        ValueError if the columns are different lengths"""
+    count = len(starts)
+    _check_length("durations", durations, count)
+    _check_length("excluded", excluded, count)
+
+    overlapping = [False] * count
+    order = sorted(
+        (idx for idx in range(count) if durations[idx] > 0 and not (excluded and excluded[idx])),
+        key=starts.__getitem__,
+    )
+
+    # Sorted by start, an event overlaps an earlier event if any earlier end > its start and overlaps a later event if
+    # the very next start < its end.
+    max_end: Optional[TimeType] = None
+    for position, idx in enumerate(order):
+        start = starts[idx]
+        end = start + durations[idx]
+        if max_end is not None and max_end > start:
+            overlapping[idx] = True
+        elif position + 1 < len(order) and starts[order[position + 1]] < end:
+            overlapping[idx] = True
+        if max_end is None or end > max_end:
+            max_end = end
+    return overlapping
+
+
+def evaluate_event_statuses(
+    starts: Sequence[TimeType],
+    durations: Sequence[int],
+    now: TimeType,
+    cancelled: Optional[Sequence[bool]] = None,
+    superseded: Optional[Sequence[bool]] = None,
+    randomized: Optional[Sequence[bool]] = None,
+) -> tuple[list[int], list[bool]]:
+    """Evaluates the EventStatus of every event (see module docs) at now. Every argument is a column with one entry per
+    event (None columns are treated as all False). randomized flags events that have a randomizeStart/randomizeDuration
+    (only used for cancelled events). Returns the (currentStatus codes, potentiallySuperseded flags) columns.
+
+    Raises:
+        ValueError if the columns are different lengths"""
+    count = len(starts)
+    _check_length("durations", durations, count)
+    _check_length("cancelled", cancelled, count)
+    _check_length("superseded", superseded, count)
+    _check_length("randomized", randomized, count)
+
+    active = int(EventStatusType.Active)
+    scheduled = int(EventStatusType.Scheduled)
+    statuses = [active if start <= now else scheduled for start in starts]
+    potentially_superseded = find_overlapping_events(starts, durations, cancelled)
+
+    if superseded is not None:
+        for idx in compress(range(count), superseded):
+            statuses[idx] = int(EventStatusType.Superseded)
+            potentially_superseded[idx] = True
+
+    if cancelled is not None:
+        for idx in compress(range(count), cancelled):
+            if randomized is not None and randomized[idx]:
+                statuses[idx] = int(EventStatusType.CancelledWithRandomization)
+            else:
+                statuses[idx] = int(EventStatusType.Cancelled)
+            potentially_superseded[idx] = False
+    return statuses, potentially_superseded
+
+
+def refresh_event_statuses(events: Iterable[EventType], now: TimeType) -> list[EventType]:
+    """Re-evaluates (in place) the EventStatus of every event at now. Events that are currently Cancelled /
+    Superseded retain that status (cancellation / supersession is driven by the server). EventStatus.dateTime is only
+    updated (to now) for events whose currentStatus changes. Returns the events as a list."""
+    events = list(events)
+    starts = [e.interval.start for e in events]
+    durations = [e.interval.duration for e in events]
+    cancelled = [e.EventStatus_.currentStatus in CANCELLED_EVENT_STATUSES for e in events]
+    superseded = [e.EventStatus_.currentStatus == EventStatusType.Superseded for e in events]
+    randomized = [e.EventStatus_.currentStatus == EventStatusType.CancelledWithRandomization for e in events]
+
+    statuses, potentially_superseded = evaluate_event_statuses(
+        starts, durations, now, cancelled, superseded, randomized
+    )
+    for event, status, potential in zip(events, statuses, potentially_superseded):
+        event_status = event.EventStatus_
+        if event_status.currentStatus != status:
+            event_status.currentStatus = status
+            event_status.dateTime = now
+        if event_status.potentiallySuperseded != potential:
+            event_status.potentiallySuperseded = potential
+            event_status.potentiallySupersededTime = now if potential else None
+    return events
@@ -0,0 +1,117 @@
+"""Field level structural diff / patch for pydantic models (eg DERStatus, DERAvailability, DERSettings and their admin
+counterparts). Used for detecting whether a re-posted resource actually changed anything (and what) so that unchanged
+writes / notifications can be skipped.
+
+A diff compares old and new field by field (recursing into sub models of the same type) and produces:
+
+    paths: The dotted path of every changed (leaf) field, eg "statWAvail.value", "inverterStatus"
+    patch: A minimal nested dict of changes. A nested dict is a patch for a sub model, any other value (including None
+           or an entire sub model) replaces the field value.
+
+Fields can be excluded from the comparison with dotted ignore paths (eg a readingTime that changes on every post - see
+SEP2_DIFF_IGNORED_FIELDS, or created_time / changed_time for the admin models). The comparison plan for each
+(model type, ignore) combination is compiled once and cached."""
+
+from functools import lru_cache
+from typing import Any, Iterable, Optional, TypeVar
+
+from pydantic import BaseModel
+
+# Fields on the sep2 resources that change on every post (or are server assigned) and don't represent a real change
+SEP2_DIFF_IGNORED_FIELDS: tuple[str, ...] = ("href", "subscribable", "readingTime", "updatedTime")
+
+ModelType = TypeVar("ModelType", bound=BaseModel)
+
+# (field name, ignore paths for sub models of this field) for every field that should be compared
+DiffPlan = tuple[tuple[str, frozenset[str]], ...]
+
+
+class ModelDiff:
+    """The changes between two instances of the same model. Evaluates as False if there are no changes"""
+
+    paths: list[str]  # Dotted path of every changed leaf field (in field order)
+    patch: dict[str, Any]  # Minimal (nested) patch that will transform the old model into the new (see apply_patch)
+
+    def __init__(self) -> None:
+        self.paths = []
+        self.patch = {}
+
+    def __bool__(self) -> bool:
+        return bool(self.paths)
+
+    def __repr__(self) -> str:
+        return f"ModelDiff({self.paths})"
+
+
+@lru_cache(maxsize=512)
+def _diff_plan(model_type: type[BaseModel], ignore: frozenset[str]) -> DiffPlan:
+    """Compiles the list of fields (and sub model ignores) to compare for model_type"""
+    ignored_names: set[str] = set()
+    sub_ignores: dict[str, set[str]] = {}
+    for path in ignore:
+        name, _, remainder = path.partition(".")
+        if remainder:
+            sub_ignores.setdefault(name, set()).add(remainder)
+        else:
+            ignored_names.add(name)
+
+    return tuple(
+        (name, frozenset(sub_ignores.get(name, ())))
+        for name in model_type.model_fields.keys()
+        if name not in ignored_names
+    )
+
+
+def _diff(old: BaseModel, new: BaseModel, ignore: frozenset[str], prefix: str, paths: list[str]) -> dict[str, Any]:
+    """Appends the changed paths of old -> new to paths and returns the patch"""
+    patch: dict[str, Any] = {}
+    old_values = old.__dict__
+    new_values = new.__dict__
+    for name, sub_ignore in _diff_plan(type(old), ignore):
+        old_value = old_values.get(name, None)
+        new_value = new_values.get(name, None)
+        if old_value is new_value:
+            continue
+
+        if isinstance(old_value, BaseModel) and isinstance(new_value, BaseModel) and type(old_value) is type(new_value):
+            sub_patch = _diff(old_value, new_value, sub_ignore, f"{prefix}{name}.", paths)
+            if sub_patch:
+                patch[name] = sub_patch
+        elif old_value != new_value:
+            paths.append(prefix + name)
+            patch[name] = new_value
+    return patch
+
+
+def diff_models(old: ModelType, new: ModelType, ignore: Iterable[str] = ()) -> ModelDiff:
+    """Calculates the field level changes from old to new. ignore is a collection of dotted field paths to exclude from
+    the comparison (paths that don't exist on the model are ignored, allowing a shared ignore list across types).
+
+    Raises:
+        ValueError if old and new are different types"""
+    if type(old) is not type(new):
+        raise ValueError(f"Can't diff {type(old).__name__} with {type(new).__name__}.")
+
+    result = ModelDiff()
+    result.patch = _diff(old, new, frozenset(ignore), "", result.paths)
+    return result
+
+
+def has_changed(old: Optional[ModelType], new: ModelType, ignore: Iterable[str] = ()) -> bool:
+    """True if new represents a change from old (a None old is always a change). See diff_models for details"""
+    if old is None:
+        return True
+    return bool(diff_models(old, new, ignore))
+
+
+def apply_patch(model: ModelType, patch: dict[str, Any]) -> ModelType:
+    """Creates a copy of model with patch (from diff_models) applied. model is not modified and the result is not
+    revalidated."""
+    updates: dict[str, Any] = {}
+    for name, value in patch.items():
+        current = getattr(model, name)
+        if isinstance(value, dict) and isinstance(current, BaseModel):
+            updates[name] = apply_patch(current, value)
+        else:
+            updates[name] = value
+    return model.model_copy(update=updates)
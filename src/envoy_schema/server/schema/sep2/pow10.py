@@ -0,0 +1,178 @@
+"""Power of ten encoding of numbers as the sep2 (value, multiplier) pairs used by ActivePower, ReactivePower,
+VoltageRMS, WattHour etc (where number = value * 10 ^ multiplier).
+
+Encoding picks the smallest multiplier that exactly encodes the number (eg 1500 -> (1500, 0), 1.25 -> (125, -2)). If
+that value doesn't fit in the specified integer range (eg INT16_RANGE for ActivePower), the multiplier is increased
+until it does (rounding the value). Encodings are cached as controls/readings typically repeat a small number of
+distinct values. The batch functions encode/decode entire columns of values at a time."""
+
+from decimal import ROUND_HALF_EVEN, Decimal
+from functools import lru_cache
+from typing import Iterable, Optional, Sequence, TypeVar, Union
+
+from pydantic import BaseModel
+
+INT16_RANGE = (-(2**15), 2**15 - 1)
+UINT16_RANGE = (0, 2**16 - 1)
+INT32_RANGE = (-(2**31), 2**31 - 1)
+UINT32_RANGE = (0, 2**32 - 1)
+
+MIN_MULTIPLIER = -9  # sep2 PowerOfTenMultiplierType
+MAX_MULTIPLIER = 9  # sep2 PowerOfTenMultiplierType
+
+Number = Union[Decimal, float, int]
+Pow10ModelType = TypeVar("Pow10ModelType", bound=BaseModel)
+
+
+def _to_decimal(number: Number) -> Decimal:
+    """Converts number to Decimal. floats use their shortest repr (eg 0.1 -> Decimal("0.1")) so that values that were
+    written as short decimals can still be exactly encoded"""
+    if isinstance(number, Decimal):
+        return number
+    if isinstance(number, float):
+        return Decimal(repr(number))
+    return Decimal(number)
+
+
+def _exact_multiplier(number: Decimal) -> int:
+    """The smallest multiplier (limited to MIN_MULTIPLIER) that can exactly encode number (ignoring range limits)"""
+    if not number:
+        return 0
+    return max(min(int(number.normalize().as_tuple().exponent), 0), MIN_MULTIPLIER)
+
+
+@lru_cache(maxsize=8192)
+def _encode(number: Decimal, value_range: tuple[int, int], exact: bool) -> tuple[int, int]:
+    """Cached implementation of encode_pow10"""
+    if not number.is_finite():
+        raise ValueError(f"Can't encode {number}. Value must be finite.")
+
+    min_value, max_value = value_range
+    if (number < 0 and min_value >= 0) or (number > 0 and max_value <= 0):
+        raise ValueError(f"{number} has a sign that can't be encoded in the range {value_range}.")
+
+    multiplier = _exact_multiplier(number)
+    while multiplier <= MAX_MULTIPLIER:
+        scaled = number.scaleb(-multiplier)
+        value = scaled.to_integral_value(rounding=ROUND_HALF_EVEN)
+        if min_value <= value <= max_value:
+            if exact and value != scaled:
+                raise ValueError(f"{number} can't be exactly encoded in the range {value_range}.")
+            return (int(value), multiplier)
+        multiplier += 1
+    raise ValueError(f"{number} is too large to encode in the range {value_range}.")
+
+
+def encode_pow10(number: Number, value_range: tuple[int, int] = INT16_RANGE, exact: bool = False) -> tuple[int, int]:
+    """Encodes number as (value, multiplier) with value in value_range (see module docs for how multiplier is chosen).
+    If the number can't be exactly represented, value will be rounded (half even) unless exact is set.
+
+    Raises:
+        ValueError if number is not finite, too large for value_range or exact is set and number can't be encoded
+        without rounding"""
+    return _encode(_to_decimal(number), value_range, exact)
+
+
+def decode_pow10(value: int, multiplier: int) -> Decimal:
+    """Decodes a (value, multiplier) pair back to a Decimal. Positive multipliers decode to an integer Decimal (eg
+    (13, 1) -> Decimal("130") rather than Decimal("1.3E+2")) so the result serialises without an exponent"""
+    if multiplier > 0:
+        return Decimal(value * 10**multiplier)
+    return Decimal(value).scaleb(multiplier)
+
+
+def encode_pow10_batch(
+    numbers: Iterable[Optional[Number]], value_range: tuple[int, int] = INT16_RANGE, exact: bool = False
+) -> tuple[list[Optional[int]], list[Optional[int]]]:
+    """Encodes every number independently (see encode_pow10). Returns the (values, multipliers) columns. None numbers
+    are encoded as None in both columns.
+
+    Raises:
+        ValueError if any number can't be encoded (see encode_pow10)"""
+    encode = _encode
+    to_decimal = _to_decimal
+    values: list[Optional[int]] = []
+    multipliers: list[Optional[int]] = []
+    for number in numbers:
+        if number is None:
+            values.append(None)
+            multipliers.append(None)
+        else:
+            value, multiplier = encode(to_decimal(number), value_range, exact)
+            values.append(value)
+            multipliers.append(multiplier)
+    return values, multipliers
+
+
+def encode_pow10_shared(
+    numbers: Sequence[Optional[Number]], value_range: tuple[int, int] = INT16_RANGE, exact: bool = False
+) -> tuple[list[Optional[int]], int]:
+    """Encodes numbers using a single shared multiplier - starting at the smallest multiplier that exactly encodes every
+    number and increasing until every number fits in value_range (every number must be exactly encoded if exact is
+    set). None numbers are encoded as None. Returns the (values, multiplier).
+
+    Raises:
+        ValueError if any number can't be encoded (see encode_pow10)"""
+    decimals = [_to_decimal(n) if n is not None else None for n in numbers]
+    multiplier = MAX_MULTIPLIER
+    for number in decimals:
+        if number is not None:
+            _encode(number, value_range, exact)  # Ensures every number can be independently encoded
+            multiplier = min(multiplier, _exact_multiplier(number))
+    if multiplier == MAX_MULTIPLIER and all(n is None for n in decimals):
+        multiplier = 0
+
+    min_value, max_value = value_range
+    while multiplier <= MAX_MULTIPLIER:
+        values: list[Optional[int]] = []
+        for number in decimals:
+            if number is None:
+                values.append(None)
+                continue
+
+            scaled = number.scaleb(-multiplier)
+            value = scaled.to_integral_value(rounding=ROUND_HALF_EVEN)
+            if exact and value != scaled:
+                raise ValueError(f"{number} can't be exactly encoded with multiplier {multiplier}.")
+            if not (min_value <= value <= max_value):
+                break  # Rounding at the shared multiplier pushed a value out of range - try the next multiplier
+            values.append(int(value))
+        else:
+            return values, multiplier
+        multiplier += 1
+    raise ValueError(f"numbers can't be encoded in the range {value_range} with a shared multiplier.")
+
+
+def decode_pow10_batch(
+    values: Sequence[Optional[int]], multipliers: Union[int, Sequence[Optional[int]]]
+) -> list[Optional[Decimal]]:
+    """Decodes the (values, multipliers) columns back to Decimals. multipliers can be a single shared multiplier.
+    None values (or multipliers) decode as None.
+
+    Raises:
+        ValueError if multipliers is a different length to values"""
+    if isinstance(multipliers, int):
+        return [decode_pow10(v, multipliers) if v is not None else None for v in values]
+
+    if len(multipliers) != len(values):
+        raise ValueError(f"Got {len(multipliers)} multipliers for {len(values)} values.")
+    return [decode_pow10(v, m) if v is not None and m is not None else None for v, m in zip(values, multipliers)]
+
+
+def to_pow10_model(
+    model_type: type[Pow10ModelType],
+    number: Number,
+    value_range: tuple[int, int] = INT16_RANGE,
+    exact: bool = False,
+) -> Pow10ModelType:
+    """Encodes number as a (value, multiplier) model (eg ActivePower). See encode_pow10 for details
+
+    Raises:
+        ValueError if number can't be encoded (see encode_pow10)"""
+    value, multiplier = encode_pow10(number, value_range, exact)
+    return model_type(value=value, multiplier=multiplier)
+
+
+def from_pow10_model(model: BaseModel) -> Decimal:
+    """Decodes a (value, multiplier) model (eg ActivePower) to a Decimal"""
+    return decode_pow10(getattr(model, "value"), getattr(model, "multiplier"))
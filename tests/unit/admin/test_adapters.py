@@ -0,0 +1,57 @@
+import json
+
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.admin.schema.adapters import (
+    ADMIN_MODELS,
+    build_type_adapters,
+    dump_json,
+    dump_list_json,
+    get_list_type_adapter,
+    get_type_adapter,
+    validate_json,
+    validate_list_json,
+)
+from envoy_schema.admin.schema.archive import ArchivePageResponse, ArchiveSiteResponse
+from envoy_schema.admin.schema.site import SitePageResponse, SiteResponse
+from envoy_schema.admin.schema.site_control import SiteControlRequest
+
+
+def test_admin_models_discovered():
+    assert SiteControlRequest in ADMIN_MODELS
+    assert SitePageResponse in ADMIN_MODELS
+    assert ArchivePageResponse[ArchiveSiteResponse] in ADMIN_MODELS
+    assert ArchivePageResponse not in ADMIN_MODELS, "Unparameterised generics can't be adapted"
+    assert len(set(ADMIN_MODELS)) == len(ADMIN_MODELS)
+
+
+def test_type_adapters_cached():
+    build_type_adapters()
+    assert get_type_adapter(SiteResponse) is get_type_adapter(SiteResponse)
+    assert get_list_type_adapter(SiteResponse) is get_list_type_adapter(SiteResponse)
+
+
+@pytest.mark.parametrize("t", [SiteControlRequest, SitePageResponse, SiteResponse])
+def test_dump_validate_json_roundtrip(t: type):
+    instance = generate_class_instance(t, generate_relationships=True)
+    raw = dump_json(instance)
+    assert isinstance(raw, bytes)
+    assert json.loads(raw) == json.loads(instance.model_dump_json())
+    assert validate_json(t, raw) == instance
+
+    instances = [generate_class_instance(t, seed=s, generate_relationships=True) for s in [101, 202]]
+    raw_list = dump_list_json(t, instances, exclude_none=True)
+    assert json.loads(raw_list) == [json.loads(i.model_dump_json(exclude_none=True)) for i in instances]
+    assert validate_list_json(t, raw_list) == instances
+
+
+def test_dump_list_json_matches_naive():
+    """The cached adapter output should match model_dump() + json.dumps() for a large page of controls"""
+    controls = [generate_class_instance(SiteControlRequest, seed=s, optional_is_none=False) for s in range(200)]
+    raw = dump_list_json(SiteControlRequest, controls)
+
+    assert json.loads(raw) == json.loads(json.dumps([c.model_dump(mode="json") for c in controls]))
+    assert validate_list_json(SiteControlRequest, raw) == [
+        SiteControlRequest.model_validate(c) for c in json.loads(raw)
+    ]
@@ -0,0 +1,123 @@
+import asyncio
+import threading
+from datetime import datetime
+
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.admin.schema.archive import ArchivePageResponse, ArchiveSiteResponse
+from envoy_schema.admin.schema.archive_iterator import (
+    aiter_archive_entities,
+    aiter_archive_pages,
+    iter_archive_entities,
+    iter_archive_pages,
+)
+
+ALL_ENTITIES = [generate_class_instance(ArchiveSiteResponse, seed=seed) for seed in range(1, 24)]
+
+
+def get_page(start: int, limit: int) -> ArchivePageResponse[ArchiveSiteResponse]:
+    return ArchivePageResponse[ArchiveSiteResponse](
+        total_count=len(ALL_ENTITIES),
+        limit=limit,
+        start=start,
+        period_start=datetime(2022, 11, 10),
+        period_end=datetime(2023, 11, 10),
+        entities=ALL_ENTITIES[start : start + limit],  # noqa: E203
+    )
+
+
+@pytest.mark.parametrize(
+    "limit, start, expected_starts",
+    [(5, 0, [0, 5, 10, 15, 20]), (23, 0, [0]), (100, 0, [0]), (10, 3, [3, 13]), (5, 23, [23]), (5, 50, [50])],
+)
+def test_iter_archive_pages(limit: int, start: int, expected_starts: list[int]):
+    fetches: list[tuple[int, int]] = []
+
+    def fetch_page(s: int, lim: int):
+        fetches.append((s, lim))
+        return get_page(s, lim)
+
+    pages = list(iter_archive_pages(fetch_page, limit, start))
+    assert [p.start for p in pages] == expected_starts
+    assert fetches == [(s, limit) for s in expected_starts], "Each page should be fetched exactly once"
+    assert list(iter_archive_entities(get_page, limit, start)) == ALL_ENTITIES[start:]
+
+
+def test_iter_archive_pages_prefetches():
+    """The second page should be fetched while the first page is still being processed"""
+    second_page_requested = threading.Event()
+
+    def fetch_page(s: int, lim: int):
+        if s > 0:
+            second_page_requested.set()
+        return get_page(s, lim)
+
+    pages = iter_archive_pages(fetch_page, 10)
+    first_page = next(pages)
+    assert first_page.start == 0
+    assert second_page_requested.wait(timeout=5)
+    assert [p.start for p in pages] == [10, 20]
+
+
+def test_iter_archive_pages_early_exit_doesnt_block():
+    """Closing the iterator shouldn't wait for the outstanding prefetch to complete"""
+    prefetch_started = threading.Event()
+    release = threading.Event()
+    finished: list[int] = []
+
+    def fetch_page(s: int, lim: int):
+        if s >= 10:
+            prefetch_started.set()
+            release.wait(timeout=5)
+        finished.append(s)
+        return get_page(s, lim)
+
+    pages = iter_archive_pages(fetch_page, 10)
+    try:
+        assert next(pages).start == 0
+        assert prefetch_started.wait(timeout=5)
+        pages.close()
+        assert finished == [0], "close() should return while the prefetch is still in progress"
+    finally:
+        release.set()
+
+
+@pytest.mark.parametrize("limit, start", [(5, 0), (23, 0), (10, 3), (5, 50)])
+def test_aiter_archive_entities(limit: int, start: int):
+    async def fetch_page(s: int, lim: int):
+        await asyncio.sleep(0)
+        return get_page(s, lim)
+
+    async def collect():
+        return [e async for e in aiter_archive_entities(fetch_page, limit, start)]
+
+    assert asyncio.run(collect()) == ALL_ENTITIES[start:]
+
+
+def test_aiter_archive_pages_prefetches_and_cancels():
+    """The next page should be requested before the current page is processed and cancelled if iteration stops"""
+    started: list[int] = []
+    cancelled: list[int] = []
+
+    async def fetch_page(s: int, lim: int):
+        started.append(s)
+        try:
+            if s >= 10:
+                await asyncio.sleep(10)
+            return get_page(s, lim)
+        except asyncio.CancelledError:
+            cancelled.append(s)
+            raise
+
+    async def consume_first_page():
+        pages = aiter_archive_pages(fetch_page, 10)
+        first = await pages.__anext__()
+        await asyncio.sleep(0)  # Let the prefetch task start
+        assert started == [0, 10]
+        await pages.aclose()
+        await asyncio.sleep(0)  # Let the cancellation propagate
+        return first
+
+    assert asyncio.run(consume_first_page()).start == 0
+    assert cancelled == [10]
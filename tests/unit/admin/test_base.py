@@ -0,0 +1,197 @@
+from bisect import bisect_right
+from datetime import datetime, timezone
+from typing import Optional
+
+import pydantic
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.admin.schema.archive import ArchiveCursorPageResponse, ArchiveSiteResponse
+from envoy_schema.admin.schema.base import (
+    BaseCursorPageModel,
+    BatchCreateRangeResponse,
+    BatchCreateResponse,
+    KeysetCursor,
+    decode_page_cursor,
+    encode_page_cursor,
+    encode_sequence_runs,
+    iter_sequence_runs,
+)
+from envoy_schema.admin.schema.certificate import CertificateCursorPageResponse
+from envoy_schema.admin.schema.site import SiteCursorPageResponse
+from envoy_schema.admin.schema.site_control import SiteControlCursorPageResponse
+
+
+@pytest.mark.parametrize(
+    "ids, expected_runs",
+    [
+        ([], []),
+        ([1], [(1, 1)]),
+        ([1, 2, 3, 4], [(1, 4)]),
+        ([5, 6, 7, 8, 2], [(5, 4), (2, 1)]),
+        ([3, 3, 4], [(3, 1), (3, 2)]),
+        ([-2, -1, 0, 10, 11], [(-2, 3), (10, 2)]),
+    ],
+)
+def test_sequence_runs(ids: list[int], expected_runs: list[tuple[int, int]]):
+    assert encode_sequence_runs(ids) == expected_runs
+    assert list(iter_sequence_runs(expected_runs)) == ids
+
+
+@pytest.mark.parametrize(
+    "ids",
+    [
+        [],
+        [1, 5, 3],
+        [1, 2, 3],
+        list(range(1000, 101000)),
+        [*range(1, 50000), 50001, *range(50003, 100000)],
+    ],
+)
+def test_batch_create_responses_iter_ids(ids: list[int]):
+    response = BatchCreateResponse(ids=ids)
+    assert response.total_ids() == len(ids)
+    assert list(response.iter_ids()) == ids
+    assert BatchCreateResponse.model_validate_json(response.model_dump_json()).ids == ids
+
+    range_response = BatchCreateRangeResponse.from_ids(ids)
+    assert range_response.id_ranges == encode_sequence_runs(ids)
+    assert range_response.total_ids() == len(ids)
+    assert list(range_response.iter_ids()) == ids
+    assert list(BatchCreateRangeResponse.model_validate_json(range_response.model_dump_json()).iter_ids()) == ids
+
+
+def test_batch_create_response_json():
+    """BatchCreateResponse must keep its original (ids only) encoding"""
+    assert BatchCreateResponse(ids=[5, 6, 7, 8, 2]).model_dump_json() == '{"ids":[5,6,7,8,2]}'
+    assert BatchCreateRangeResponse.from_ids([5, 6, 7, 8, 2]).model_dump_json() == '{"id_ranges":[[5,4],[2,1]]}'
+
+
+def test_batch_create_range_response_size():
+    """A 100k row contiguous batch should encode to a tiny fraction of a plain id list"""
+    ids = list(range(123456, 223456))
+    assert len(BatchCreateRangeResponse.from_ids(ids).model_dump_json()) * 1000 < len(
+        BatchCreateResponse(ids=ids).model_dump_json()
+    )
+
+
+@pytest.mark.parametrize(
+    "t, args",
+    [
+        (BatchCreateResponse, {}),
+        (BatchCreateResponse, {"id_ranges": [(1, 1)]}),
+        (BatchCreateRangeResponse, {}),
+        (BatchCreateRangeResponse, {"id_ranges": [(1, 0)]}),
+        (BatchCreateRangeResponse, {"id_ranges": [(1, 2), (5, -1)]}),
+    ],
+)
+def test_batch_create_response_invalid(t: type, args: dict):
+    with pytest.raises(pydantic.ValidationError):
+        t(**args)
+
+
+class InMemoryStore:
+    """A sorted in memory "table" that counts how many rows each paging strategy has to visit"""
+
+    def __init__(self, ids: list[int]):
+        self.ids = sorted(ids)
+        self.rows_visited = 0
+
+    def offset_page(self, start: int, limit: int) -> list[int]:
+        # An OFFSET scan must walk (and discard) every skipped row
+        page: list[int] = []
+        for idx, id in enumerate(self.ids):
+            self.rows_visited += 1
+            if idx >= start:
+                page.append(id)
+                if len(page) == limit:
+                    break
+        return page
+
+    def cursor_page(self, cursor: Optional[str], limit: int) -> tuple[list[int], Optional[str]]:
+        # A keyset lookup seeks directly to the key via the (sorted) index
+        idx = 0
+        if cursor is not None:
+            idx = bisect_right(self.ids, decode_page_cursor(cursor, KeysetCursor).last_id)
+        page = self.ids[idx : idx + limit]  # noqa: E203
+        self.rows_visited += len(page)
+        next_cursor = encode_page_cursor(KeysetCursor(last_id=page[-1])) if len(page) == limit else None
+        return page, next_cursor
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        KeysetCursor(last_id=123),
+        KeysetCursor(last_id=-1, last_changed_time=datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)),
+    ],
+)
+def test_page_cursor_roundtrip(cursor: KeysetCursor):
+    encoded = encode_page_cursor(cursor)
+    assert isinstance(encoded, str)
+    assert "=" not in encoded and "/" not in encoded and "+" not in encoded, "Should be URL safe"
+    assert decode_page_cursor(encoded, KeysetCursor) == cursor
+
+
+@pytest.mark.parametrize("cursor", ["", "!!!", "e30", encode_page_cursor(BatchCreateResponse(ids=[1]))])
+def test_page_cursor_invalid(cursor: str):
+    with pytest.raises(ValueError):
+        decode_page_cursor(cursor, KeysetCursor)
+
+
+def test_cursor_paging_cost_is_constant():
+    """Page N of a cursor page should cost the same as page 1 (unlike an offset page)"""
+    store = InMemoryStore(list(range(1, 500001)))
+    limit = 100
+
+    # Walk to the 1000th page, recording the cost of each page
+    cursor = None
+    cursor_costs: list[int] = []
+    all_ids: list[int] = []
+    for _ in range(1000):
+        store.rows_visited = 0
+        page, cursor = store.cursor_page(cursor, limit)
+        cursor_costs.append(store.rows_visited)
+        all_ids.extend(page)
+    assert all_ids == list(range(1, 100001)), "Cursor paging should be contiguous with no gaps or repeats"
+    assert cursor_costs[0] == cursor_costs[-1] == limit
+
+    store.rows_visited = 0
+    assert store.offset_page(0, limit) == list(range(1, limit + 1))
+    first_offset_cost = store.rows_visited
+    store.rows_visited = 0
+    assert store.offset_page(999 * limit, limit) == list(range(99901, 100001))
+    assert store.rows_visited == 1000 * first_offset_cost
+
+    # The final page has no next cursor
+    store.rows_visited = 0
+    page, cursor = store.cursor_page(encode_page_cursor(KeysetCursor(last_id=499950)), limit)
+    assert page == list(range(499951, 500001))
+    assert cursor is None
+
+
+@pytest.mark.parametrize(
+    "t",
+    [SiteCursorPageResponse, SiteControlCursorPageResponse, CertificateCursorPageResponse],
+)
+def test_cursor_page_models(t: type):
+    page = generate_class_instance(t, optional_is_none=True)
+    assert isinstance(page, BaseCursorPageModel)
+    assert page.next_cursor is None
+    assert page.total_count is None
+    assert t.model_validate_json(page.model_dump_json()) == page
+
+
+def test_archive_cursor_page():
+    """Sanity check that the generics don't introduce any weird behaviour"""
+    page = ArchiveCursorPageResponse(
+        limit=2,
+        next_cursor=encode_page_cursor(KeysetCursor(last_id=5)),
+        period_start=datetime(2022, 11, 10),
+        period_end=datetime(2023, 11, 10),
+        entities=[generate_class_instance(ArchiveSiteResponse, generate_relationships=True)],
+    )
+    assert isinstance(page, BaseCursorPageModel)
+    assert decode_page_cursor(page.next_cursor, KeysetCursor).last_id == 5
+    parsed = ArchiveCursorPageResponse[ArchiveSiteResponse].model_validate_json(page.model_dump_json())
+    assert parsed.entities == page.entities
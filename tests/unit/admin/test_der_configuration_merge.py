@@ -0,0 +1,212 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+
+from envoy_schema.admin.schema.der_configuration_merge import merge_der_configuration, merge_der_configurations
+from envoy_schema.admin.schema.site import DERConfiguration
+from envoy_schema.server.schema.sep2.der import (
+    AbnormalCategoryType,
+    DERCapability,
+    DERControlType,
+    DERSettings,
+    DERType,
+    DOESupportedMode,
+    NormalCategoryType,
+    VPPControlType,
+)
+from envoy_schema.server.schema.sep2.der_control_types import (
+    ActivePower,
+    AmpereHour,
+    ApparentPower,
+    CurrentRMS,
+    ReactivePower,
+    VoltageRMS,
+    WattHour,
+)
+
+CREATED = datetime(2024, 1, 2, 12, tzinfo=timezone.utc)
+CHANGED = datetime(2024, 1, 3, 12, tzinfo=timezone.utc)
+
+
+def make_capability(seed: int, all_set: bool) -> DERCapability:
+    optional = {
+        "rtgAbnormalCategory": AbnormalCategoryType.CATEGORY_2,
+        "rtgNormalCategory": NormalCategoryType.CATEGORY_B,
+        "rtgMaxA": CurrentRMS(value=seed + 1, multiplier=0),
+        "rtgMaxAh": AmpereHour(value=seed + 2, multiplier=1),
+        "rtgMaxChargeRateVA": ApparentPower(value=seed + 3, multiplier=0),
+        "rtgMaxChargeRateW": ActivePower(value=seed + 4, multiplier=2),
+        "rtgMaxDischargeRateVA": ApparentPower(value=seed + 5, multiplier=0),
+        "rtgMaxDischargeRateW": ActivePower(value=seed + 6, multiplier=-1),
+        "rtgMaxV": VoltageRMS(value=2530, multiplier=-1),
+        "rtgMinV": VoltageRMS(value=2160, multiplier=-1),
+        "rtgMaxVA": ApparentPower(value=seed + 7, multiplier=0),
+        "rtgMaxVar": ReactivePower(value=seed + 8, multiplier=0),
+        "rtgMaxVarNeg": ReactivePower(value=-(seed + 9), multiplier=0),
+        "rtgMaxWh": WattHour(value=seed + 10, multiplier=3),
+        "rtgVNom": VoltageRMS(value=230, multiplier=0),
+        "vppModesSupported": "01",
+    }
+    return DERCapability(
+        modesSupported="%X" % (seed % 256),
+        rtgMaxW=ActivePower(value=seed + 11, multiplier=1),
+        type_=DERType.PHOTOVOLTAIC_SYSTEM,
+        doeModesSupported="%X" % (seed % 16),
+        **(optional if all_set else {}),
+    )
+
+
+def make_settings(seed: int, all_set: bool) -> DERSettings:
+    optional = {
+        "modesEnabled": "%X" % (seed % 128),
+        "setMaxA": CurrentRMS(value=seed + 101, multiplier=0),
+        "setMaxAh": AmpereHour(value=seed + 102, multiplier=0),
+        "setMaxChargeRateVA": ApparentPower(value=seed + 103, multiplier=0),
+        "setMaxChargeRateW": ActivePower(value=seed + 104, multiplier=0),
+        "setMaxDischargeRateVA": ApparentPower(value=seed + 105, multiplier=0),
+        "setMaxDischargeRateW": ActivePower(value=seed + 106, multiplier=0),
+        "setMaxV": VoltageRMS(value=2500, multiplier=-1),
+        "setMinV": VoltageRMS(value=2200, multiplier=-1),
+        "setMaxVA": ApparentPower(value=seed + 107, multiplier=0),
+        "setMaxVar": ReactivePower(value=seed + 108, multiplier=-2),
+        "setMaxWh": WattHour(value=seed + 110, multiplier=0),
+        "setVNom": VoltageRMS(value=240, multiplier=0),
+        "doeModesEnabled": "%X" % (seed % 8),
+        "vppModesEnabled": "00",
+        "setMinWh": WattHour(value=seed + 111, multiplier=0),
+    }
+    return DERSettings(
+        setGradW=0,
+        setMaxW=ActivePower(value=seed + 112, multiplier=0),
+        updatedTime=1700000000,
+        **(optional if all_set else {}),
+    )
+
+
+def naive_merge(capability: DERCapability, settings: Optional[DERSettings]) -> DERConfiguration:
+    """Reference field by field implementation of the documented semantics"""
+
+    def pick(setting_name: Optional[str], rating_name: Optional[str]):
+        if setting_name and settings is not None and getattr(settings, setting_name) is not None:
+            return getattr(settings, setting_name)
+        return getattr(capability, rating_name) if rating_name else None
+
+    def dec(v) -> Optional[Decimal]:
+        return Decimal(v.value) * (Decimal(10) ** v.multiplier) if v is not None else None
+
+    def flag(t, v):
+        return t(int(v, 16)) if v is not None else None
+
+    max_var = dec(pick("setMaxVar", "rtgMaxVar"))
+    max_var_neg = dec(pick("setMaxVarNeg", "rtgMaxVarNeg"))
+    return DERConfiguration(
+        created_time=CREATED,
+        changed_time=CHANGED,
+        modes_supported=flag(DERControlType, pick("modesEnabled", "modesSupported")),
+        type=capability.type_,
+        doe_modes_supported=flag(DOESupportedMode, pick("doeModesEnabled", "doeModesSupported")),
+        max_w=dec(pick("setMaxW", "rtgMaxW")),
+        vpp_modes_supported=flag(VPPControlType, pick("vppModesEnabled", "vppModesSupported")),
+        abnormal_category=capability.rtgAbnormalCategory,
+        normal_category=capability.rtgNormalCategory,
+        max_a=dec(pick("setMaxA", "rtgMaxA")),
+        max_ah=dec(pick("setMaxAh", "rtgMaxAh")),
+        max_charge_rate_va=dec(pick("setMaxChargeRateVA", "rtgMaxChargeRateVA")),
+        max_charge_rate_w=dec(pick("setMaxChargeRateW", "rtgMaxChargeRateW")),
+        max_discharge_rate_va=dec(pick("setMaxDischargeRateVA", "rtgMaxDischargeRateVA")),
+        max_discharge_rate_w=dec(pick("setMaxDischargeRateW", "rtgMaxDischargeRateW")),
+        max_v=dec(pick("setMaxV", "rtgMaxV")),
+        min_v=dec(pick("setMinV", "rtgMinV")),
+        min_wh=dec(pick("setMinWh", None)),
+        max_va=dec(pick("setMaxVA", "rtgMaxVA")),
+        max_var=max_var,
+        max_var_neg=max_var_neg if max_var_neg is not None or max_var is None else -max_var,
+        max_wh=dec(pick("setMaxWh", "rtgMaxWh")),
+        v_nom=dec(pick("setVNom", "rtgVNom")),
+    )
+
+
+def test_merge_der_configuration_settings_take_precedence():
+    capability = make_capability(1, True)
+    settings = make_settings(1, True)
+    config = merge_der_configuration(capability, settings, CREATED, CHANGED)
+
+    assert isinstance(config, DERConfiguration)
+    assert config.created_time == CREATED
+    assert config.changed_time == CHANGED
+    assert config.max_w == Decimal("113")  # setMaxW
+    assert config.max_v == Decimal("250.0")  # setMaxV
+    assert config.max_var == Decimal("1.09")  # setMaxVar
+    assert config.max_var_neg == Decimal("-10")  # rtgMaxVarNeg (not set in settings)
+    assert config.modes_supported == DERControlType(1)  # modesEnabled
+    assert isinstance(config.modes_supported, DERControlType)
+    assert config.doe_modes_supported == DOESupportedMode(1)
+    assert isinstance(config.doe_modes_supported, DOESupportedMode)
+    assert config.vpp_modes_supported == VPPControlType(0)
+    assert config.abnormal_category == AbnormalCategoryType.CATEGORY_2
+    assert config.min_wh == Decimal("112")
+
+
+def test_merge_der_configuration_no_settings():
+    capability = make_capability(2, True)
+    config = merge_der_configuration(capability, None, CREATED, CHANGED)
+
+    assert config.max_w == Decimal("130")  # rtgMaxW (13 x 10^1)
+    assert config.max_ah == Decimal("40")
+    assert config.max_discharge_rate_w == Decimal("0.8")
+    assert config.modes_supported == DERControlType(2)
+    assert config.doe_modes_supported == DOESupportedMode(2)
+    assert config.vpp_modes_supported == VPPControlType.OP_MOD_STORAGE_TARGET_W
+    assert config.min_wh is None  # No nameplate equivalent
+
+    # Positive multipliers must serialise without an exponent (eg "130" not "1.3E+2")
+    config_json = config.model_dump(mode="json")
+    assert config_json["max_w"] == "130"
+    assert config_json["max_ah"] == "40"
+    assert config_json["max_charge_rate_w"] == "600"
+    assert config_json["max_wh"] == "12000"
+    assert config_json["max_discharge_rate_w"] == "0.8"
+
+
+def test_merge_der_configuration_max_var_neg_default():
+    capability = make_capability(3, False)
+    settings = make_settings(3, True)
+    config = merge_der_configuration(capability, settings, CREATED, CHANGED)
+    assert config.max_var == Decimal("1.11")
+    assert config.max_var_neg == Decimal("-1.11")
+
+    config = merge_der_configuration(capability, make_settings(3, False), CREATED, CHANGED)
+    assert config.max_var is None
+    assert config.max_var_neg is None
+    assert config.abnormal_category is None
+
+
+@pytest.mark.parametrize("capability_all_set", [True, False])
+@pytest.mark.parametrize("settings_mode", [None, True, False])
+def test_merge_der_configurations_matches_naive(capability_all_set: bool, settings_mode: Optional[bool]):
+    capabilities = [make_capability(i, capability_all_set) for i in range(50)]
+    settings = [make_settings(i, settings_mode) if settings_mode is not None else None for i in range(50)]
+    merged = merge_der_configurations(capabilities, settings, [CREATED] * 50, [CHANGED] * 50)
+    assert merged == [naive_merge(c, s) for c, s in zip(capabilities, settings)]
+
+
+def test_merge_der_configurations_mixed_and_empty():
+    capabilities = [make_capability(i, i % 2 == 0) for i in range(20)]
+    settings = [make_settings(i, i % 3 == 0) if i % 4 else None for i in range(20)]
+    changed = [CHANGED + timedelta(seconds=i) for i in range(20)]
+    merged = merge_der_configurations(capabilities, settings, [CREATED] * 20, changed)
+    for config, capability, setting, changed_time in zip(merged, capabilities, settings, changed):
+        expected = naive_merge(capability, setting)
+        expected.changed_time = changed_time
+        assert config == expected
+
+    assert merge_der_configurations([], [], [], []) == []
+
+
+def test_merge_der_configurations_length_mismatch():
+    with pytest.raises(ValueError):
+        merge_der_configurations([make_capability(1, True)], [], [CREATED], [CHANGED])
+    with pytest.raises(ValueError):
+        merge_der_configurations([make_capability(1, True)], [None], [CREATED], [])
@@ -0,0 +1,46 @@
+import hashlib
+from datetime import datetime, timezone
+
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.admin.schema.certificate import CertificateRequest
+from envoy_schema.admin.schema.device_identity import validate_certificate_requests, validate_site_identities
+from envoy_schema.admin.schema.site import SiteResponse
+from envoy_schema.server.schema.sep2.device_identifier import derive_lfdi_sfdi_batch
+
+CERTIFICATES = [f"certificate-{i}".encode() for i in range(5)]
+FINGERPRINTS = [hashlib.sha256(c).digest() for c in CERTIFICATES]
+IDENTIFIERS = derive_lfdi_sfdi_batch(CERTIFICATES)
+EXPIRY = datetime(2030, 1, 1, tzinfo=timezone.utc)
+
+
+def site(site_id: int, lfdi: str, sfdi: int) -> SiteResponse:
+    return generate_class_instance(SiteResponse, seed=site_id, site_id=site_id, lfdi=lfdi, sfdi=sfdi)
+
+
+def test_validate_site_identities():
+    sites = [site(i + 1, lfdi, sfdi) for i, (lfdi, sfdi) in enumerate(IDENTIFIERS)]
+    assert validate_site_identities(sites) == []
+
+    sites[1] = site(2, IDENTIFIERS[1][0].lower(), IDENTIFIERS[1][1])
+    sites[2] = site(3, IDENTIFIERS[2][0], IDENTIFIERS[3][1])
+    sites[4] = site(5, "abc", IDENTIFIERS[4][1])
+    assert [site_id for site_id, _ in validate_site_identities(sites)] == [3, 5]
+
+
+def test_validate_certificate_requests():
+    requests = [CertificateRequest(lfdi=lfdi, expiry=EXPIRY) for lfdi, _ in IDENTIFIERS]
+    sites = [site(i + 1, lfdi, sfdi) for i, (lfdi, sfdi) in enumerate(IDENTIFIERS[:3])]
+
+    assert validate_certificate_requests(requests) == []
+    assert validate_certificate_requests(requests, FINGERPRINTS) == []
+    assert [idx for idx, _ in validate_certificate_requests(requests, sites=sites)] == [3, 4]
+
+    requests[0] = CertificateRequest(lfdi=IDENTIFIERS[0][0].lower(), expiry=EXPIRY)
+    requests[1] = CertificateRequest(lfdi="not-an-lfdi", expiry=EXPIRY)
+    requests[2] = CertificateRequest(lfdi=IDENTIFIERS[3][0], expiry=EXPIRY)
+    assert [idx for idx, _ in validate_certificate_requests(requests, FINGERPRINTS)] == [1, 2]
+
+    with pytest.raises(ValueError):
+        validate_certificate_requests(requests, FINGERPRINTS[1:])
@@ -0,0 +1,83 @@
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.admin.schema.fixed_point import (
+    decimal_fields,
+    fixed_point_model,
+    from_fixed_point,
+    to_fixed_point,
+)
+from envoy_schema.admin.schema.site import DERAvailability, DERConfiguration
+from envoy_schema.admin.schema.site_control import SiteControlGroupDefaultResponse, SiteControlRequest
+from envoy_schema.admin.schema.site_reading import CSIPAusSiteReading
+
+
+@pytest.mark.parametrize(
+    "t", [SiteControlRequest, DERConfiguration, DERAvailability, SiteControlGroupDefaultResponse, CSIPAusSiteReading]
+)
+@pytest.mark.parametrize("optional_is_none", [True, False])
+def test_fixed_point_roundtrip(t: type, optional_is_none: bool):
+    original = generate_class_instance(t, optional_is_none=optional_is_none)
+    fixed_type = fixed_point_model(t)
+    assert fixed_type is fixed_point_model(t), "Should be cached"
+    assert set(decimal_fields(t)), "All of these types have Decimal fields"
+
+    fixed = to_fixed_point(original)
+    assert isinstance(fixed, fixed_type)
+    for name in decimal_fields(t):
+        assert getattr(fixed, name) is None or isinstance(getattr(fixed, name), int)
+
+    # Should roundtrip through JSON too
+    fixed_parsed = fixed_type.model_validate_json(fixed.model_dump_json())
+    assert fixed_parsed == fixed
+    assert from_fixed_point(fixed_parsed) == original
+    assert from_fixed_point(fixed) == original
+    assert from_fixed_point(fixed).model_dump_json() == original.model_dump_json()
+
+
+@pytest.mark.parametrize(
+    "import_limit_watts, export_limit_watts, pow10, expected",
+    [
+        (Decimal("1500"), None, None, (15, None, 2)),
+        (Decimal("1500"), Decimal("1.25"), None, (150000, 125, -2)),
+        (Decimal("1500.00"), Decimal("0"), None, (15, 0, 2)),
+        (Decimal("1500.00"), Decimal("-0.5"), 0, None),  # -0.5 can't be encoded
+        (Decimal("1500.00"), Decimal("-0.5"), -3, (1500000, -500, -3)),
+        (None, None, None, (None, None, 0)),
+    ],
+)
+def test_to_fixed_point_pow10(
+    import_limit_watts: Optional[Decimal],
+    export_limit_watts: Optional[Decimal],
+    pow10: Optional[int],
+    expected: Optional[tuple],
+):
+    original = generate_class_instance(
+        SiteControlRequest,
+        optional_is_none=True,
+        import_limit_watts=import_limit_watts,
+        export_limit_watts=export_limit_watts,
+    )
+    if expected is None:
+        with pytest.raises(ValueError):
+            to_fixed_point(original, pow10)
+        return
+
+    fixed = to_fixed_point(original, pow10)
+    assert (fixed.import_limit_watts, fixed.export_limit_watts, fixed.pow10_multiplier) == expected
+    assert from_fixed_point(fixed) == original
+
+    # Positive multipliers must serialise without an exponent (eg "1500" not "1.5E+3")
+    roundtrip_json = from_fixed_point(fixed).model_dump(mode="json")
+    for name in ("import_limit_watts", "export_limit_watts"):
+        if roundtrip_json[name] is not None:
+            assert "E" not in roundtrip_json[name]
+            assert Decimal(roundtrip_json[name]) == getattr(original, name)
+
+
+def test_from_fixed_point_invalid():
+    with pytest.raises(ValueError):
+        from_fixed_point(generate_class_instance(SiteControlRequest))
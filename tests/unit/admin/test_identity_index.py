@@ -0,0 +1,169 @@
+from datetime import datetime, timezone
+
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.admin.schema.aggregator import (
+    AggregatorDomain,
+    AggregatorDomainPageResponse,
+    AggregatorDomainResponse,
+    AggregatorPageResponse,
+    AggregatorResponse,
+)
+from envoy_schema.admin.schema.archive import ArchivePageResponse, ArchiveSiteResponse
+from envoy_schema.admin.schema.certificate import CertificatePageResponse, CertificateResponse
+from envoy_schema.admin.schema.identity_index import IdentityIndex
+from envoy_schema.admin.schema.site import SitePageResponse, SiteResponse
+from envoy_schema.admin.schema.site_change_feed import SiteChange
+
+DT = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+
+def site(site_id: int, aggregator_id: int, lfdi: str, sfdi: int) -> SiteResponse:
+    return generate_class_instance(
+        SiteResponse, seed=site_id, site_id=site_id, aggregator_id=aggregator_id, lfdi=lfdi, sfdi=sfdi
+    )
+
+
+def domain(name: str) -> AggregatorDomain:
+    return AggregatorDomain(domain=name, created_time=DT, changed_time=DT)
+
+
+def build_index() -> IdentityIndex:
+    return IdentityIndex.from_pages(
+        site_pages=[
+            SitePageResponse(
+                total_count=3,
+                limit=2,
+                start=0,
+                group=None,
+                after=None,
+                sites=[site(1, 1, "ABC123", 111), site(2, 2, "abc123", 111)],
+            ),
+            SitePageResponse(
+                total_count=3, limit=2, start=2, group=None, after=None, sites=[site(3, 1, "def456", 222)]
+            ),
+        ],
+        certificate_pages=[
+            CertificatePageResponse(
+                total_count=1,
+                limit=10,
+                start=0,
+                certificates=[CertificateResponse(certificate_id=11, created=DT, lfdi="ABC123", expiry=DT)],
+            )
+        ],
+        aggregator_pages=[
+            AggregatorPageResponse(
+                total_count=2,
+                limit=10,
+                start=0,
+                aggregators=[
+                    AggregatorResponse(aggregator_id=1, name="a1", domains=[domain("a1.example.com")]),
+                    AggregatorResponse(
+                        aggregator_id=2, name="a2", domains=[domain("A2.example.com."), domain("b2.com")]
+                    ),
+                ],
+            )
+        ],
+    )
+
+
+def test_identity_index_lookups():
+    index = build_index()
+
+    assert sorted(s.site_id for s in index.sites_by_lfdi("abc123")) == [1, 2]
+    assert [s.site_id for s in index.sites_by_lfdi(" ABC123 ", aggregator_id=2)] == [2]
+    assert index.sites_by_lfdi("missing") == []
+    assert index.get_site_by_lfdi("Def456", 1).site_id == 3
+    assert index.get_site_by_lfdi("def456", 2) is None
+
+    assert sorted(s.site_id for s in index.sites_by_sfdi(111)) == [1, 2]
+    assert index.get_site_by_sfdi(222, 1).site_id == 3
+    assert index.get_site_by_sfdi(999, 1) is None
+
+    assert index.get_certificate("abc123").certificate_id == 11
+    assert index.get_certificate("def456") is None
+
+    assert index.get_aggregator_id("a1.example.com") == 1
+    assert index.get_aggregator_id("a2.EXAMPLE.com") == 2
+    assert index.get_aggregator_id("b2.com.") == 2
+    assert index.get_aggregator_id("c.com") is None
+
+
+def test_identity_index_updates():
+    index = build_index()
+
+    # Updating a site replaces the old lfdi / sfdi
+    index.add_site(site(1, 1, "fed987", 333))
+    assert [s.site_id for s in index.sites_by_lfdi("abc123")] == [2]
+    assert index.sites_by_sfdi(111) == index.sites_by_lfdi("abc123")
+    assert index.get_site_by_lfdi("fed987", 1).sfdi == 333
+
+    # Archive deltas - only deleted entities are removed
+    archive_page = ArchivePageResponse[ArchiveSiteResponse](
+        total_count=2,
+        limit=10,
+        start=0,
+        period_start=DT,
+        period_end=DT,
+        entities=[
+            generate_class_instance(ArchiveSiteResponse, seed=1, site_id=2, deleted_time=DT),
+            generate_class_instance(ArchiveSiteResponse, seed=2, site_id=3, deleted_time=None),
+            generate_class_instance(ArchiveSiteResponse, seed=3, site_id=99, deleted_time=DT),
+        ],
+    )
+    assert index.apply_site_archive(archive_page) == 1
+    assert index.sites_by_lfdi("abc123") == []
+    assert index.sites_by_sfdi(111) == []
+    assert sorted(index.sites.keys()) == [1, 3]
+
+    # Change feed
+    index.apply_site_changes(
+        [
+            SiteChange(site_id=3, change_time=DT, site=None, deleted_time=DT),
+            SiteChange(site_id=4, change_time=DT, site=site(4, 2, "aaa", 444), deleted_time=None),
+        ]
+    )
+    assert sorted(index.sites.keys()) == [1, 4]
+    assert index.get_site_by_sfdi(444, 2).site_id == 4
+
+    # Certificates
+    assert index.remove_certificate("ABC123").certificate_id == 11
+    assert index.get_certificate("abc123") is None
+    assert index.remove_certificate("ABC123") is None
+
+    # Aggregators domains are replaced
+    index.add_aggregator(AggregatorResponse(aggregator_id=2, name="a2", domains=[domain("c2.com")]))
+    assert index.get_aggregator_id("b2.com") is None
+    assert index.get_aggregator_id("c2.com") == 2
+    index.add_aggregator_domains(
+        AggregatorDomainPageResponse(
+            total_count=1,
+            limit=10,
+            start=0,
+            aggregator_domains=[
+                AggregatorDomainResponse(
+                    aggregator_domain_id=1, aggregator_id=1, created_time=DT, changed_time=DT, domain="c2.com"
+                )
+            ],
+        )
+    )
+    assert index.get_aggregator_id("c2.com") == 1
+    index.remove_aggregator(2)
+    assert index.get_aggregator_id("c2.com") == 1
+    index.remove_aggregator(1)
+    assert index.aggregator_ids == {}
+
+
+def test_identity_index_matches_linear_scan():
+    """Indexed lookups should match a linear scan of the site pages"""
+    sites = [
+        SiteResponse.model_construct(site_id=i, aggregator_id=i % 5, lfdi=f"{i:040x}", sfdi=i * 10) for i in range(2000)
+    ]
+    index = IdentityIndex()
+    index.add_sites(sites)
+
+    for lfdi in [f"{i:040X}" for i in range(0, 2100, 7)]:
+        expected = next((s for s in sites if s.lfdi == lfdi.lower()), None)
+        assert index.get_site_by_lfdi(lfdi, int(lfdi, 16) % 5) is expected
+        if expected is not None:
+            assert index.get_site_by_lfdi(lfdi, expected.aggregator_id + 1) is None
@@ -0,0 +1,202 @@
+from typing import Optional
+
+import pydantic
+import pytest
+
+from envoy_schema.admin.schema.log import (
+    CalculationLogLabelValues,
+    CalculationLogLabelValuesDictEncoded,
+    CalculationLogRequest,
+    CalculationLogResponse,
+    CalculationLogVariableValues,
+    CalculationLogVariableValuesRunLengthEncoded,
+)
+
+
+def realistic_variable_values(variables: int, sites: int, intervals: int) -> CalculationLogVariableValues:
+    """Generates variable values in the server sort order - includes a site agnostic (None) series per variable"""
+    variable_ids: list[int] = []
+    site_ids: list[Optional[int]] = []
+    interval_periods: list[int] = []
+    for variable_id in range(1, variables + 1):
+        for site_id in [*range(1, sites + 1), None]:
+            variable_ids.extend([variable_id] * intervals)
+            site_ids.extend([site_id] * intervals)
+            interval_periods.extend(range(intervals))
+    return CalculationLogVariableValues(
+        variable_ids=variable_ids,
+        site_ids=site_ids,
+        interval_periods=interval_periods,
+        values=[i * 1.5 for i in range(len(variable_ids))],
+    )
+
+
+def test_label_values_dict_encoded_roundtrip():
+    """Tests that dict encoding CalculationLogLabelValues is lossless"""
+    original = CalculationLogLabelValues(
+        label_ids=[1, 1, 1, 2, 2],
+        site_ids=[1, 2, 3, 1, None],
+        values=["constrained", "unconstrained", "constrained", "Feeder 1", "Feeder 1"],
+    )
+
+    encoded = original.to_dict_encoded()
+    assert encoded.value_table == ["constrained", "unconstrained", "Feeder 1"]
+    assert encoded.value_codes == [0, 1, 0, 2, 2]
+    assert encoded.label_ids == original.label_ids
+    assert encoded.site_ids == original.site_ids
+
+    decoded = encoded.to_label_values()
+    assert decoded == original
+    assert decoded.values[0] is decoded.values[2], "Repeated values should share the same str instance"
+
+    # Should also be able to parse the wire format directly as a CalculationLogLabelValues
+    parsed = CalculationLogLabelValues.model_validate_json(encoded.model_dump_json())
+    assert parsed == original
+    assert parsed.values[0] is parsed.values[2]
+
+
+def test_label_values_dict_encoded_smaller():
+    """Sanity check that a label heavy log actually shrinks when dict encoded"""
+    original = CalculationLogLabelValues(
+        label_ids=[1] * 10000,
+        site_ids=list(range(10000)),
+        values=["constrained" if i % 3 else "Feeder Name 12345" for i in range(10000)],
+    )
+
+    assert len(original.to_dict_encoded().model_dump_json()) < 0.7 * len(original.model_dump_json())
+
+
+def test_calculation_log_request_accepts_dict_encoded_labels():
+    """CalculationLogRequest should transparently accept dict encoded label_values"""
+    log = CalculationLogRequest.model_validate(
+        {
+            "calculation_range_start": "2024-01-02T03:04:05Z",
+            "calculation_range_duration_seconds": 86400,
+            "interval_width_seconds": 300,
+            "variable_metadata": [],
+            "variable_values": None,
+            "label_metadata": [],
+            "label_values": {"label_ids": [1, 2], "site_ids": [3, None], "value_table": ["a"], "value_codes": [0, 0]},
+        }
+    )
+    assert isinstance(log.label_values, CalculationLogLabelValues)
+    assert log.label_values.values == ["a", "a"]
+
+
+@pytest.mark.parametrize("value_codes", [[0, 1], [-1], [0, 2, 0]])
+def test_label_values_dict_encoded_invalid_codes(value_codes: list[int]):
+    with pytest.raises(pydantic.ValidationError):
+        CalculationLogLabelValuesDictEncoded(
+            label_ids=[1] * len(value_codes),
+            site_ids=[None] * len(value_codes),
+            value_table=["a"],
+            value_codes=value_codes,
+        )
+
+
+@pytest.mark.parametrize(
+    "label_ids, site_ids, value_codes",
+    [
+        ([1, 2], [None], [0, 0]),
+        ([1], [None, 3], [0, 0]),
+        ([1, 2], [None, 3], [0]),
+    ],
+)
+def test_label_values_dict_encoded_length_mismatch(label_ids: list[int], site_ids: list, value_codes: list[int]):
+    data = {"label_ids": label_ids, "site_ids": site_ids, "value_table": ["a"], "value_codes": value_codes}
+    with pytest.raises(pydantic.ValidationError):
+        CalculationLogLabelValuesDictEncoded.model_validate(data)
+    with pytest.raises(pydantic.ValidationError):
+        CalculationLogLabelValues.model_validate(data)
+
+
+@pytest.mark.parametrize(
+    "variable_ids, site_ids, interval_periods",
+    [
+        ([], [], []),
+        ([1], [None], [0]),
+        ([1, 1, 1, 2, 2, 2], [1, 1, 2, 1, None, None], [0, 1, 0, 5, 3, 4]),
+        ([3, 1, 3, 1], [None, 2, None, 2], [7, 6, 5, 4]),  # Unsorted data still roundtrips
+    ],
+)
+def test_variable_values_run_length_roundtrip(
+    variable_ids: list[int], site_ids: list[Optional[int]], interval_periods: list[int]
+):
+    original = CalculationLogVariableValues(
+        variable_ids=variable_ids,
+        site_ids=site_ids,
+        interval_periods=interval_periods,
+        values=[float(i) for i in range(len(variable_ids))],
+    )
+
+    encoded = original.to_run_length_encoded()
+    assert encoded.to_variable_values() == original
+    assert CalculationLogVariableValues.model_validate_json(encoded.model_dump_json()) == original
+
+
+def test_variable_values_run_length_encoding():
+    encoded = CalculationLogVariableValues(
+        variable_ids=[1, 1, 1, 1, 2],
+        site_ids=[3, 3, None, None, None],
+        interval_periods=[5, 6, 0, 1, 1],
+        values=[1, 2, 3, 4, 5],
+    ).to_run_length_encoded()
+
+    assert encoded.variable_id_runs == [(1, 4), (2, 1)]
+    assert encoded.site_id_runs == [(3, 2), (None, 3)]
+    assert encoded.interval_period_runs == [(5, 2), (0, 2), (1, 1)]
+
+
+def test_variable_values_run_length_size_reduction():
+    """Measures the size reduction for a realistic log: 4 variables for 200 sites (+ site agnostic) over 288 intervals
+    (24 hours of 5 minute intervals)"""
+    original = realistic_variable_values(4, 200, 288)
+    encoded = original.to_run_length_encoded()
+
+    # The values list is unchanged so this is a comparison of the "index" lists
+    original_index_bytes = len(original.model_dump_json(exclude={"values"}))
+    encoded_index_bytes = len(encoded.model_dump_json(exclude={"values"}))
+    assert encoded_index_bytes < original_index_bytes * 0.02
+    assert len(encoded.model_dump_json()) < len(original.model_dump_json()) * 0.7
+
+
+@pytest.mark.parametrize(
+    "variable_id_runs, site_id_runs, interval_period_runs",
+    [
+        ([(1, 2)], [(1, 2)], [(0, 3)]),  # Too many periods
+        ([(1, 1)], [(1, 2)], [(0, 2)]),  # Too few variable ids
+        ([(1, 3), (2, -1)], [(1, 2)], [(0, 2)]),  # Negative count
+        ([(1, 2), (2, 0)], [(1, 2)], [(0, 2)]),  # Zero count
+    ],
+)
+def test_variable_values_run_length_invalid(variable_id_runs, site_id_runs, interval_period_runs):
+    with pytest.raises(pydantic.ValidationError):
+        CalculationLogVariableValuesRunLengthEncoded(
+            variable_id_runs=variable_id_runs,
+            site_id_runs=site_id_runs,
+            interval_period_runs=interval_period_runs,
+            values=[1.1, 2.2],
+        )
+
+
+def test_calculation_log_model_dump_compact():
+    """A compact dump should validate back to the original response"""
+    original = CalculationLogResponse(
+        calculation_log_id=123,
+        created_time="2024-01-02T00:00:00Z",
+        calculation_range_start="2024-01-02T03:04:05Z",
+        calculation_range_duration_seconds=86400,
+        interval_width_seconds=300,
+        variable_metadata=[],
+        variable_values=realistic_variable_values(2, 10, 288),
+        label_metadata=[],
+        label_values=CalculationLogLabelValues(label_ids=[1, 1], site_ids=[1, 2], values=["a", "a"]),
+    )
+
+    compact = original.model_dump_compact()
+    assert "variable_id_runs" in compact["variable_values"]
+    assert "value_codes" in compact["label_values"]
+    assert CalculationLogResponse.model_validate(compact) == original
+
+    empty = original.model_copy(update={"variable_values": None, "label_values": None})
+    assert CalculationLogResponse.model_validate(empty.model_dump_compact()) == empty
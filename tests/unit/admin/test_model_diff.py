@@ -0,0 +1,44 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.admin.schema.site import DERAvailability, DERConfiguration, DERStatus
+from envoy_schema.server.schema.sep2.der import InverterStatusType
+from envoy_schema.server.schema.sep2.model_diff import apply_patch, diff_models
+
+ADMIN_IGNORED = ("created_time", "changed_time")
+
+
+@pytest.mark.parametrize("t", [DERStatus, DERAvailability, DERConfiguration])
+def test_admin_diff_patch_roundtrip(t: type):
+    old = generate_class_instance(t, seed=101, optional_is_none=True)
+    new = generate_class_instance(t, seed=202)
+
+    assert not diff_models(old, old.model_copy(), ADMIN_IGNORED)
+    diff = diff_models(old, new)
+    assert "created_time" in diff.paths
+    assert apply_patch(old, diff.patch) == new
+
+
+def test_admin_status_diff():
+    old = generate_class_instance(DERStatus, seed=101)
+    status = InverterStatusType.OFF if old.inverter_status != InverterStatusType.OFF else InverterStatusType.SLEEPING
+    new = old.model_copy(
+        update={
+            "changed_time": datetime(2030, 1, 1, tzinfo=timezone.utc),
+            "inverter_status": status,
+        }
+    )
+
+    diff = diff_models(old, new, ADMIN_IGNORED)
+    assert diff.paths == ["inverter_status"]
+    assert diff.patch == {"inverter_status": status}
+
+
+def test_admin_decimal_diff():
+    """Decimals that are numerically equal aren't a change"""
+    old = generate_class_instance(DERAvailability, seed=101).model_copy(update={"estimated_w_avail": Decimal("1.50")})
+    new = old.model_copy(update={"estimated_w_avail": Decimal("1.5")})
+    assert not diff_models(old, new)
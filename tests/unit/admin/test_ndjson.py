@@ -0,0 +1,129 @@
+import random
+from datetime import datetime
+
+import pydantic
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.admin.schema.archive import ArchivePageResponse, ArchiveSiteControlResponse, ArchiveType
+from envoy_schema.admin.schema.ndjson import (
+    get_page_items_field,
+    iter_ndjson_items,
+    iter_ndjson_page,
+    parse_ndjson_items,
+    parse_ndjson_page,
+    split_ndjson_chunks,
+)
+from envoy_schema.admin.schema.site import SitePageResponse, SiteResponse
+from envoy_schema.admin.schema.site_control import SiteControlPageResponse, SiteControlResponse
+from envoy_schema.admin.schema.site_reading import CSIPAusSiteReading, CSIPAusSiteReadingPageResponse
+
+
+@pytest.mark.parametrize(
+    "page_type, expected",
+    [
+        (SitePageResponse, ("sites", SiteResponse)),
+        (SiteControlPageResponse, ("controls", SiteControlResponse)),
+        (CSIPAusSiteReadingPageResponse, ("readings", CSIPAusSiteReading)),
+        (ArchivePageResponse[ArchiveSiteControlResponse], ("entities", ArchiveSiteControlResponse)),
+        (ArchivePageResponse, ("entities", ArchiveType)),
+    ],
+)
+def test_get_page_items_field(page_type: type, expected: tuple[str, type]):
+    assert get_page_items_field(page_type) == expected
+
+
+def test_get_page_items_field_invalid():
+    with pytest.raises(ValueError):
+        get_page_items_field(CSIPAusSiteReading)
+    with pytest.raises(ValueError):
+        parse_ndjson_page([b"{}"], ArchivePageResponse)  # Needs to be parameterised
+
+
+@pytest.mark.parametrize("page_type", [SitePageResponse, SiteControlPageResponse, CSIPAusSiteReadingPageResponse])
+def test_ndjson_page_roundtrip(page_type: type):
+    page = generate_class_instance(page_type, generate_relationships=True)
+    items_name, _ = get_page_items_field(page_type)
+    setattr(page, items_name, getattr(page, items_name) * 3)
+
+    lines = list(iter_ndjson_page(page))
+    assert len(lines) == 1 + len(getattr(page, items_name))
+    assert all(line.endswith(b"\n") and line.count(b"\n") == 1 for line in lines)
+
+    header, items = parse_ndjson_page(lines, page_type)
+    assert getattr(header, items_name) == []
+    assert header.model_dump(exclude={items_name}) == page.model_dump(exclude={items_name})
+    assert list(items) == getattr(page, items_name)
+
+
+def test_ndjson_archive_page_roundtrip():
+    page = ArchivePageResponse(
+        total_count=1,
+        limit=2,
+        start=3,
+        period_start=datetime(2022, 11, 10),
+        period_end=datetime(2023, 11, 10),
+        entities=[generate_class_instance(ArchiveSiteControlResponse, seed=s) for s in [101, 202]],
+    )
+
+    # Stream through arbitrarily sized chunks to simulate a network stream
+    raw = b"".join(iter_ndjson_page(page))
+    chunks = [raw[i : i + 7] for i in range(0, len(raw), 7)]  # noqa: E203
+    header, items = parse_ndjson_page(split_ndjson_chunks(chunks), ArchivePageResponse[ArchiveSiteControlResponse])
+    assert header.total_count == 1
+    assert header.period_end == datetime(2023, 11, 10)
+    assert list(items) == page.entities
+
+
+def test_ndjson_items_are_lazy():
+    """Items should be produced/consumed one at a time"""
+
+    def generate_sites():
+        for seed in range(1, 1000000):
+            yield generate_class_instance(SiteResponse, seed=seed)
+
+    lines = iter_ndjson_items(generate_sites())
+    parsed = parse_ndjson_items(lines, SiteResponse)
+    assert next(parsed) == generate_class_instance(SiteResponse, seed=1)
+    assert next(parsed) == generate_class_instance(SiteResponse, seed=2)
+
+
+def test_ndjson_parse_errors():
+    with pytest.raises(ValueError):
+        parse_ndjson_page([], SitePageResponse)
+    with pytest.raises(ValueError):
+        parse_ndjson_page([b"", b"  "], SitePageResponse)
+    for header in [b"[1]", b"null", b"123", b'"header"', b"{"]:
+        with pytest.raises(ValueError):
+            parse_ndjson_page([header], SitePageResponse)
+
+    _, items = parse_ndjson_page(
+        [b'{"total_count": 1, "limit": 2, "start": 3, "group": null, "after": null}', b"{}"], SitePageResponse
+    )
+    with pytest.raises(pydantic.ValidationError):
+        list(items)
+
+
+def test_split_ndjson_chunks():
+    assert list(split_ndjson_chunks([])) == []
+    assert list(split_ndjson_chunks([b"a", b"b\nc", b"\n", b"\nd"])) == [b"ab", b"c", b"", b"d"]
+    assert list(split_ndjson_chunks([b"ab\n"])) == [b"ab"]
+    assert list(split_ndjson_chunks([b"", b"a", b"", b"\n\n", b""])) == [b"a", b""]
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_split_ndjson_chunks_matches_split(seed: int):
+    """Arbitrary chunking (including long lines over many tiny chunks) should match splitting the whole payload"""
+    rng = random.Random(seed)
+    data = b"\n".join(b"x" * rng.choice([0, 1, 10, 5000]) for _ in range(50)) + rng.choice([b"", b"\n"])
+    chunks = []
+    offset = 0
+    while offset < len(data):
+        size = rng.choice([0, 1, 2, 7, 100, 3000])
+        chunks.append(data[offset : offset + size])  # noqa: E203
+        offset += size
+
+    expected = data.split(b"\n")
+    if not expected[-1]:
+        expected.pop()
+    assert list(split_ndjson_chunks(chunks)) == expected
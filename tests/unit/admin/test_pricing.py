@@ -0,0 +1,107 @@
+from datetime import datetime, timezone
+
+import pydantic
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.admin.schema.pricing import TariffGeneratedRateBatchRequest, TariffGeneratedRateRequest
+
+
+def test_tariff_generated_rate_batch_roundtrip():
+    """Tests that converting to/from TariffGeneratedRateBatchRequest is lossless"""
+    requests = [
+        generate_class_instance(
+            TariffGeneratedRateRequest,
+            seed=seed,
+            optional_is_none=optional_is_none,
+            tariff_component_id=11,
+            calculation_log_id=22,
+            start_time=datetime(2024, 1, 2, 3, 4, seed % 60, tzinfo=timezone.utc),
+        )
+        for seed, optional_is_none in [(101, False), (202, True), (303, False)]
+    ]
+
+    batch = TariffGeneratedRateBatchRequest.from_tariff_generated_rate_requests(requests)
+    assert batch.tariff_component_id == 11
+    assert batch.calculation_log_id == 22
+    assert batch.start_time == [int(r.start_time.timestamp()) for r in requests]
+
+    assert list(batch.iter_tariff_generated_rate_requests()) == requests
+    parsed = TariffGeneratedRateBatchRequest.model_validate_json(batch.model_dump_json())
+    assert list(parsed.iter_tariff_generated_rate_requests()) == requests
+
+
+def test_tariff_generated_rate_batch_shared_start_times():
+    batch = TariffGeneratedRateBatchRequest(
+        tariff_component_id=1,
+        calculation_log_id=None,
+        site_id=[1, 2, 3],
+        start_time=[1704153600, 1704153600, 1704153900],
+        duration_seconds=[300, 300, 300],
+        price_pow10_encoded=[1, 2, 3],
+    )
+
+    expanded = list(batch.iter_tariff_generated_rate_requests())
+    assert [r.start_time for r in expanded] == [
+        datetime(2024, 1, 2, tzinfo=timezone.utc),
+        datetime(2024, 1, 2, tzinfo=timezone.utc),
+        datetime(2024, 1, 2, 0, 5, tzinfo=timezone.utc),
+    ]
+    assert all(r.block_1_start_pow10_encoded is None for r in expanded)
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"duration_seconds": [300, 0]},
+        {"duration_seconds": [-1, 300]},
+        {"price_pow10_encoded": [1]},
+        {"block_1_start_pow10_encoded": [1, 2]},
+        {"price_pow10_encoded_block_1": [1, 2]},
+        {"block_1_start_pow10_encoded": [1, None], "price_pow10_encoded_block_1": [1, 2]},
+        {"block_1_start_pow10_encoded": [1, 2, 3], "price_pow10_encoded_block_1": [1, 2, 3]},
+    ],
+)
+def test_tariff_generated_rate_batch_invalid(overrides: dict):
+    args = {
+        "tariff_component_id": 1,
+        "calculation_log_id": None,
+        "site_id": [1, 2],
+        "start_time": [1704153600, 1704153600],
+        "duration_seconds": [300, 300],
+        "price_pow10_encoded": [1, 2],
+    }
+    args.update(overrides)
+    with pytest.raises(pydantic.ValidationError):
+        TariffGeneratedRateBatchRequest(**args)
+
+
+def test_tariff_generated_rate_batch_mismatched_shared_values():
+    with pytest.raises(ValueError):
+        TariffGeneratedRateBatchRequest.from_tariff_generated_rate_requests([])
+
+    with pytest.raises(ValueError):
+        TariffGeneratedRateBatchRequest.from_tariff_generated_rate_requests(
+            [
+                generate_class_instance(TariffGeneratedRateRequest, seed=101, tariff_component_id=1),
+                generate_class_instance(TariffGeneratedRateRequest, seed=202, tariff_component_id=2),
+            ]
+        )
+
+
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"start_time": datetime(2024, 1, 2, 3, 4, 5)},  # Naive
+        {"start_time": datetime(2024, 1, 2, 3, 4, 5, 500000, tzinfo=timezone.utc)},  # Sub second
+        {"duration_seconds": 0},  # Fails batch validation
+    ],
+)
+def test_tariff_generated_rate_batch_from_invalid_requests(overrides: dict):
+    valid = generate_class_instance(
+        TariffGeneratedRateRequest, seed=101, start_time=datetime(2024, 1, 2, tzinfo=timezone.utc), duration_seconds=300
+    )
+    invalid = valid.model_copy(update=overrides)
+    TariffGeneratedRateBatchRequest.from_tariff_generated_rate_requests([valid])
+    with pytest.raises(ValueError):
+        TariffGeneratedRateBatchRequest.from_tariff_generated_rate_requests([valid, invalid])
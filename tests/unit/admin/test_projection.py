@@ -0,0 +1,67 @@
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.admin.schema.projection import parse_fieldset, project_instance, project_model
+from envoy_schema.admin.schema.site import SitePageResponse, SiteResponse
+
+
+@pytest.mark.parametrize(
+    "raw, expected",
+    [
+        ("", []),
+        ("site_id", ["site_id"]),
+        (" site_id, nmi,,der_config.max_w ", ["site_id", "nmi", "der_config.max_w"]),
+    ],
+)
+def test_parse_fieldset(raw: str, expected: list[str]):
+    assert parse_fieldset(raw) == expected
+
+
+def test_project_model_cached():
+    """Equivalent projections should return the same (cached) type"""
+    t1 = project_model(SiteResponse, ["site_id", "nmi", "lfdi"])
+    t2 = project_model(SiteResponse, ["lfdi", "site_id", "nmi", "nmi"])
+    assert t1 is t2
+    assert project_model(SiteResponse, ["site_id"]) is not t1
+    assert list(t1.model_fields.keys()) == ["site_id", "nmi", "lfdi"], "Should maintain original field order"
+
+
+def test_project_instance_top_level():
+    site = generate_class_instance(SiteResponse, generate_relationships=True)
+    projected = project_instance(site, ["site_id", "nmi", "lfdi"])
+
+    assert projected.model_dump() == {"site_id": site.site_id, "nmi": site.nmi, "lfdi": site.lfdi}
+
+    # Clients can validate the full payload against the projection (extra fields are ignored)
+    projected_type = project_model(SiteResponse, ["site_id", "nmi", "lfdi"])
+    assert projected_type.model_validate_json(site.model_dump_json()) == projected
+
+
+def test_project_instance_nested():
+    site = generate_class_instance(SiteResponse, generate_relationships=True)
+    projected = project_instance(site, ["site_id", "der_config.max_w", "der_config.type", "groups.name", "der_status"])
+
+    assert projected.model_dump() == {
+        "site_id": site.site_id,
+        "groups": [{"name": g.name} for g in site.groups],
+        "der_config": {"type": site.der_config.type, "max_w": site.der_config.max_w},
+        "der_status": site.der_status.model_dump(),
+    }
+
+    site.der_config = None
+    assert project_instance(site, ["der_config.max_w"]).model_dump() == {"der_config": None}
+
+
+def test_project_page():
+    page = generate_class_instance(SitePageResponse, generate_relationships=True)
+    projected = project_instance(page, ["total_count", "sites.site_id", "sites.der_config", "sites"])
+    assert projected.model_dump()["sites"] == [s.model_dump() for s in page.sites], "sites should override sub fields"
+
+    projected = project_instance(page, ["sites.site_id"])
+    assert projected.model_dump() == {"sites": [{"site_id": s.site_id} for s in page.sites]}
+
+
+@pytest.mark.parametrize("fields", [["foo"], ["site_id", "der_config.foo"], ["site_id.foo"], ["nmi.foo"]])
+def test_project_model_invalid(fields: list[str]):
+    with pytest.raises(ValueError):
+        project_model(SiteResponse, fields)
@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+from typing import Optional
+
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.admin.schema.archive import ArchiveSiteResponse
+from envoy_schema.admin.schema.base import KeysetCursor, encode_page_cursor
+from envoy_schema.admin.schema.site import SiteResponse
+from envoy_schema.admin.schema.site_change_feed import (
+    SiteChangeFeedApplier,
+    SiteChangeFeedResponse,
+    merge_site_changes,
+    site_change_watermark,
+)
+
+BASE_TIME = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+
+def site(site_id: int, minutes: int) -> SiteResponse:
+    return generate_class_instance(
+        SiteResponse,
+        seed=site_id * 1000 + minutes,
+        site_id=site_id,
+        changed_time=BASE_TIME + timedelta(minutes=minutes),
+    )
+
+
+def archived(site_id: int, deleted_minutes: Optional[int]) -> ArchiveSiteResponse:
+    return generate_class_instance(
+        ArchiveSiteResponse,
+        seed=site_id * 1000,
+        site_id=site_id,
+        deleted_time=None if deleted_minutes is None else BASE_TIME + timedelta(minutes=deleted_minutes),
+    )
+
+
+def test_merge_site_changes_ordering():
+    sites = [site(1, 0), site(3, 5), site(2, 10), site(4, 10)]
+    archives = [archived(5, 1), archived(6, None), archived(7, 10)]
+
+    changes = list(merge_site_changes(sites, archives))
+    assert [(c.site_id, c.site is None) for c in changes] == [
+        (1, False),
+        (5, True),
+        (3, False),
+        (2, False),
+        (4, False),
+        (7, True),
+    ]
+    assert changes[1].deleted_time == BASE_TIME + timedelta(minutes=1)
+    assert changes[1].change_time == changes[1].deleted_time
+    assert changes[0].site == sites[0]
+
+
+def test_merge_site_changes_watermark():
+    sites = [site(1, 0), site(3, 5), site(2, 10), site(4, 10)]
+    archives = [archived(5, 1), archived(7, 10)]
+    all_changes = list(merge_site_changes(sites, archives))
+
+    # Resuming after every change should produce the remaining changes
+    for idx, change in enumerate(all_changes):
+        resumed = list(merge_site_changes(sites, archives, site_change_watermark(change)))
+        assert resumed == all_changes[idx + 1 :]  # noqa: E203
+
+    with pytest.raises(ValueError):
+        list(merge_site_changes(sites, archives, encode_page_cursor(KeysetCursor(last_id=1))))
+    with pytest.raises(ValueError):
+        list(merge_site_changes(sites, archives, "not a watermark"))
+
+
+def test_site_change_feed_applier():
+    applier = SiteChangeFeedApplier()
+    assert applier.apply(merge_site_changes([site(1, 0), site(2, 1), site(3, 2)], [])) == 3
+    assert set(applier.sites.keys()) == {1, 2, 3}
+    first_watermark = applier.watermark
+    assert first_watermark is not None
+
+    # Now delete site 2 and update site 3
+    updated_site_3 = site(3, 4)
+    changes = list(merge_site_changes([site(1, 0), updated_site_3], [archived(2, 3)], applier.watermark))
+    response = SiteChangeFeedResponse(
+        limit=10,
+        watermark=applier.watermark,
+        next_watermark=site_change_watermark(changes[-1]),
+        changes=changes,
+    )
+    assert applier.apply_response(SiteChangeFeedResponse.model_validate_json(response.model_dump_json())) == 2
+    assert applier.sites == {1: site(1, 0), 3: updated_site_3}
+    assert applier.watermark == response.next_watermark
+
+    # Nothing new to apply
+    assert applier.apply(merge_site_changes([site(1, 0), updated_site_3], [archived(2, 3)], applier.watermark)) == 0
+    assert applier.watermark == response.next_watermark
@@ -0,0 +1,80 @@
+from datetime import datetime, timezone
+from decimal import Decimal
+
+import pydantic
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.admin.schema.site_control import SiteControlBatchRequest, SiteControlRequest
+
+
+def test_site_control_batch_roundtrip():
+    """Tests that converting to/from SiteControlBatchRequest is lossless"""
+    requests = [
+        generate_class_instance(SiteControlRequest, seed=101, optional_is_none=False, calculation_log_id=5),
+        generate_class_instance(SiteControlRequest, seed=202, optional_is_none=True, calculation_log_id=5),
+        generate_class_instance(SiteControlRequest, seed=303, optional_is_none=False, calculation_log_id=5),
+    ]
+
+    batch = SiteControlBatchRequest.from_site_control_requests(requests)
+    assert batch.calculation_log_id == 5
+    assert batch.site_id == [r.site_id for r in requests]
+
+    assert list(batch.iter_site_control_requests()) == requests
+    assert list(SiteControlBatchRequest.model_validate_json(batch.model_dump_json()).iter_site_control_requests()) == [
+        SiteControlRequest.model_validate_json(r.model_dump_json()) for r in requests
+    ]
+
+
+def test_site_control_batch_omitted_columns():
+    batch = SiteControlBatchRequest.model_validate(
+        {
+            "calculation_log_id": None,
+            "site_id": [1, 2],
+            "duration_seconds": [300, 600],
+            "start_time": ["2024-01-02T00:00:00Z", "2024-01-02T00:05:00Z"],
+            "import_limit_watts": ["1500.5", None],
+        }
+    )
+
+    expanded = list(batch.iter_site_control_requests())
+    assert len(expanded) == 2
+    assert all(isinstance(r, SiteControlRequest) for r in expanded)
+    assert expanded[0].import_limit_watts == Decimal("1500.5")
+    assert expanded[1].import_limit_watts is None
+    assert expanded[1].start_time == datetime(2024, 1, 2, 0, 5, tzinfo=timezone.utc)
+    assert expanded[1].export_limit_watts is None
+    assert expanded[1].model_fields_set == {
+        "calculation_log_id",
+        "site_id",
+        "duration_seconds",
+        "start_time",
+        "import_limit_watts",
+    }
+
+
+def test_site_control_batch_empty():
+    batch = SiteControlBatchRequest.from_site_control_requests([])
+    assert batch.site_id == []
+    assert list(batch.iter_site_control_requests()) == []
+
+
+def test_site_control_batch_mismatched_calculation_log():
+    with pytest.raises(ValueError):
+        SiteControlBatchRequest.from_site_control_requests(
+            [
+                generate_class_instance(SiteControlRequest, seed=101, calculation_log_id=1),
+                generate_class_instance(SiteControlRequest, seed=202, calculation_log_id=2),
+            ]
+        )
+
+
+def test_site_control_batch_mismatched_column_length():
+    with pytest.raises(pydantic.ValidationError):
+        SiteControlBatchRequest(
+            calculation_log_id=None,
+            site_id=[1, 2],
+            duration_seconds=[300, 600],
+            start_time=[datetime(2024, 1, 2), datetime(2024, 1, 3)],
+            export_limit_watts=[Decimal("1.2")],
+        )
@@ -0,0 +1,146 @@
+import random
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+
+from envoy_schema.admin.schema.site_control import SiteControlRequest
+from envoy_schema.admin.schema.site_control_compaction import (
+    compact_site_controls,
+    expand_site_controls,
+    split_site_control,
+)
+
+START = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+
+def make_control(
+    site_id: int,
+    slot: int,
+    export_limit: Optional[str],
+    calculation_log_id: Optional[int] = 1,
+    duration: int = 300,
+    import_limit: Optional[str] = None,
+) -> SiteControlRequest:
+    return SiteControlRequest(
+        site_id=site_id,
+        calculation_log_id=calculation_log_id,
+        duration_seconds=duration,
+        start_time=START + timedelta(seconds=300 * slot),
+        export_limit_watts=Decimal(export_limit) if export_limit is not None else None,
+        import_limit_watts=Decimal(import_limit) if import_limit is not None else None,
+    )
+
+
+def test_compact_site_controls_merges_contiguous():
+    controls = [
+        make_control(1, 0, "1500"),
+        make_control(1, 1, "1500.0"),  # Equal Decimal value
+        make_control(1, 2, "1500"),
+        make_control(1, 3, "2000"),  # Different value
+        make_control(1, 4, "1500"),  # Not contiguous with the first run
+        make_control(2, 0, "1500"),  # Different site
+        make_control(2, 1, "1500", calculation_log_id=2),  # Different calculation_log_id
+        make_control(1, 6, "1500"),  # Gap
+    ]
+
+    compaction = compact_site_controls(controls)
+    assert [(c.site_id, c.start_time, c.duration_seconds) for c in compaction.controls] == [
+        (1, START, 900),
+        (1, START + timedelta(seconds=900), 300),
+        (1, START + timedelta(seconds=1200), 300),
+        (2, START, 300),
+        (2, START + timedelta(seconds=300), 300),
+        (1, START + timedelta(seconds=1800), 300),
+    ]
+    assert compaction.sources == [[0, 1, 2], [3], [4], [5], [6], [7]]
+    assert compaction.original_count == 8
+    assert compaction.reduction == pytest.approx(0.25)
+    assert compaction.controls[1] is controls[3], "Unmerged controls aren't copied"
+    assert controls[0].duration_seconds == 300, "Source controls aren't modified"
+
+    assert expand_site_controls(compaction) == controls
+
+
+def test_compact_site_controls_unordered_and_groups():
+    controls = [
+        make_control(1, 2, "10"),
+        make_control(1, 0, "10"),
+        make_control(1, 1, "10"),
+        make_control(1, 3, "10"),
+    ]
+
+    compaction = compact_site_controls(controls)
+    assert len(compaction.controls) == 1
+    assert compaction.controls[0].start_time == START
+    assert compaction.controls[0].duration_seconds == 1200
+    assert compaction.sources == [[1, 2, 0, 3]]
+    assert expand_site_controls(compaction) == controls
+
+    # Different groups can't be merged
+    compaction = compact_site_controls(controls, group_ids=[1, 1, 2, 2])  # Alternating groups (in time order)
+    assert [c.duration_seconds for c in compaction.controls] == [300, 300, 300, 300]
+    compaction = compact_site_controls(controls, group_ids=[1, 1, 1, 2])
+    assert [(c.start_time, c.duration_seconds) for c in compaction.controls] == [
+        (START, 900),
+        (START + timedelta(seconds=900), 300),
+    ]
+    assert expand_site_controls(compaction) == controls
+
+    with pytest.raises(ValueError):
+        compact_site_controls(controls, group_ids=[1])
+
+
+def test_compact_site_controls_zero_duration():
+    controls = [make_control(1, 0, "10"), make_control(1, 1, "10", duration=0), make_control(1, 1, "10")]
+    compaction = compact_site_controls(controls)
+    assert [(c.start_time, c.duration_seconds) for c in compaction.controls] == [
+        (START, 600),
+        (START + timedelta(seconds=300), 0),
+    ]
+    assert expand_site_controls(compaction) == controls
+
+
+def test_compact_site_controls_empty():
+    compaction = compact_site_controls([])
+    assert compaction.controls == []
+    assert compaction.reduction == 0.0
+    assert expand_site_controls(compaction) == []
+
+
+def test_split_site_control():
+    control = make_control(1, 0, "10", duration=1000)
+    parts = split_site_control(control, 300)
+    assert [(p.start_time, p.duration_seconds) for p in parts] == [
+        (START, 300),
+        (START + timedelta(seconds=300), 300),
+        (START + timedelta(seconds=600), 300),
+        (START + timedelta(seconds=900), 100),
+    ]
+    assert all(p.export_limit_watts == Decimal("10") for p in parts)
+    assert split_site_control(control, 1000) == [control]
+
+    with pytest.raises(ValueError):
+        split_site_control(control, 0)
+
+
+def test_compact_site_controls_realistic_schedule():
+    """A day of 5 minute DOEs for 200 sites - export limits move in steps that hold for ~30-120 minutes and import
+    limits are constant"""
+    rng = random.Random(42)
+    controls: list[SiteControlRequest] = []
+    for site_id in range(200):
+        slot = 0
+        while slot < 288:
+            hold = rng.randint(6, 24)
+            limit = str(rng.choice([0, 1500, 3000, 5000, 10000]))
+            for s in range(slot, min(slot + hold, 288)):
+                controls.append(make_control(site_id, s, limit, import_limit="10000"))
+            slot += hold
+
+    compaction = compact_site_controls(controls)
+    assert (compaction.original_count, len(compaction.controls)) == (57600, 3171)  # A 94.5% reduction
+    assert compaction.reduction > 0.9
+    assert sum(c.duration_seconds for c in compaction.controls) == 300 * len(controls)
+    assert expand_site_controls(compaction) == controls
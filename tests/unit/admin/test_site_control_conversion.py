@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta, timezone
+from decimal import Decimal
+from typing import Optional
+
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.admin.schema.site_control import SiteControlRequest, SiteControlResponse
+from envoy_schema.admin.schema.site_control_conversion import (
+    encode_active_power,
+    site_control_mrid,
+    site_controls_to_der_control_list,
+    site_controls_to_der_controls,
+)
+from envoy_schema.server.schema.sep2.der import DERControlBase, DERControlResponse
+from envoy_schema.server.schema.sep2.der_control_types import ActivePower
+from envoy_schema.server.schema.sep2.event import EventStatus, EventStatusType
+from envoy_schema.server.schema.sep2.types import DateTimeIntervalType
+
+NOW = datetime(2024, 1, 2, 12, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize(
+    "watts, value, multiplier",
+    [
+        (Decimal("0"), 0, 0),
+        (Decimal("1500"), 1500, 0),
+        (Decimal("1500.00"), 1500, 0),
+        (Decimal("1.5"), 15, -1),
+        (Decimal("-12.345"), -12345, -3),
+        (Decimal("32767"), 32767, 0),
+        (Decimal("32768"), 3277, 1),
+        (Decimal("150000"), 15000, 1),
+        (Decimal("1.23456"), 12346, -4),  # Rounded to fit Int16
+        (Decimal("-5000000"), -5000, 3),
+    ],
+)
+def test_encode_active_power(watts: Decimal, value: int, multiplier: int):
+    assert encode_active_power(watts) == ActivePower(value=value, multiplier=multiplier)
+
+
+def test_encode_active_power_not_finite():
+    with pytest.raises(ValueError):
+        encode_active_power(Decimal("NaN"))
+
+
+def naive_convert(control: SiteControlRequest, der_program_id: int, derc_id: int) -> DERControlResponse:
+    """Reference per object conversion (with full validation)"""
+
+    def power(v: Optional[Decimal]) -> Optional[ActivePower]:
+        return (
+            ActivePower(value=encode_active_power(v).value, multiplier=encode_active_power(v).multiplier)
+            if v is not None
+            else None
+        )
+
+    def hundredths(v: Optional[Decimal]) -> Optional[int]:
+        return int(round(v * 100)) if v is not None else None
+
+    start = int(control.start_time.timestamp())
+    creation_time = int(NOW.timestamp())
+    status = EventStatusType.Active if start <= creation_time else EventStatusType.Scheduled
+    superseded = False
+    if isinstance(control, SiteControlResponse):
+        creation_time = int(control.created_time.timestamp())
+        superseded = control.superseded
+        if superseded:
+            status = EventStatusType.Superseded
+
+    return DERControlResponse(
+        href=f"/edev/{control.site_id}/derp/{der_program_id}/derc/{derc_id}",
+        mRID=site_control_mrid(derc_id, control.display_id),
+        creationTime=creation_time,
+        EventStatus_=EventStatus(currentStatus=status, dateTime=int(NOW.timestamp()), potentiallySuperseded=superseded),
+        interval=DateTimeIntervalType(start=start, duration=control.duration_seconds),
+        randomizeStart=control.randomize_start_seconds,
+        DERControlBase_=DERControlBase(
+            opModConnect=control.set_connect,
+            opModEnergize=control.set_energized,
+            opModFixedW=hundredths(control.set_point_percentage),
+            rampTms=hundredths(control.ramp_time_seconds),
+            opModImpLimW=power(control.import_limit_watts),
+            opModExpLimW=power(control.export_limit_watts),
+            opModGenLimW=power(control.generation_limit_watts),
+            opModLoadLimW=power(control.load_limit_watts),
+            opModStorageTargetW=power(control.storage_target_watts),
+        ),
+    )
+
+
+def make_controls(count: int, response: bool) -> list[SiteControlRequest]:
+    controls = []
+    for i in range(count):
+        kwargs = dict(
+            seed=i,
+            optional_is_none=(i % 3 == 0),
+            start_time=NOW + timedelta(minutes=(i % 11) - 5),
+            import_limit_watts=Decimal(1000 + (i % 7) * 250),
+            export_limit_watts=Decimal("1.5") * (i % 5),
+            set_point_percentage=Decimal("12.34") if i % 2 else None,
+            ramp_time_seconds=Decimal("15.5") if i % 4 else None,
+            display_id=None if i % 2 else i,
+        )
+        if response:
+            controls.append(generate_class_instance(SiteControlResponse, site_control_id=i + 100, **kwargs))
+        else:
+            controls.append(generate_class_instance(SiteControlRequest, **kwargs))
+    return controls
+
+
+@pytest.mark.parametrize("response", [True, False])
+def test_site_controls_to_der_controls_matches_naive(response: bool):
+    controls = make_controls(50, response)
+    derc_ids = None if response else [i + 100 for i in range(len(controls))]
+    actual = site_controls_to_der_controls(controls, 3, NOW, derc_ids)
+    expected = [naive_convert(c, 3, i + 100) for i, c in enumerate(controls)]
+
+    assert len(actual) == len(expected)
+    for a, e in zip(actual, expected):
+        assert a.to_xml(skip_empty=True, exclude_none=True) == e.to_xml(skip_empty=True, exclude_none=True)
+        assert a == e
+
+
+def test_site_controls_to_der_controls_errors():
+    requests = make_controls(2, False)
+    with pytest.raises(ValueError):
+        site_controls_to_der_controls(requests, 1, NOW)
+    with pytest.raises(ValueError):
+        site_controls_to_der_controls(requests, 1, NOW, [1])
+    assert site_controls_to_der_controls([], 1, NOW) == []
+
+
+def test_site_controls_to_der_control_list():
+    controls = [c for c in make_controls(10, True)]
+    for c in controls:
+        c.site_id = 7
+    result = site_controls_to_der_control_list(7, controls, 2, NOW, total_count=99)
+    assert result.href == "/edev/7/derp/2/derc"
+    assert result.all_ == 99
+    assert result.results == 10
+    assert [c.href for c in result.DERControl] == [f"/edev/7/derp/2/derc/{c.site_control_id}" for c in controls]
+
+    controls[3].site_id = 8
+    with pytest.raises(ValueError):
+        site_controls_to_der_control_list(7, controls, 2, NOW)
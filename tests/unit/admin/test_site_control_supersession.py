@@ -0,0 +1,141 @@
+import random
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.admin.schema.site_control import SiteControlResponse
+from envoy_schema.admin.schema.site_control_supersession import evaluate_supersession, site_control_rank
+
+BASE_TIME = datetime(2024, 1, 2, tzinfo=timezone.utc)
+
+
+def control(
+    site_control_id: int, site_id: int, start: int, duration: int, created: int = 0, superseded: bool = False
+) -> SiteControlResponse:
+    return generate_class_instance(
+        SiteControlResponse,
+        seed=site_control_id,
+        site_control_id=site_control_id,
+        site_id=site_id,
+        start_time=BASE_TIME + timedelta(seconds=start),
+        duration_seconds=duration,
+        created_time=BASE_TIME + timedelta(seconds=created),
+        superseded=superseded,
+    )
+
+
+def timeline(result, site_id: int) -> list[tuple[int, int, int]]:
+    return [
+        (
+            int((s.start_time - BASE_TIME).total_seconds()),
+            int((s.end_time - BASE_TIME).total_seconds()),
+            s.site_control_id,
+        )
+        for s in result.timelines[site_id]
+    ]
+
+
+def test_evaluate_supersession():
+    result = evaluate_supersession(
+        [
+            (
+                2,
+                [
+                    control(1, 1, 0, 100, created=0),
+                    control(2, 1, 50, 100, created=1),  # Newer - supersedes 1
+                    control(3, 1, 150, 50, created=0),  # Touches 2 but doesn't overlap
+                    control(4, 2, 0, 100, created=0),
+                    control(5, 2, 0, 100, created=5, superseded=True),  # Already superseded - ignored
+                ],
+            ),
+            (1, [control(6, 1, 60, 10, created=0), control(7, 3, 0, 0)]),  # Higher primacy - supersedes 2
+        ]
+    )
+
+    assert result.superseded == {1: True, 2: True, 3: False, 4: False, 5: True, 6: False, 7: False}
+    assert sorted(result.newly_superseded) == [1, 2]
+    assert timeline(result, 1) == [(60, 70, 6), (150, 200, 3)]  # Superseded controls aren't part of the timeline
+    assert timeline(result, 2) == [(0, 100, 4)]
+    assert timeline(result, 3) == []
+
+
+def test_evaluate_supersession_timeline_excludes_newly_superseded():
+    result = evaluate_supersession([(2, [control(1, 1, 0, 100)]), (1, [control(2, 1, 50, 10)])])
+    assert result.superseded == {1: True, 2: False}
+    assert timeline(result, 1) == [(50, 60, 2)]
+
+
+def brute_force(controls: list[tuple[int, SiteControlResponse]]) -> dict[int, bool]:
+    def end(c: SiteControlResponse) -> datetime:
+        return c.start_time + timedelta(seconds=c.duration_seconds)
+
+    flags: dict[int, bool] = {}
+    for p, c in controls:
+        flags[c.site_control_id] = c.superseded or any(
+            o.site_id == c.site_id
+            and not o.superseded
+            and c.duration_seconds > 0
+            and o.duration_seconds > 0
+            and o.start_time < end(c)
+            and c.start_time < end(o)
+            and site_control_rank(op, o) < site_control_rank(p, c)
+            for op, o in controls
+        )
+    return flags
+
+
+def brute_force_winner(
+    controls: list[tuple[int, SiteControlResponse]], flags: dict[int, bool], site_id: int, t: datetime
+):
+    applicable = [
+        c.site_control_id
+        for _, c in controls
+        if c.site_id == site_id
+        and not flags[c.site_control_id]
+        and c.start_time <= t < c.start_time + timedelta(seconds=c.duration_seconds)
+    ]
+    assert len(applicable) <= 1, "Non superseded controls shouldn't overlap"
+    return applicable[0] if applicable else None
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_evaluate_supersession_vs_brute_force(seed: int):
+    rng = random.Random(seed)
+    groups: dict[int, list[SiteControlResponse]] = {}
+    for i in range(300):
+        c = control(
+            i + 1,
+            rng.randrange(5),
+            rng.randrange(0, 1000, 10),
+            rng.randrange(0, 200, 10),
+            created=rng.randrange(3),
+            superseded=rng.random() < 0.1,
+        )
+        groups.setdefault(rng.randrange(3), []).append(c)
+    all_controls = [(p, c) for p, cs in groups.items() for c in cs]
+
+    result = evaluate_supersession(groups.items())
+    flags = brute_force(all_controls)
+    assert result.superseded == flags
+
+    for site_id in range(5):
+        segments = result.timelines.get(site_id, [])
+        for a, b in zip(segments, segments[1:]):
+            assert a.end_time <= b.start_time
+            assert a.end_time < b.start_time or a.site_control_id != b.site_control_id, "Adjacent segments merged"
+        for t in range(-10, 1250, 5):
+            dt = BASE_TIME + timedelta(seconds=t)
+            expected = brute_force_winner(all_controls, flags, site_id, dt)
+            actual = next((s.site_control_id for s in segments if s.start_time <= dt < s.end_time), None)
+            assert actual == expected
+
+    # Re-evaluating the output (with the updated superseded flags) should be idempotent
+    updated_groups = [
+        (p, [c.model_copy(update={"superseded": result.superseded[c.site_control_id]}) for c in cs])
+        for p, cs in groups.items()
+    ]
+    reevaluated = evaluate_supersession(updated_groups)
+    assert reevaluated.superseded == result.superseded
+    assert reevaluated.newly_superseded == []
+    assert {k: v for k, v in reevaluated.timelines.items() if v} == {k: v for k, v in result.timelines.items() if v}
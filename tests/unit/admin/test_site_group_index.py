@@ -0,0 +1,171 @@
+import random
+from datetime import datetime, timezone
+
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.admin.schema import site_group_index
+from envoy_schema.admin.schema.site import SiteGroup, SitePageResponse, SiteResponse
+from envoy_schema.admin.schema.site_group_index import MAX_ARRAY_CHUNK_SIZE, SiteGroupIndex, SiteIdBitmap
+
+
+def random_site_ids(seed: int, count: int, max_id: int) -> set[int]:
+    rng = random.Random(seed)
+    return {rng.randrange(max_id) for _ in range(count)}
+
+
+@pytest.mark.parametrize(
+    "a_ids, b_ids",
+    [
+        (set(), set()),
+        ({1, 2, 3}, set()),
+        ({1, 2, 3}, {2, 3, 4}),
+        (random_site_ids(1, 200, 300000), random_site_ids(2, 200, 300000)),  # Sparse
+        (random_site_ids(3, 20000, 70000), random_site_ids(4, 300, 70000)),  # Dense vs sparse
+        (random_site_ids(5, 20000, 70000), random_site_ids(6, 30000, 140000)),  # Dense vs dense
+        (set(range(0, 10000)), set(range(5000, 15000))),  # Ranges that will convert dense -> sparse on combining
+        (set(range(0, 8000, 2)), set(range(1, 8000, 2))),  # Sparse chunks that will union/xor to a dense chunk
+    ],
+)
+def test_site_id_bitmap_set_algebra(a_ids: set[int], b_ids: set[int]):
+    a = SiteIdBitmap(a_ids)
+    b = SiteIdBitmap(b_ids)
+
+    assert len(a) == len(a_ids)
+    assert list(a) == sorted(a_ids)
+    assert a == SiteIdBitmap(sorted(a_ids, reverse=True))
+
+    for bitmap, expected in [
+        (a & b, a_ids & b_ids),
+        (a | b, a_ids | b_ids),
+        (a ^ b, a_ids ^ b_ids),
+        (a - b, a_ids - b_ids),
+        (b - a, b_ids - a_ids),
+    ]:
+        assert list(bitmap) == sorted(expected)
+        assert len(bitmap) == len(expected)
+        assert bool(bitmap) == bool(expected)
+        assert bitmap == SiteIdBitmap(expected)
+
+    # Operands aren't modified
+    assert list(a) == sorted(a_ids)
+    assert list(b) == sorted(b_ids)
+
+
+def test_site_id_bitmap_sparse_combine_avoids_bitsets(monkeypatch: pytest.MonkeyPatch):
+    """Combining two sparse (array) chunks shouldn't go via a 65536 bit bitset unless the result is dense"""
+    a_ids = random_site_ids(7, 100, 65536)
+    b_ids = random_site_ids(8, 100, 65536)
+    a = SiteIdBitmap(a_ids)
+    b = SiteIdBitmap(b_ids)
+
+    def no_bitsets(_):
+        raise AssertionError("Sparse chunks shouldn't be converted to bitsets")
+
+    monkeypatch.setattr(site_group_index, "_chunk_to_bits", no_bitsets)
+    assert list(a & b) == sorted(a_ids & b_ids)
+    assert list(a | b) == sorted(a_ids | b_ids)
+    assert list(a ^ b) == sorted(a_ids ^ b_ids)
+    assert list(a - b) == sorted(a_ids - b_ids)
+
+
+def test_site_id_bitmap_add_discard():
+    expected: set[int] = set()
+    bitmap = SiteIdBitmap()
+    rng = random.Random(123)
+    for _ in range(20000):
+        site_id = rng.randrange(MAX_ARRAY_CHUNK_SIZE * 3)
+        if rng.random() < 0.7:
+            bitmap.add(site_id)
+            expected.add(site_id)
+        else:
+            bitmap.discard(site_id)
+            expected.discard(site_id)
+        assert (site_id in bitmap) == (site_id in expected)
+
+    assert len(bitmap) == len(expected)
+    assert list(bitmap) == sorted(expected)
+
+    for site_id in list(expected):
+        bitmap.discard(site_id)
+    assert not bitmap
+    assert len(bitmap) == 0
+
+    assert -1 not in bitmap
+    assert "1" not in bitmap
+    with pytest.raises(ValueError):
+        bitmap.add(-1)
+    with pytest.raises(ValueError):
+        SiteIdBitmap([1, -2])
+
+
+def site(site_id: int, group_ids: list[int]) -> SiteResponse:
+    dt = datetime(2024, 1, 2, tzinfo=timezone.utc)
+    return generate_class_instance(
+        SiteResponse,
+        seed=site_id,
+        site_id=site_id,
+        groups=[SiteGroup(site_group_id=g, name=f"g{g}", created_time=dt, changed_time=dt) for g in group_ids],
+    )
+
+
+def page(sites: list[SiteResponse]) -> SitePageResponse:
+    return SitePageResponse(total_count=len(sites), limit=len(sites), start=0, group=None, after=None, sites=sites)
+
+
+def test_site_group_index_query():
+    index = SiteGroupIndex.from_pages(
+        [
+            page([site(1, [1, 2]), site(2, [1]), site(3, [1, 2, 3])]),
+            page([site(4, [2, 3]), site(5, []), site(6, [4])]),
+        ]
+    )
+
+    assert index.group_count(1) == 3
+    assert index.group_count(2) == 3
+    assert index.group_count(99) == 0
+    assert list(index.group_sites(3)) == [3, 4]
+    assert list(index.group_sites(99)) == []
+
+    assert list(index.query()) == [1, 2, 3, 4, 5, 6]
+    assert list(index.query(all_of=[1, 2])) == [1, 3]
+    assert list(index.query(all_of=[1, 2], none_of=[3])) == [1]
+    assert list(index.query(all_of=[1, 99])) == []
+    assert list(index.query(any_of=[3, 4])) == [3, 4, 6]
+    assert list(index.query(all_of=[2], any_of=[1, 4])) == [1, 3]
+    assert list(index.query(none_of=[1, 2])) == [5, 6]
+
+    # Mutating a query result doesn't modify the index
+    index.query(all_of=[1]).add(100)
+    index.group_sites(1).add(100)
+    index.query().add(100)
+    assert list(index.query(all_of=[1])) == [1, 2, 3]
+    assert 100 not in index.sites
+
+    # Updating a site replaces its group membership
+    index.add_site(site(3, [4]))
+    assert list(index.group_sites(1)) == [1, 2]
+    assert list(index.group_sites(3)) == [4]
+    assert list(index.group_sites(4)) == [3, 6]
+
+    index.remove_site(4)
+    assert 3 not in index.groups
+    assert list(index.query()) == [1, 2, 3, 5, 6]
+
+
+def test_site_group_index_matches_list_filter():
+    """Compares the bitmap index query vs materialising/filtering the list of sites (large enough for bitset chunks)"""
+    rng = random.Random(456)
+    memberships = {site_id: [g for g in range(10) if rng.random() < 0.3] for site_id in range(20000)}
+    index = SiteGroupIndex()
+    for site_id, group_ids in memberships.items():
+        for g in group_ids:
+            index.groups.setdefault(g, SiteIdBitmap()).add(site_id)
+        index.sites.add(site_id)
+
+    expected = [s for s, groups in memberships.items() if 1 in groups and 2 in groups and 3 not in groups]
+    assert list(index.query(all_of=[1, 2], none_of=[3])) == expected
+    assert len(index.query(all_of=[1, 2], none_of=[3])) == len(expected)
+
+    expected = [s for s, groups in memberships.items() if (4 in groups or 5 in groups) and 6 not in groups]
+    assert list(index.query(any_of=[4, 5], none_of=[6])) == expected
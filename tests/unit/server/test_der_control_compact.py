@@ -0,0 +1,86 @@
+import sys
+from typing import Any
+
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.server.schema.sep2.der import DERControlBase
+from envoy_schema.server.schema.sep2.der_control_compact import (
+    FIELD_NAMES,
+    CompactDERControlBase,
+    compact_control_bases,
+)
+from envoy_schema.server.schema.sep2.der_control_types import ActivePower, FixedVar, ReactivePower
+from envoy_schema.server.schema.sep2.identification import Link, ListLink
+
+
+def deep_sizeof(obj: Any, seen: set[int]) -> int:
+    """Approximate total bytes for obj (and everything it references)"""
+    if id(obj) in seen or isinstance(obj, type):
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(v, seen) for v in obj)
+    elif hasattr(obj, "__dict__"):
+        size += deep_sizeof(vars(obj), seen)
+        for extra in ["__pydantic_fields_set__", "__pydantic_extra__", "__pydantic_private__"]:
+            size += deep_sizeof(getattr(obj, extra, None), seen)
+    elif hasattr(obj, "__slots__"):
+        size += sum(deep_sizeof(getattr(obj, s), seen) for s in obj.__slots__)
+    return size
+
+
+@pytest.mark.parametrize("optional_is_none", [True, False])
+def test_roundtrip_generated(optional_is_none: bool):
+    original = generate_class_instance(DERControlBase, optional_is_none=optional_is_none, generate_relationships=True)
+    compact = CompactDERControlBase.from_control_base(original)
+    expanded = compact.to_control_base()
+    assert expanded == original
+    assert expanded.to_xml(exclude_none=True) == original.to_xml(exclude_none=True)
+    for name in FIELD_NAMES:
+        assert compact.get(name) == getattr(original, name)
+
+
+@pytest.mark.parametrize(
+    "original",
+    [
+        DERControlBase(),
+        DERControlBase(opModExpLimW=ActivePower(value=-32768, multiplier=-128)),
+        DERControlBase(opModExpLimW=ActivePower(value=123456789, multiplier=127), rampTms=5),
+        DERControlBase(opModTargetVar=ReactivePower(value=5, multiplier=1000)),  # Can't be packed
+        DERControlBase(opModConnect=False, opModEnergize=True, opModWattPF=Link(href="/curve/1")),
+        DERControlBase(opModVoltVar=ListLink(href="/curve/2", all_=5)),  # Not an exact Link - stored as is
+        DERControlBase(opModFixedVar=FixedVar(refType=1, value=-50)),
+    ],
+)
+def test_roundtrip_edge_cases(original: DERControlBase):
+    compact = CompactDERControlBase.from_control_base(original)
+    expanded = compact.to_control_base()
+    assert expanded == original
+    assert expanded.model_fields_set == {n for n in FIELD_NAMES if getattr(original, n) is not None}
+    assert type(expanded.opModVoltVar) is type(original.opModVoltVar)
+    assert expanded.to_xml(exclude_none=True) == original.to_xml(exclude_none=True)
+
+
+def test_compact_control_bases_bytes_per_control():
+    bases = [
+        DERControlBase(
+            opModExpLimW=ActivePower(value=1000 + (i % 50), multiplier=0),
+            opModImpLimW=ActivePower(value=2000, multiplier=0),
+            opModConnect=True,
+        )
+        for i in range(2000)
+    ] + [DERControlBase(opModTargetVar=ReactivePower(value=5, multiplier=1000))]
+    compacts = compact_control_bases(bases)
+    assert [c.to_control_base() for c in compacts] == bases
+    assert compacts[0] is compacts[50], "Identical controls are interned"
+    assert compacts[0] is not compacts[1]
+
+    pydantic_bytes = deep_sizeof(bases, set()) / len(bases)
+    compact_bytes = deep_sizeof([CompactDERControlBase.from_control_base(b) for b in bases], set()) / len(bases)
+    interned_bytes = deep_sizeof(compacts, set()) / len(bases)
+    assert compact_bytes < pydantic_bytes / 4
+    assert interned_bytes < compact_bytes
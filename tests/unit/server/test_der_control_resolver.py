@@ -0,0 +1,172 @@
+import random
+from typing import Optional
+
+import pytest
+
+from envoy_schema.server.schema.sep2.der import (
+    ActivePower,
+    DefaultDERControl,
+    DERControlBase,
+    DERControlListResponse,
+    DERControlResponse,
+)
+from envoy_schema.server.schema.sep2.der_control_resolver import (
+    DERControlResolver,
+    DERProgramControls,
+    control_rank,
+    merge_control_bases,
+)
+from envoy_schema.server.schema.sep2.event import EventStatus, EventStatusType
+from envoy_schema.server.schema.sep2.types import DateTimeIntervalType, PrimacyType
+
+
+def control(
+    mrid: str,
+    start: int,
+    duration: int,
+    creation_time: int = 0,
+    status: EventStatusType = EventStatusType.Scheduled,
+    exp_lim_w: Optional[int] = None,
+    imp_lim_w: Optional[int] = None,
+    connect: Optional[bool] = None,
+) -> DERControlResponse:
+    return DERControlResponse.model_construct(
+        mRID=mrid,
+        creationTime=creation_time,
+        EventStatus_=EventStatus.model_construct(currentStatus=status, dateTime=0, potentiallySuperseded=False),
+        interval=DateTimeIntervalType.model_construct(start=start, duration=duration),
+        DERControlBase_=DERControlBase(
+            opModExpLimW=ActivePower(value=exp_lim_w, multiplier=0) if exp_lim_w is not None else None,
+            opModImpLimW=ActivePower(value=imp_lim_w, multiplier=0) if imp_lim_w is not None else None,
+            opModConnect=connect,
+        ),
+    )
+
+
+def default(exp_lim_w: Optional[int] = None, connect: Optional[bool] = None) -> DefaultDERControl:
+    return DefaultDERControl.model_construct(
+        DERControlBase_=DERControlBase(
+            opModExpLimW=ActivePower(value=exp_lim_w, multiplier=0) if exp_lim_w is not None else None,
+            opModConnect=connect,
+        )
+    )
+
+
+def exp_lim(base: DERControlBase) -> Optional[int]:
+    return base.opModExpLimW.value if base.opModExpLimW is not None else None
+
+
+def test_resolve_precedence():
+    programs = [
+        DERProgramControls(
+            PrimacyType.CONTRACTED_PREMISES_SERVICE_PROVIDER,
+            DERControlListResponse.model_construct(
+                DERControl=[
+                    control("a", 100, 100, creation_time=1, exp_lim_w=1, imp_lim_w=11),
+                    control("b", 150, 100, creation_time=2, exp_lim_w=2),  # Newer - takes precedence over a
+                    control("c", 120, 10, exp_lim_w=3, status=EventStatusType.Cancelled),
+                    control("d", 300, 0, exp_lim_w=4),  # Empty interval
+                ]
+            ),
+            default(exp_lim_w=99, connect=True),
+        ),
+        DERProgramControls(
+            PrimacyType.IN_HOME_ENERGY_MANAGEMENT_SYSTEM,
+            [control("e", 180, 10, creation_time=0, exp_lim_w=5, status=EventStatusType.Active)],
+            default(connect=False),
+        ),
+    ]
+    resolver = DERControlResolver(programs)
+
+    r = resolver.resolve(50)
+    assert (r.start, r.end, r.control) == (None, 100, None)
+    assert exp_lim(r.effective) == 99
+    assert r.effective.opModConnect is False, "Default from the higher primacy program"
+
+    r = resolver.resolve(125)
+    assert (r.start, r.end, r.control.mRID) == (100, 150, "a")
+    assert exp_lim(r.effective) == 1
+
+    r = resolver.resolve(150)
+    assert [c.mRID for _, c in r.controls] == ["b", "a"]
+    assert exp_lim(r.effective) == 2
+    assert r.effective.opModImpLimW.value == 11, "Fields not set by b fall back to a"
+
+    r = resolver.resolve(185)
+    assert [c.mRID for _, c in r.controls] == ["e", "b", "a"]
+    assert exp_lim(r.effective) == 5
+
+    r = resolver.resolve(250)
+    assert (r.start, r.end, r.controls) == (250, None, ())
+    assert exp_lim(r.effective) == 99
+
+    assert [(p.start, p.end, p.control.mRID if p.control else None) for p in resolver.resolve_range(90, 260)] == [
+        (90, 100, None),
+        (100, 150, "a"),
+        (150, 180, "b"),
+        (180, 190, "e"),
+        (190, 200, "b"),
+        (200, 250, "b"),
+        (250, 260, None),
+    ]
+    assert resolver.resolve_range(10, 10) == []
+
+
+def test_resolve_no_controls():
+    resolver = DERControlResolver([DERProgramControls(1, DERControlListResponse.model_construct(DERControl=None))])
+    r = resolver.resolve(123)
+    assert (r.start, r.end, r.controls) == (None, None, ())
+    assert r.effective.model_fields_set == set()
+    assert [(p.start, p.end) for p in resolver.resolve_range(1, 5)] == [(1, 5)]
+
+
+def brute_force(programs: list[DERProgramControls], t: int) -> tuple[list[str], DERControlBase]:
+    applicable = [
+        (p.primacy, c)
+        for p in programs
+        for c in p.controls
+        if c.EventStatus_.currentStatus in (EventStatusType.Scheduled, EventStatusType.Active)
+        and c.interval.start <= t < c.interval.start + c.interval.duration
+    ]
+    applicable.sort(key=control_rank)
+    defaults = [p.default for p in sorted(programs, key=lambda p: p.primacy) if p.default is not None]
+    return [c.mRID for _, c in applicable], merge_control_bases([c for _, c in applicable], defaults)
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3])
+def test_resolve_vs_brute_force(seed: int):
+    rng = random.Random(seed)
+    programs = []
+    for p in range(3):
+        controls = []
+        for i in range(60):
+            controls.append(
+                control(
+                    f"{p}-{i}",
+                    rng.randrange(0, 1000),
+                    rng.randrange(0, 200),
+                    creation_time=rng.randrange(0, 5),
+                    status=rng.choice(list(EventStatusType)),
+                    exp_lim_w=rng.choice([None, rng.randrange(100)]),
+                    imp_lim_w=rng.choice([None, rng.randrange(100)]),
+                    connect=rng.choice([None, True, False]),
+                )
+            )
+        programs.append(DERProgramControls(rng.randrange(3), controls, rng.choice([None, default(exp_lim_w=p)])))
+
+    resolver = DERControlResolver(programs)
+    for t in range(-10, 1300, 3):
+        expected_mrids, expected_base = brute_force(programs, t)
+        actual = resolver.resolve(t)
+        assert [c.mRID for _, c in actual.controls] == expected_mrids
+        assert actual.effective == expected_base
+        assert actual.start is None or actual.start <= t
+        assert actual.end is None or t < actual.end
+
+    periods = resolver.resolve_range(-10, 1300)
+    assert periods[0].start == -10 and periods[-1].end == 1300
+    for period in periods:
+        assert [c.mRID for _, c in period.controls] == brute_force(programs, period.start)[0]
+        assert [c.mRID for _, c in period.controls] == brute_force(programs, period.end - 1)[0]
+    for a, b in zip(periods, periods[1:]):
+        assert a.end == b.start
@@ -0,0 +1,93 @@
+import hashlib
+import random
+
+import pytest
+
+from envoy_schema.server.schema.sep2.device_identifier import (
+    MAX_SFDI,
+    add_check_digit,
+    calculate_check_digit,
+    certificate_fingerprint,
+    derive_lfdi_sfdi_batch,
+    is_valid_check_digit,
+    is_valid_lfdi,
+    lfdi_from_fingerprint,
+    sfdi_from_fingerprint,
+    sfdi_from_lfdi,
+    sum_of_digits,
+    verify_lfdi_sfdi,
+    verify_lfdi_sfdi_batch,
+)
+
+# Example from the IEEE 2030.5 standard
+EXAMPLE_FINGERPRINT = bytes.fromhex("3E4F45AB31EDFE5B67E343E5E4562E31984E23E5349E2AD745672ED145EE213A")
+EXAMPLE_LFDI = "3E4F45AB31EDFE5B67E343E5E4562E31984E23E5"
+EXAMPLE_SFDI = 167261211391
+
+
+def test_example_values():
+    assert lfdi_from_fingerprint(EXAMPLE_FINGERPRINT) == EXAMPLE_LFDI
+    assert sfdi_from_fingerprint(EXAMPLE_FINGERPRINT) == EXAMPLE_SFDI
+    assert sfdi_from_lfdi(EXAMPLE_LFDI) == EXAMPLE_SFDI
+    assert sfdi_from_lfdi(EXAMPLE_LFDI.lower()) == EXAMPLE_SFDI
+    assert verify_lfdi_sfdi(EXAMPLE_LFDI, EXAMPLE_SFDI, EXAMPLE_FINGERPRINT) is None
+
+
+@pytest.mark.parametrize("value", [0, 1, 9, 10, 123, 9999, 10000, 123456789, (1 << 36) - 1, 10**30 + 7])
+def test_check_digit(value: int):
+    assert sum_of_digits(value) == sum(int(c) for c in str(value))
+    check = calculate_check_digit(value)
+    assert 0 <= check <= 9
+    assert (sum(int(c) for c in str(value)) + check) % 10 == 0
+    assert add_check_digit(value) == int(f"{value}{check}")
+    assert is_valid_check_digit(add_check_digit(value))
+    assert not is_valid_check_digit(add_check_digit(value) + (1 if check < 9 else -1))
+
+
+@pytest.mark.parametrize(
+    "lfdi, expected",
+    [(EXAMPLE_LFDI, True), (EXAMPLE_LFDI.lower(), True), (EXAMPLE_LFDI[:-1], False), (EXAMPLE_LFDI[:-1] + "G", False)],
+)
+def test_is_valid_lfdi(lfdi: str, expected: bool):
+    assert is_valid_lfdi(lfdi) == expected
+    if not expected:
+        with pytest.raises(ValueError):
+            sfdi_from_lfdi(lfdi)
+
+
+@pytest.mark.parametrize(
+    "lfdi, sfdi, fingerprint, has_error",
+    [
+        (EXAMPLE_LFDI, EXAMPLE_SFDI, None, False),
+        (EXAMPLE_LFDI.lower(), EXAMPLE_SFDI, EXAMPLE_FINGERPRINT, False),
+        ("abc", EXAMPLE_SFDI, None, True),
+        (EXAMPLE_LFDI, EXAMPLE_SFDI + 1, None, True),  # bad check digit
+        (EXAMPLE_LFDI, add_check_digit(EXAMPLE_SFDI // 10 + 1), None, True),  # valid check digit but wrong lfdi
+        (EXAMPLE_LFDI, -1, None, True),
+        (EXAMPLE_LFDI, MAX_SFDI + 10, None, True),
+        (EXAMPLE_LFDI, EXAMPLE_SFDI, hashlib.sha256(b"other").digest(), True),
+    ],
+)
+def test_verify_lfdi_sfdi(lfdi: str, sfdi: int, fingerprint, has_error: bool):
+    assert (verify_lfdi_sfdi(lfdi, sfdi, fingerprint) is not None) == has_error
+
+
+def test_batch_matches_single():
+    rng = random.Random(4321)
+    certificates = [rng.randbytes(600) for _ in range(500)]
+
+    batch = derive_lfdi_sfdi_batch(certificates)
+
+    fingerprints = [certificate_fingerprint(c) for c in certificates]
+    assert batch == [(lfdi_from_fingerprint(f), sfdi_from_fingerprint(f)) for f in fingerprints]
+    assert all(sfdi_from_lfdi(lfdi) == sfdi for lfdi, sfdi in batch)
+
+    assert verify_lfdi_sfdi_batch(batch, fingerprints) == []
+
+    batch[5] = (batch[5][0], batch[5][1] + 1)
+    batch[7] = (batch[6][0], batch[7][1])
+    assert [idx for idx, _ in verify_lfdi_sfdi_batch(batch, fingerprints)] == [5, 7]
+    assert [idx for idx, _ in verify_lfdi_sfdi_batch(batch)] == [5, 7]
+
+    with pytest.raises(ValueError):
+        verify_lfdi_sfdi_batch(batch, fingerprints[1:])
@@ -0,0 +1,96 @@
+import random
+
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.server.schema.sep2.der import DERControlResponse
+from envoy_schema.server.schema.sep2.event_randomization import (
+    RandomizedEventColumns,
+    identifier_seed,
+    randomization_offsets,
+    randomize_event,
+    randomize_events,
+)
+from envoy_schema.server.schema.sep2.types import DateTimeIntervalType
+
+LFDI = "3E4F45AB31EDFE5B67E343E5E4562E31984E23E5"
+START = 1_700_000_000
+
+
+def make_lfdis(count: int, seed: int = 1) -> list[str]:
+    rng = random.Random(seed)
+    return [f"{rng.getrandbits(160):040X}" for _ in range(count)]
+
+
+def test_identifier_seed():
+    assert identifier_seed(LFDI) == identifier_seed(LFDI.lower())
+    assert identifier_seed(LFDI) != identifier_seed("abc")
+    assert 0 <= identifier_seed(LFDI) < 2**64
+
+
+@pytest.mark.parametrize("randomize_start, randomize_duration", [(600, 300), (-600, -300), (1, -1), (3600, 0)])
+def test_randomization_offsets_bounds(randomize_start: int, randomize_duration: int):
+    start_offsets = set()
+    duration_offsets = set()
+    for lfdi in make_lfdis(2000):
+        start_offset, duration_offset = randomization_offsets(lfdi, "abc123", randomize_start, randomize_duration)
+        assert min(0, randomize_start) <= start_offset <= max(0, randomize_start)
+        assert min(0, randomize_duration) <= duration_offset <= max(0, randomize_duration)
+        start_offsets.add(start_offset)
+        duration_offsets.add(duration_offset)
+
+    # Offsets should be spread over the whole range
+    assert len(start_offsets) > min(abs(randomize_start), 1000) * 0.8
+    assert len(duration_offsets) == 1 if randomize_duration == 0 else len(duration_offsets) > 1
+
+
+def test_randomization_offsets_none():
+    assert randomization_offsets(LFDI, "abc", None, None) == (0, 0)
+    assert randomization_offsets(LFDI, "abc", 0, 0) == (0, 0)
+
+
+def test_randomization_offsets_deterministic():
+    assert randomization_offsets(LFDI, "ABC", 3600, 3600) == randomization_offsets(LFDI.lower(), "abc", 3600, 3600)
+    offsets = {randomization_offsets(LFDI, f"{i:032X}", 3600, 3600) for i in range(50)}
+    assert len(offsets) > 40, "Different events should randomize differently"
+
+
+def test_randomize_events_matches_offsets():
+    lfdis = make_lfdis(100)
+    mrids = [f"{i:032X}" for i in range(5)]
+    randomize_starts = [600, -600, None, 0, 3600]
+    randomize_durations = [None, 300, -300, -3600, 60]
+    durations = [300, 600, 900, 1200, 60]
+    starts = [START + i * 1000 for i in range(5)]
+    columns = RandomizedEventColumns(mrids, starts, durations, randomize_starts, randomize_durations)
+
+    effective_starts, effective_ends = randomize_events(lfdis, columns)
+    assert len(effective_starts) == len(effective_ends) == len(lfdis)
+    for lfdi, device_starts, device_ends in zip(lfdis, effective_starts, effective_ends):
+        for i in range(5):
+            start_offset, duration_offset = randomization_offsets(
+                lfdi, mrids[i], randomize_starts[i], randomize_durations[i]
+            )
+            assert device_starts[i] == starts[i] + start_offset
+            assert device_ends[i] == device_starts[i] + max(durations[i] + duration_offset, 0)
+
+    assert randomize_events([], columns) == ([], [])
+    assert randomize_events(lfdis, RandomizedEventColumns([], [], [])) == ([[]] * 100, [[]] * 100)
+
+
+def test_randomize_event():
+    event = generate_class_instance(DERControlResponse, seed=101, generate_relationships=True)
+    event.interval = DateTimeIntervalType(start=START, duration=600)
+    event.randomizeStart = 120
+    event.randomizeDuration = None
+
+    start, end = randomize_event(LFDI, event)
+    start_offset, _ = randomization_offsets(LFDI, event.mRID, 120, None)
+    assert (start, end) == (START + start_offset, START + start_offset + 600)
+
+
+def test_randomized_event_columns_length_mismatch():
+    with pytest.raises(ValueError):
+        RandomizedEventColumns(["a"], [1, 2], [1])
+    with pytest.raises(ValueError):
+        RandomizedEventColumns(["a"], [1], [1], randomize_starts=[1, 2])
@@ -0,0 +1,122 @@
+import random
+
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.server.schema.sep2.der import DERControlResponse
+from envoy_schema.server.schema.sep2.event import EventStatus, EventStatusType
+from envoy_schema.server.schema.sep2.event_status import (
+    evaluate_event_statuses,
+    find_overlapping_events,
+    refresh_event_statuses,
+)
+from envoy_schema.server.schema.sep2.pricing import TimeTariffIntervalResponse
+from envoy_schema.server.schema.sep2.types import DateTimeIntervalType
+
+NOW = 1_700_000_000
+
+
+def naive_status(start: int, now: int, cancelled: bool, superseded: bool, randomized: bool) -> EventStatusType:
+    if cancelled:
+        return EventStatusType.CancelledWithRandomization if randomized else EventStatusType.Cancelled
+    if superseded:
+        return EventStatusType.Superseded
+    if start <= now:
+        return EventStatusType.Active
+    return EventStatusType.Scheduled
+
+
+def naive_overlapping(starts: list[int], durations: list[int], excluded: list[bool]) -> list[bool]:
+    results = []
+    for i, (s_i, d_i) in enumerate(zip(starts, durations)):
+        overlaps = False
+        for j, (s_j, d_j) in enumerate(zip(starts, durations)):
+            if i == j or excluded[i] or excluded[j] or d_i <= 0 or d_j <= 0:
+                continue
+            if s_i < s_j + d_j and s_j < s_i + d_i:
+                overlaps = True
+                break
+        results.append(overlaps)
+    return results
+
+
+@pytest.mark.parametrize(
+    "starts, durations, excluded, expected",
+    [
+        ([], [], None, []),
+        ([0], [10], None, [False]),
+        ([0, 10], [10, 10], None, [False, False]),  # Touching isn't overlapping
+        ([0, 9], [10, 10], None, [True, True]),
+        ([0, 1, 5], [10, 1, 1], None, [True, True, True]),
+        ([5, 0, 20], [1, 10, 5], None, [True, True, False]),
+        ([0, 0], [10, 0], None, [False, False]),  # Zero duration
+        ([0, 5], [10, 10], [False, True], [False, False]),
+        ([0, 0, 0], [5, 5, 5], [True, False, False], [False, True, True]),
+    ],
+)
+def test_find_overlapping_events(starts, durations, excluded, expected):
+    assert find_overlapping_events(starts, durations, excluded) == expected
+
+
+@pytest.mark.parametrize("seed", [1, 2, 3, 4])
+def test_evaluate_event_statuses_matches_naive(seed: int):
+    rng = random.Random(seed)
+    count = 300
+    starts = [NOW + rng.randint(-5000, 5000) for _ in range(count)]
+    durations = [rng.choice([0, 60, 300, 1800]) for _ in range(count)]
+    cancelled = [rng.random() < 0.1 for _ in range(count)]
+    superseded = [rng.random() < 0.1 for _ in range(count)]
+    randomized = [rng.random() < 0.5 for _ in range(count)]
+
+    statuses, potentially_superseded = evaluate_event_statuses(
+        starts, durations, NOW, cancelled, superseded, randomized
+    )
+    assert statuses == [naive_status(*args) for args in zip(starts, [NOW] * count, cancelled, superseded, randomized)]
+    overlapping = naive_overlapping(starts, durations, cancelled)
+    assert potentially_superseded == [not c and (s or o) for c, s, o in zip(cancelled, superseded, overlapping)]
+
+
+def test_evaluate_event_statuses_defaults():
+    statuses, potentially_superseded = evaluate_event_statuses([NOW - 1, NOW, NOW + 1], [10, 10, 0], NOW)
+    assert statuses == [EventStatusType.Active, EventStatusType.Active, EventStatusType.Scheduled]
+    assert potentially_superseded == [True, True, False]
+
+
+def test_evaluate_event_statuses_length_mismatch():
+    with pytest.raises(ValueError):
+        evaluate_event_statuses([1, 2], [1], NOW)
+    with pytest.raises(ValueError):
+        evaluate_event_statuses([1, 2], [1, 2], NOW, cancelled=[True])
+    with pytest.raises(ValueError):
+        evaluate_event_statuses([1, 2], [1, 2], NOW, randomized=[True, False, True])
+
+
+@pytest.mark.parametrize("t", [DERControlResponse, TimeTariffIntervalResponse])
+def test_refresh_event_statuses(t: type):
+    def make(seed: int, start: int, duration: int, status: EventStatusType):
+        event = generate_class_instance(t, seed=seed, generate_relationships=True)
+        event.interval = DateTimeIntervalType(start=start, duration=duration)
+        event.EventStatus_ = EventStatus(currentStatus=status, dateTime=1, potentiallySuperseded=False)
+        return event
+
+    events = [
+        make(1, NOW - 100, 50, EventStatusType.Scheduled),  # Becomes active
+        make(2, NOW + 100, 50, EventStatusType.Scheduled),  # Remains scheduled
+        make(3, NOW - 100, 500, EventStatusType.CancelledWithRandomization),
+        make(4, NOW - 10000, 500, EventStatusType.Superseded),
+        make(5, NOW + 1000, 100, EventStatusType.Active),  # Reverts to scheduled
+        make(6, NOW + 1050, 100, EventStatusType.Scheduled),  # Overlaps the above
+    ]
+    assert refresh_event_statuses(iter(events), NOW) == events
+
+    assert [e.EventStatus_.currentStatus for e in events] == [
+        EventStatusType.Active,
+        EventStatusType.Scheduled,
+        EventStatusType.CancelledWithRandomization,
+        EventStatusType.Superseded,
+        EventStatusType.Scheduled,
+        EventStatusType.Scheduled,
+    ]
+    assert [e.EventStatus_.dateTime for e in events] == [NOW, 1, 1, 1, NOW, 1]
+    assert [e.EventStatus_.potentiallySuperseded for e in events] == [False, False, False, True, True, True]
+    assert [e.EventStatus_.potentiallySupersededTime for e in events] == [None, None, None, NOW, NOW, NOW]
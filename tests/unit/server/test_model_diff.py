@@ -0,0 +1,101 @@
+import pytest
+from assertical.fake.generator import generate_class_instance
+
+from envoy_schema.server.schema.sep2.der import (
+    ConnectStatusTypeValue,
+    DERAvailability,
+    DERSettings,
+    DERStatus,
+    InverterStatusTypeValue,
+)
+from envoy_schema.server.schema.sep2.der_control_types import ActivePower, ReactivePower
+from envoy_schema.server.schema.sep2.model_diff import (
+    SEP2_DIFF_IGNORED_FIELDS,
+    apply_patch,
+    diff_models,
+    has_changed,
+)
+
+
+def make_status(reading_time: int = 1000, inverter: int = 1, connect: str = "01") -> DERStatus:
+    return DERStatus(
+        href="/edev/1/ders/1/dars",
+        readingTime=reading_time,
+        genConnectStatus=ConnectStatusTypeValue(dateTime=900, value=connect),
+        inverterStatus=InverterStatusTypeValue(dateTime=900, value=inverter),
+    )
+
+
+def test_diff_models_unchanged():
+    diff = diff_models(make_status(), make_status())
+    assert not diff
+    assert diff.paths == []
+    assert diff.patch == {}
+
+
+def test_diff_models_ignored():
+    old = make_status(reading_time=1000)
+    new = make_status(reading_time=2000)
+    assert diff_models(old, new).paths == ["readingTime"]
+    assert not diff_models(old, new, SEP2_DIFF_IGNORED_FIELDS)
+    assert not has_changed(old, new, SEP2_DIFF_IGNORED_FIELDS)
+    assert has_changed(None, new, SEP2_DIFF_IGNORED_FIELDS)
+
+
+def test_diff_models_nested():
+    old = make_status()
+    new = make_status(reading_time=2000, inverter=4, connect="03")
+    new.inverterStatus.dateTime = 1999
+
+    diff = diff_models(old, new, SEP2_DIFF_IGNORED_FIELDS)
+    assert diff
+    assert diff.paths == ["genConnectStatus.value", "inverterStatus.dateTime", "inverterStatus.value"]
+    assert diff.patch == {"genConnectStatus": {"value": "03"}, "inverterStatus": {"dateTime": 1999, "value": 4}}
+
+    # Nested ignore paths
+    diff = diff_models(old, new, SEP2_DIFF_IGNORED_FIELDS + ("inverterStatus.dateTime",))
+    assert diff.paths == ["genConnectStatus.value", "inverterStatus.value"]
+
+
+def test_diff_models_sub_model_added_removed():
+    old = DERAvailability(readingTime=1, statWAvail=ActivePower(value=5, multiplier=1))
+    new = DERAvailability(readingTime=1, statVarAvail=ReactivePower(value=6, multiplier=0), reservePercent=1000)
+
+    diff = diff_models(old, new)
+    assert diff.paths == ["reservePercent", "statVarAvail", "statWAvail"]
+    assert diff.patch == {"reservePercent": 1000, "statVarAvail": new.statVarAvail, "statWAvail": None}
+
+    patched = apply_patch(old, diff.patch)
+    assert patched == new
+    assert old.statWAvail is not None, "Original is unmodified"
+
+
+def test_diff_models_type_mismatch():
+    with pytest.raises(ValueError):
+        diff_models(make_status(), DERAvailability(readingTime=1))
+
+
+@pytest.mark.parametrize("t", [DERStatus, DERAvailability, DERSettings])
+@pytest.mark.parametrize("optional_is_none", [True, False])
+def test_diff_patch_roundtrip(t: type, optional_is_none: bool):
+    old = generate_class_instance(t, seed=101, optional_is_none=optional_is_none, generate_relationships=True)
+    new = generate_class_instance(t, seed=202, optional_is_none=False, generate_relationships=True)
+
+    assert not diff_models(old, old.model_copy(deep=True))
+
+    diff = diff_models(old, new)
+    assert diff
+    assert apply_patch(old, diff.patch) == new
+    assert not diff_models(apply_patch(old, diff.patch), new)
+
+    reverse = diff_models(new, old)
+    assert apply_patch(new, reverse.patch) == old
+
+
+def test_diff_models_matches_model_dump():
+    pairs = [(make_status(1000 + i, i % 3), make_status(2000 + i, i % 3 if i % 5 else 4)) for i in range(200)]
+    ignore = set(SEP2_DIFF_IGNORED_FIELDS)
+
+    expected = [a.model_dump(exclude=ignore) != b.model_dump(exclude=ignore) for a, b in pairs]  # type: ignore[arg-type]
+    assert any(expected) and not all(expected)
+    assert [bool(diff_models(a, b, SEP2_DIFF_IGNORED_FIELDS)) for a, b in pairs] == expected
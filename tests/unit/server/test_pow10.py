@@ -0,0 +1,139 @@
+import random
+from decimal import Decimal
+from typing import Optional, Union
+
+import pytest
+from pydantic import TypeAdapter
+
+from envoy_schema.server.schema.sep2.der_control_types import ActivePower, VoltageRMS
+from envoy_schema.server.schema.sep2.pow10 import (
+    INT16_RANGE,
+    INT32_RANGE,
+    UINT16_RANGE,
+    decode_pow10,
+    decode_pow10_batch,
+    encode_pow10,
+    encode_pow10_batch,
+    encode_pow10_shared,
+    from_pow10_model,
+    to_pow10_model,
+)
+
+
+@pytest.mark.parametrize(
+    "number, value_range, expected",
+    [
+        (Decimal("0"), INT16_RANGE, (0, 0)),
+        (0, INT16_RANGE, (0, 0)),
+        (Decimal("1500.000"), INT16_RANGE, (1500, 0)),
+        (Decimal("1.25"), INT16_RANGE, (125, -2)),
+        (0.1, INT16_RANGE, (1, -1)),
+        (-32768, INT16_RANGE, (-32768, 0)),
+        (-32769, INT16_RANGE, (-3277, 1)),
+        (Decimal("32768"), INT32_RANGE, (32768, 0)),
+        (Decimal("123456.789"), INT32_RANGE, (123456789, -3)),
+        (Decimal("65535"), UINT16_RANGE, (65535, 0)),
+        (Decimal("1.23456"), INT16_RANGE, (12346, -4)),  # Rounded
+        (Decimal("1E-12"), INT16_RANGE, (0, -9)),  # Rounded
+        (Decimal("5E+9"), INT16_RANGE, (5000, 6)),
+    ],
+)
+def test_encode_decode_pow10(number: Union[Decimal, float, int], value_range: tuple[int, int], expected: tuple):
+    assert encode_pow10(number, value_range) == expected
+    value, multiplier = expected
+    decoded = decode_pow10(value, multiplier)
+    if decoded == Decimal(repr(number) if isinstance(number, float) else number):
+        assert encode_pow10(number, value_range, exact=True) == expected
+    else:
+        with pytest.raises(ValueError):
+            encode_pow10(number, value_range, exact=True)
+
+
+@pytest.mark.parametrize(
+    "number, value_range",
+    [
+        (Decimal("NaN"), INT16_RANGE),
+        (Decimal("Infinity"), INT16_RANGE),
+        (float("inf"), INT16_RANGE),
+        (Decimal("4E+13"), INT16_RANGE),
+        (-1, UINT16_RANGE),
+    ],
+)
+def test_encode_pow10_errors(number, value_range):
+    with pytest.raises(ValueError):
+        encode_pow10(number, value_range)
+
+
+def test_batch_roundtrip():
+    numbers: list[Optional[Decimal]] = [Decimal("1.5"), None, Decimal("-20000"), Decimal("0.001"), Decimal("99999")]
+    values, multipliers = encode_pow10_batch(numbers)
+    assert values == [15, None, -20000, 1, 10000]
+    assert multipliers == [-1, None, 0, -3, 1]
+    assert decode_pow10_batch(values, multipliers) == [
+        Decimal("1.5"),
+        None,
+        Decimal("-20000"),
+        Decimal("0.001"),
+        Decimal("100000"),
+    ]
+
+    with pytest.raises(ValueError):
+        encode_pow10_batch(numbers, exact=True)
+    with pytest.raises(ValueError):
+        decode_pow10_batch(values, multipliers[1:])
+
+
+def test_shared_multiplier():
+    assert encode_pow10_shared([Decimal("1.5"), None, Decimal("200"), 3]) == ([15, None, 2000, 30], -1)
+    assert encode_pow10_shared([]) == ([], 0)
+    assert encode_pow10_shared([None, 0]) == ([None, 0], 0)
+    assert encode_pow10_shared([Decimal("32767.4"), Decimal("0.01")]) == ([32767, 0], 0)
+    assert encode_pow10_shared([Decimal("32767.6"), Decimal("0.01")]) == ([3277, 0], 1)
+    assert encode_pow10_shared([Decimal("32767"), Decimal("0.01")], INT32_RANGE, exact=True) == ([3276700, 1], -2)
+    assert decode_pow10_batch([3276700, 1, None], -2) == [Decimal("32767"), Decimal("0.01"), None]
+    with pytest.raises(ValueError):
+        encode_pow10_shared([Decimal("32767"), Decimal("0.01")], exact=True)
+
+
+def test_pow10_models():
+    assert to_pow10_model(ActivePower, Decimal("2.5")) == ActivePower(value=25, multiplier=-1)
+    assert to_pow10_model(VoltageRMS, 240.1, UINT16_RANGE) == VoltageRMS(value=2401, multiplier=-1)
+    assert from_pow10_model(ActivePower(value=25, multiplier=-1)) == Decimal("2.5")
+
+
+@pytest.mark.parametrize(
+    "value, multiplier, expected_json",
+    [
+        (13, 1, b'"130"'),
+        (-5, 3, b'"-5000"'),
+        (0, 9, b'"0"'),
+        (1500, 0, b'"1500"'),
+        (125, -2, b'"1.25"'),
+    ],
+)
+def test_decode_pow10_json(value: int, multiplier: int, expected_json: bytes):
+    """Decoded values must serialise without an exponent (eg "130" not "1.3E+2")"""
+    adapter = TypeAdapter(Optional[Decimal])
+    assert adapter.dump_json(decode_pow10(value, multiplier)) == expected_json
+    assert adapter.dump_json(decode_pow10_batch([value], [multiplier])[0]) == expected_json
+    assert adapter.dump_json(decode_pow10_batch([value], multiplier)[0]) == expected_json
+    assert adapter.dump_json(from_pow10_model(ActivePower(value=value, multiplier=multiplier))) == expected_json
+
+
+def test_batch_matches_ad_hoc():
+    """Compares the cached batch encoder vs an ad hoc (uncached) encoding of repeated setpoints"""
+    rng = random.Random(1)
+    setpoints = [Decimal(rng.choice([1500, 2500, 5000, 7500, 10000])) / rng.choice([1, 10, 100]) for _ in range(2000)]
+
+    def ad_hoc() -> list[tuple[int, int]]:
+        results = []
+        for number in setpoints:
+            for multiplier in range(min(number.normalize().as_tuple().exponent, 0), 10):
+                scaled = number.scaleb(-multiplier)
+                if scaled == scaled.to_integral_value() and -32768 <= scaled <= 32767:
+                    results.append((int(scaled), multiplier))
+                    break
+        return results
+
+    values, multipliers = encode_pow10_batch(setpoints)
+    assert list(zip(values, multipliers)) == ad_hoc()